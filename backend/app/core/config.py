@@ -1,7 +1,7 @@
 # backend/app/core/config.py - Application Configuration
 
 import os
-from typing import Dict, List, Any, ClassVar
+from typing import Dict, List, Any, ClassVar, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -16,9 +16,16 @@ class Settings(BaseSettings):
     # Server Configuration
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WORKERS: int = 1  # API processes; build state is shared through BUILD_DB_PATH
     DEBUG: bool = False
     ENVIRONMENT: str = "production"
     
+    # Logging
+    LOG_LEVEL: str = "INFO"  # DEBUG also shows per-request build lookups
+    LOG_FORMAT: str = "json"  # "json" for one object per line, "text" for humans
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped, never blocking requests
+    LOG_PROGRESS_SAMPLE: int = 100  # Keep 1 in N build progress records
+    
     # CORS Configuration
     ALLOWED_ORIGINS: List[str] = [
         "http://localhost:3000",  # React dev server
@@ -27,21 +34,140 @@ class Settings(BaseSettings):
         "http://127.0.0.1:8000"
     ]
     
+    # Response Compression
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes; smaller bodies are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # Favour speed for large log payloads
+    
     # Container Runtime
     CONTAINER_RUNTIME: str = "podman"  # or "docker"
     
     # Paths
     ENVIRONMENTS_DIR: str = "../environments"  # Go up one level from backend/
     PLAYBOOK_PATH: str = "../build_environments.yml"  # Go up one level from backend/
+    ANSIBLE_PLAYBOOK_BIN: str = "ansible-playbook"  # Executable used to run PLAYBOOK_PATH
     
     # Build Configuration
     BUILD_CLEANUP_HOURS: int = 1  # Hours to keep completed builds
-    MAX_CONCURRENT_BUILDS: int = 3
+    MAX_CONCURRENT_BUILDS: int = 0  # Hard cap on running builds; 0 = only admission control limits them
+    BUILD_COALESCING: bool = True  # Requests for environments already building from identical inputs join that build
+    BUILD_PARALLELISM: int = 1  # ansible-builder runs in parallel within one build; longest expected builds start first
     BUILD_TIMEOUT_MINUTES: int = 30
+    LOG_READ_CHUNK_BYTES: int = 256 * 1024  # Block size for reading build output
+    LOG_MAX_LINE_BYTES: int = 64 * 1024  # Longer output lines are truncated
+    
+    # Build Profiles (ansible-builder options; keys: cache, squash, jobs, build_args, verbosity)
+    BUILD_PROFILES: Dict[str, Dict[str, Any]] = {
+        "default": {},  # What the playbook always passed
+        "fast": {  # Iteration: cached layers, parallel stages, package manager cache kept
+            "jobs": 4,
+            "build_args": {"PKGMGR_PRESERVE_CACHE": "always"}
+        },
+        "release": {"cache": False, "squash": "all"}  # Clean rebuild into a single lean layer
+    }
+    DEFAULT_BUILD_PROFILE: str = "default"  # Profile of environments without one of their own
+    ENVIRONMENT_BUILD_PROFILES: Dict[str, str] = {}  # {environment: profile}, used unless a request names one
+    
+    # Build Isolation (each build's process tree in its own cgroup, so builds can't starve the API)
+    BUILD_ISOLATION: str = "auto"  # "systemd" (systemd-run scope), "cgroup" (under BUILD_CGROUP_PARENT) or "off"; auto = first that works
+    BUILD_CGROUP_PARENT: str = ""  # cgroup v2 directory delegated to this service, e.g. /sys/fs/cgroup/ee-builds
+    BUILD_CPU_WEIGHT: int = 50  # cpu.weight of each build, 1-10000 (other cgroups default to 100)
+    BUILD_IO_WEIGHT: int = 50  # io.weight of each build, 1-10000
+    BUILD_MEMORY_MAX_MB: int = 0  # Memory limit of each build; 0 = none
+    
+    # Build Admission Control (queued builds start when the host has room for them)
+    ADMISSION_CONTROL: bool = True  # False = admit up to MAX_CONCURRENT_BUILDS regardless of host metrics
+    BUILD_QUEUE_MAX: int = 50  # Builds waiting for admission across all workers
+    ADMISSION_RETRY_SECONDS: float = 5.0  # How often queued builds retry admission
+    ADMISSION_MAX_LOAD_PER_CPU: float = 1.5  # 1-minute load average plus reserved CPUs, per CPU
+    ADMISSION_MIN_FREE_MEMORY_MB: int = 1024  # Memory left available after reservations
+    ADMISSION_MIN_FREE_DISK_GB: float = 10.0  # Free space left in the image store after reservations
+    ADMISSION_MAX_IO_PRESSURE: float = 50.0  # % of the last 10s some task stalled on I/O (Linux PSI); 0 = ignore
+    ADMISSION_RAMP_SECONDS: int = 120  # Newly started builds count by reservation until metrics show their usage
+    ADMISSION_DEFAULT_MEMORY_MB: int = 2048  # Reservation of an environment never built here
+    ADMISSION_DEFAULT_CPUS: float = 1.0
+    ADMISSION_DEFAULT_DISK_GB: float = 3.0
+    ADMISSION_SAMPLE_SECONDS: float = 5.0  # How often a running build's process tree is measured
+    ADMISSION_LEARNING_WEIGHT: float = 0.3  # Weight of the latest build in an environment's learned needs
+    
+    # Build Duration Estimates (ETA and progress of queued and running builds)
+    ETA_DEFAULT_SECONDS: int = 600  # Predicted duration of an environment with no build history
+    ETA_REFRESH_SECONDS: float = 2.0  # How often a running build's ETA and progress are recomputed
+    ETA_LEARNING_WEIGHT: float = 0.3  # Weight of the latest build in an environment's learned duration
+    
+    # Build Log Archive
+    LOG_ARCHIVE_DIR: str = "../artifact/build-logs"  # Go up one level from backend/
+    LOG_ARCHIVE_CHUNK_LINES: int = 1000  # Lines per independently decompressible chunk
+    LOG_ARCHIVE_RETENTION_DAYS: int = 90
+    
+    # Build History
+    BUILD_DB_PATH: str = "../artifact/builds.db"  # Go up one level from backend/
+    BUILD_HISTORY_RETENTION_DAYS: int = 90
+    BUILD_LIST_MAX_LIMIT: int = 500  # Max page size and batch size for build listings
+    BUILD_DB_BUSY_TIMEOUT_SECONDS: float = 10.0  # Wait this long for another worker's write lock
+    BUILD_STATE_SYNC_SECONDS: float = 0.5  # How often running builds share logs and check for cancels
+    WORKER_HEARTBEAT_SECONDS: float = 5.0  # How often each API worker marks itself alive in the build store
+    WORKER_LEASE_SECONDS: float = 30.0  # A worker silent this long is dead; its queued and running builds fail
+    
+    # Build Webhooks (build events POSTed to registered URLs instead of polled for)
+    WEBHOOK_POLL_SECONDS: float = 1.0  # How often new build events are looked for; 0 = no deliveries
+    WEBHOOK_BATCH_SIZE: int = 50  # Events per delivery at most
+    WEBHOOK_TIMEOUT_SECONDS: int = 10  # Per delivery request
+    WEBHOOK_MAX_ATTEMPTS: int = 8  # Failed deliveries of a batch before it is dropped
+    WEBHOOK_RETRY_BASE_SECONDS: float = 2.0  # Retry delay after the first failure; doubles after each one
+    WEBHOOK_RETRY_MAX_SECONDS: float = 300.0
+    WEBHOOK_ALLOWED_HOSTS: List[str] = []  # Webhook URL hosts allowed; empty = any with public addresses
+    WEBHOOK_PRIVATE_HOSTS: List[str] = []  # Hosts that may resolve to private or loopback addresses, e.g. ["localhost"]
+    
+    # Environment Validation and Dependency Index
+    VALIDATION_WORKERS: int = 0  # Process pool size for batch validation; 0 = one per CPU
+    VALIDATION_INLINE_MAX: int = 8  # Smaller batches are validated in a thread, skipping the pool
+    DEPENDENCY_INDEX_REFRESH_SECONDS: float = 2.0  # Minimum gap between rescans of ENVIRONMENTS_DIR for the dependency index
+    
+    # Bulk Environment Import (POST /api/custom-ee/import)
+    IMPORT_MAX_BYTES: int = 50 * 1024 * 1024  # Upload size, and total size once unpacked
+    IMPORT_MAX_ENVIRONMENTS: int = 500
+    
+    # Dependency Preflight (resolve requirements before a build takes a slot)
+    PREFLIGHT_ENABLED: bool = True
+    PREFLIGHT_CONCURRENCY: int = 4  # pip resolutions running at once
+    PREFLIGHT_REQUEST_TIMEOUT_SECONDS: float = 5.0  # Longest a request waits; unfinished checks are inconclusive
+    PREFLIGHT_TIMEOUT_SECONDS: int = 120  # Per pip resolution; slower ones count as inconclusive
+    PREFLIGHT_INDEX_TIMEOUT_SECONDS: int = 10  # Per package or collection index request
+    PREFLIGHT_CACHE_SECONDS: int = 600  # Reuse conclusive results for identical requirements
+    PREFLIGHT_PIP_INDEX_URL: Optional[str] = None  # e.g. a local devpi mirror
+    PREFLIGHT_PIP_FIND_LINKS: Optional[str] = None  # Local wheel directory; on its own pip resolves offline against it
+    PREFLIGHT_PIP_DEFAULT_INDEX: bool = False  # With neither of the above, resolve against pip's own configuration (PyPI)
+    PREFLIGHT_COLLECTIONS_DIR: Optional[str] = None  # Downloaded collection tarballs, checked before the server
+    PREFLIGHT_GALAXY_SERVER: Optional[str] = None  # e.g. https://galaxy.ansible.com/api/; None = local directory only
+    
+    # Registry Promotion (registry-to-registry image copies)
+    SKOPEO_BIN: str = "skopeo"  # Path or name of the skopeo executable
+    PROMOTION_CONCURRENCY: int = 4  # Images copied at once per promotion
+    PROMOTION_RETRY_TIMES: int = 3  # skopeo --retry-times for transient registry errors
+    PROMOTION_TIMEOUT_MINUTES: int = 30  # Per image
+    PROMOTION_PROGRESS_RECORD_SECONDS: float = 1.0  # Minimum gap between shared blob progress updates per promotion
+    
+    # Publishing (optional push after a successful build)
+    PUBLISH_REGISTRIES: List[str] = []  # Default targets for BuildRequest.publish, e.g. ["hub.example.com/ee"]
+    PUBLISH_CONCURRENCY: int = 3  # Pushes running at once per build
+    PUBLISH_TLS_VERIFY: bool = True  # podman only; docker takes this from the daemon
+    PUBLISH_TIMEOUT_MINUTES: int = 30  # Per image and registry
+    
+    # Image Garbage Collection (LRU eviction of built and base images under disk pressure)
+    IMAGE_GC_INTERVAL_SECONDS: int = 300  # How often to check the image store; 0 disables the collector
+    IMAGE_GC_MIN_FREE_PERCENT: float = 10.0  # Collect when free space on the image store's disk drops below this
+    IMAGE_GC_TARGET_FREE_PERCENT: float = 20.0  # ...and evict until this much is free
+    IMAGE_GC_MAX_STORE_GB: float = 0  # Also collect when images take more than this; 0 = no size limit
+    IMAGE_GC_TARGET_STORE_GB: float = 0  # ...evicting down to this; 0 = 80% of IMAGE_GC_MAX_STORE_GB
     
     # Red Hat Registry
     RH_REGISTRY_URL: str = "registry.redhat.io"
     
+    # Probe Caching
+    AUTH_STATUS_CACHE_SECONDS: int = 30  # Reuse registry login checks for this long
+    RUNTIME_PROBE_CACHE_SECONDS: int = 300  # Reuse successful container runtime checks
+    
     # Available Base Images
     AVAILABLE_BASE_IMAGES: ClassVar[Dict[str, Dict[str, Any]]] = {
         "ee-minimal-rhel9": {
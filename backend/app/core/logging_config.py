@@ -0,0 +1,133 @@
+# backend/app/core/logging_config.py - Non-blocking structured logging
+
+import atexit
+import logging
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+_INTERNAL_ATTRS = {"sample"}
+
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for an application module, e.g. get_logger(__name__)"""
+    return logging.getLogger(name)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg plus any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in _INTERNAL_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class SamplingFilter(logging.Filter):
+    """Keep the first and then every Nth record of events logged with extra={"sample": N}
+
+    Counted per logger and message template, so hot-path calls should pass
+    their values as arguments rather than formatting them into the message.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample", None)
+        if not rate or rate <= 1:
+            return True
+        key = (record.name, str(record.msg))
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        dropped = self.dropped
+        if dropped:
+            record.dropped_records = dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if dropped:
+            self.dropped -= dropped
+
+
+def setup_logging():
+    """Route application logs through a queue to a background writer thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        level = logging.DEBUG if settings.DEBUG else logging.getLevelName(settings.LOG_LEVEL.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if settings.LOG_FORMAT == "json":
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter())
+
+        app_logger = logging.getLogger("app")
+        app_logger.handlers = [queue_handler]
+        app_logger.setLevel(level)
+        app_logger.propagate = False
+
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
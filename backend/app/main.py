@@ -1,25 +1,52 @@
 # backend/app/main.py - Clean FastAPI Application Entry Point
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.routers import auth, builds, environments, dashboard, custom_ee
+from app.routers import auth, builds, environments, dashboard, custom_ee, promotions, webhooks
+from app.utils.http_utils import CompressionMiddleware
+from app.models.system_models import ReadinessStatus
+from app.services.warmup_service import warmup_service
+from app.services.environment_service import environment_service
+from app.services.promotion_service import promotion_service
+from app.services.publish_service import publish_service
+from app.services.image_gc_service import image_gc_service
+from app.services.preflight_service import preflight_service
+from app.services.webhook_service import webhook_service
+from app.services.build_store import build_store
+from app.core.logging_config import get_logger, setup_logging, shutdown_logging
+
+setup_logging()
+logger = get_logger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan - startup and shutdown events"""
     # Startup
-    print(f"🚀 Starting {settings.APP_NAME} v{settings.VERSION}")
-    print(f"🔧 Environment: {settings.ENVIRONMENT}")
-    print(f"🐳 Container Runtime: {settings.CONTAINER_RUNTIME}")
+    logger.info(f"🚀 Starting {settings.APP_NAME} v{settings.VERSION}")
+    logger.info(f"🔧 Environment: {settings.ENVIRONMENT}")
+    logger.info(f"🐳 Container Runtime: {settings.CONTAINER_RUNTIME}")
+    warmup_service.start()
+    image_gc_service.start()
+    webhook_service.start()
     
     yield
     
     # Shutdown
-    print("📴 Shutting down EE-DE Builder...")
+    await warmup_service.stop()
+    await image_gc_service.stop()
+    await webhook_service.stop()
+    environment_service.shutdown_validation_pool()
+    await promotion_service.shutdown()
+    publish_service.shutdown()
+    preflight_service.shutdown()
+    build_store.shutdown()
+    logger.info("📴 Shutting down EE-DE Builder...")
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -27,9 +54,18 @@ app = FastAPI(
     title=settings.APP_NAME,
     description=settings.APP_DESCRIPTION,
     version=settings.VERSION,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Compress responses (br when available, otherwise gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -45,6 +81,8 @@ app.include_router(builds.router, prefix="/api/builds", tags=["builds"])
 app.include_router(environments.router, prefix="/api/environments", tags=["environments"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
 app.include_router(custom_ee.router, prefix="/api/custom-ee", tags=["custom-ee"])
+app.include_router(promotions.router, prefix="/api/promotions", tags=["promotions"])
+app.include_router(webhooks.router, prefix="/api/webhooks", tags=["webhooks"])
 
 
 @app.get("/")
@@ -63,11 +101,22 @@ async def health_check():
     return {"status": "healthy", "service": settings.APP_NAME}
 
 
+@app.get("/ready", response_model=ReadinessStatus)
+async def readiness_check(response: Response):
+    """Readiness endpoint - 503 until the startup warm-up has finished"""
+    status = warmup_service.get_status()
+    if not status.ready:
+        response.status_code = 503
+    return status
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=settings.PORT,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        # Builds are shared between workers via the build store; reload needs a single process
+        workers=1 if settings.DEBUG else settings.WORKERS
     )
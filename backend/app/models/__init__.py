@@ -3,3 +3,6 @@ from .build_models import *
 from .auth_models import *
 from .environment_models import *
 from .custom_ee_models import *
+from .system_models import *
+from .promotion_models import *
+from .webhook_models import *
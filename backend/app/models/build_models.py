@@ -1,13 +1,30 @@
 # backend/app/models/build_models.py - Build-related models
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 
 class BuildRequest(BaseModel):
     environments: List[str]
     container_runtime: Optional[str] = "podman"
+    publish: bool = False  # Push successfully built images once the build finishes
+    publish_registries: Optional[List[str]] = None  # "host[:port][/namespace]"; defaults to PUBLISH_REGISTRIES
+    profile: Optional[str] = None  # Build profile for every environment; defaults to ENVIRONMENT_BUILD_PROFILES
+
+
+class BuildProfile(BaseModel):
+    cache: bool = True  # Reuse cached image layers
+    squash: Optional[str] = None  # "new", "all" or "off" (Podman); None = ansible-builder's default
+    jobs: int = 1  # Build stages run in parallel (Podman)
+    build_args: Dict[str, str] = {}
+    verbosity: int = 1
+
+
+class BuildProfileList(BaseModel):
+    profiles: Dict[str, BuildProfile]
+    default_profile: str
+    environment_profiles: Dict[str, str] = {}  # Environments built with a profile of their own
 
 
 class BuildResponse(BaseModel):
@@ -19,7 +36,7 @@ class BuildResponse(BaseModel):
 
 class BuildStatus(BaseModel):
     build_id: str
-    status: str  # "running", "completed", "failed", "cancelled"
+    status: str  # "queued", "running", "completed", "failed", "cancelled"
     environments: List[str]
     start_time: datetime
     end_time: Optional[datetime] = None
@@ -27,6 +44,12 @@ class BuildStatus(BaseModel):
     logs: List[str] = []
     successful_builds: List[str] = []
     failed_builds: List[str] = []
+    published: List[str] = []  # "env → registry" pushes that succeeded
+    publish_failures: List[str] = []
+    eta: Optional[datetime] = None  # Predicted finish of a queued or running build
+    progress: Optional[float] = None  # Percent complete, from predicted environment durations
+    predicted_durations: Dict[str, float] = {}  # Predicted build seconds per environment
+    build_profiles: Dict[str, str] = {}  # Build profile of each environment
 
 
 class BuildListItem(BaseModel):
@@ -36,7 +59,60 @@ class BuildListItem(BaseModel):
     start_time: datetime
     end_time: Optional[datetime] = None
     environment_count: int
+    return_code: Optional[int] = None
+    runtime_seconds: Optional[float] = None
+    successful_builds: List[str] = []
+    failed_builds: List[str] = []
+    published: List[str] = []
+    publish_failures: List[str] = []
+    eta: Optional[datetime] = None
+    progress: Optional[float] = None
+
+
+class BuildBatchStatusRequest(BaseModel):
+    build_ids: List[str]
+
+
+class BuildBatchStatusResponse(BaseModel):
+    builds: List[BuildListItem]
+    not_found: List[str] = []
+
+
+class BuildLogs(BaseModel):
+    build_id: str
+    total_lines: int
+    start: int  # First line returned (0-based, inclusive)
+    end: int  # Last line returned (exclusive)
+    lines: List[str] = []
+    archived: bool = False
 
 
 class BuildList(BaseModel):
     builds: List[BuildListItem]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+
+
+class BuildInputChange(BaseModel):
+    kind: str  # "python", "collection", "system", "image" or "file"
+    name: str  # Package, collection or image name, or a file path relative to the project root
+    version: Optional[str] = None  # New version; environments whose constraint excludes it are unaffected
+
+
+class RebuildPlanRequest(BaseModel):
+    changes: List[BuildInputChange]
+    execute: bool = False  # Start one build for the affected environments
+    container_runtime: Optional[str] = None
+
+
+class RebuildReason(BaseModel):
+    environment: str
+    change: str
+    detail: str
+
+
+class RebuildPlan(BaseModel):
+    environments: List[str]  # Affected environments, in build order
+    reasons: List[RebuildReason]
+    unaffected: List[RebuildReason] = []  # Declare a changed input but pin it away from the change
+    total_environments: int
+    build: Optional[BuildResponse] = None
@@ -25,6 +25,14 @@ class CustomEEResponse(BaseModel):
     build_id: Optional[str] = None
 
 
+class BulkImportResponse(BaseModel):
+    success: bool
+    message: str
+    environments: List[str]
+    warnings: List[str] = []  # Dependency preflight checks that were inconclusive
+    build_id: Optional[str] = None
+
+
 class EETemplate(BaseModel):
     name: str
     packages: List[str]
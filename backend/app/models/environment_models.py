@@ -26,3 +26,47 @@ class EnvironmentAnalysis(BaseModel):
     health: EnvironmentHealth
     estimated_size_mb: int
     last_modified: Optional[datetime] = None
+
+
+class ValidationIssue(BaseModel):
+    file: str
+    location: Optional[str] = None  # Dotted path inside the file, e.g. images.base_image.name
+    line: Optional[int] = None
+    message: str
+
+
+class EnvironmentValidation(BaseModel):
+    name: str
+    valid: bool
+    schema_version: Optional[int] = None
+    errors: List[ValidationIssue]
+    warnings: List[ValidationIssue]
+
+
+class EnvironmentValidationRequest(BaseModel):
+    environments: Optional[List[str]] = None  # Omit to validate every environment
+
+
+class EnvironmentValidationReport(BaseModel):
+    results: List[EnvironmentValidation]
+    total: int
+    valid_count: int
+    invalid_count: int
+    duration_ms: int
+
+
+class DependencyMatch(BaseModel):
+    environment: str
+    kind: str  # "python", "collection", "system" or "image"
+    name: str
+    constraint: Optional[str] = None  # Version constraint as declared, e.g. <2.17,>=2.15
+    source: str  # File that declares it, relative to the environment
+
+
+class DependencySearchResult(BaseModel):
+    query: str
+    kind: Optional[str] = None
+    constraint: Optional[str] = None
+    environments: List[str]
+    matches: List[DependencyMatch]
+    indexed_environments: int
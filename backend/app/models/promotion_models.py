@@ -0,0 +1,60 @@
+# backend/app/models/promotion_models.py - Registry promotion models
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class RegistryCredentials(BaseModel):
+    username: str
+    password: str
+
+
+class PromotionRequest(BaseModel):
+    source_registry: str  # e.g. automationhub.example.com
+    destination_registry: str  # e.g. controller.example.com, or localhost:5000 for a test registry
+    images: List[str]  # repository[:tag] or repository@digest, relative to the source registry
+    destination_namespace: Optional[str] = None  # Prefix for destination repositories
+    source_credentials: Optional[RegistryCredentials] = None  # Omit to use the runtime's stored logins
+    destination_credentials: Optional[RegistryCredentials] = None
+    source_tls_verify: bool = True
+    destination_tls_verify: bool = True
+    all_architectures: bool = False  # Copy every image in a manifest list, not just this host's
+
+
+class ImagePromotion(BaseModel):
+    image: str
+    source: str
+    destination: str
+    status: str  # "pending", "copying", "completed", "failed"
+    blobs_total: Optional[int] = None  # Layers plus config, when the source manifest could be read
+    blobs_copied: int = 0
+    blobs_skipped: int = 0  # Already present at the destination
+    bytes_total: Optional[int] = None
+    bytes_skipped: int = 0
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class PromotionResponse(BaseModel):
+    promotion_id: str
+    status: str
+    images: List[str]
+    message: str
+
+
+class PromotionStatus(BaseModel):
+    promotion_id: str
+    status: str  # "running", "completed", "failed"
+    source_registry: str
+    destination_registry: str
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    images: List[ImagePromotion]
+    completed_count: int = 0
+    failed_count: int = 0
+
+
+class PromotionList(BaseModel):
+    promotions: List[PromotionStatus]
@@ -0,0 +1,19 @@
+# backend/app/models/system_models.py - Service readiness models
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class WarmupStep(BaseModel):
+    name: str
+    status: str  # "pending", "running", "completed", "failed"
+    duration_ms: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class ReadinessStatus(BaseModel):
+    ready: bool
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    steps: List[WarmupStep]
@@ -0,0 +1,32 @@
+# backend/app/models/webhook_models.py - Build webhook models
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class WebhookRequest(BaseModel):
+    url: str  # http(s) URL that build events are POSTed to
+    events: List[str] = []  # Event names to deliver; empty = all
+    secret: Optional[str] = None  # Signs each delivery (X-EE-Signature: sha256=<HMAC of the body>)
+
+
+class Webhook(BaseModel):
+    webhook_id: str
+    url: str
+    events: List[str]
+    has_secret: bool
+    created_at: datetime
+    last_seq: int  # Last build event delivered or given up on
+    pending: int = 0  # Build events logged since then (before filtering by events)
+    attempts: int = 0  # Failed deliveries of the batch now pending
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    last_delivered_at: Optional[datetime] = None
+    delivered: int = 0
+    dropped: int = 0  # Events given up on after WEBHOOK_MAX_ATTEMPTS
+
+
+class WebhookList(BaseModel):
+    webhooks: List[Webhook]
+    events: List[str]  # Event names a webhook can subscribe to
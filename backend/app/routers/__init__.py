@@ -1,2 +1,2 @@
 # backend/app/routers/__init__.py
-from . import auth, builds, environments, dashboard, custom_ee
+from . import auth, builds, environments, dashboard, custom_ee, promotions, webhooks
@@ -1,9 +1,17 @@
 # backend/app/routers/builds.py - Build management endpoints
 
-from fastapi import APIRouter, HTTPException
-from typing import List
-from app.models.build_models import BuildRequest, BuildResponse, BuildStatus, BuildListItem
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.models.build_models import (
+    BuildRequest, BuildResponse, BuildStatus, BuildList, BuildLogs,
+    BuildBatchStatusRequest, BuildBatchStatusResponse, BuildProfileList, RebuildPlanRequest, RebuildPlan
+)
 from app.services.build_service import build_service
+from app.services.rebuild_planner_service import rebuild_planner_service
+from app.utils.http_utils import make_etag, etag_matches, not_modified, etag_headers, fast_json_response
 
 router = APIRouter()
 
@@ -23,19 +31,110 @@ async def start_build(build_request: BuildRequest):
         raise HTTPException(status_code=500, detail=f"Failed to start build: {str(e)}")
 
 
+@router.post("/plan", response_model=RebuildPlan)
+async def plan_rebuild(plan_request: RebuildPlanRequest):
+    """Find the environments affected by changed inputs, and with execute=true build just those"""
+    try:
+        return await rebuild_planner_service.plan(plan_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/profiles", response_model=BuildProfileList)
+async def get_build_profiles():
+    """List the build profiles a build request or environment can use"""
+    try:
+        return build_service.get_build_profiles()
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{build_id}/status", response_model=BuildStatus)
-async def get_build_status(build_id: str):
+async def get_build_status(build_id: str, request: Request):
     """Get build status, logs, and results"""
+    headers = None
+    version = await build_service.get_status_version(build_id)
+    if version is not None:
+        etag = make_etag("build-status", version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        headers = etag_headers(etag)
+    
     try:
-        return await build_service.get_build_status(build_id)
+        build_status = await build_service.get_build_status(build_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    
+    return fast_json_response(build_status, headers=headers)
 
 
-@router.get("", response_model=List[BuildListItem])
-async def list_builds():
-    """List all builds (running and completed)"""
-    return build_service.list_builds()
+@router.get("/{build_id}/logs", response_model=BuildLogs)
+async def get_build_logs(
+    build_id: str,
+    start: Optional[int] = Query(None, alias="from", ge=0, description="First line (0-based, inclusive)"),
+    end: Optional[int] = Query(None, alias="to", ge=0, description="Last line (exclusive)"),
+    tail: Optional[int] = Query(None, ge=0, description="Return only the last N lines"),
+    format: str = Query("json", description="'json', or 'text' to stream plain log lines")
+):
+    """Get a line range or the tail of a build's logs, served from the archive once completed"""
+    if format not in ("json", "text"):
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'json' or 'text'")
+    
+    try:
+        if format == "text":
+            return StreamingResponse(
+                await asyncio.to_thread(build_service.stream_build_logs, build_id, start=start, end=end, tail=tail),
+                media_type="text/plain"
+            )
+        return fast_json_response(
+            await asyncio.to_thread(build_service.get_build_logs, build_id, start=start, end=end, tail=tail)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/batch-status", response_model=BuildBatchStatusResponse)
+async def get_build_summaries(batch_request: BuildBatchStatusRequest):
+    """Get summaries for many builds in one call"""
+    try:
+        return await build_service.get_build_summaries(batch_request.build_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("", response_model=BuildList)
+async def list_builds(
+    status: Optional[List[str]] = Query(None, description="Filter by status (repeatable)"),
+    environment: Optional[str] = Query(None, description="Only builds that include this environment"),
+    started_after: Optional[datetime] = Query(None),
+    started_before: Optional[datetime] = Query(None),
+    min_runtime: Optional[float] = Query(None, ge=0, description="Minimum runtime in seconds"),
+    max_runtime: Optional[float] = Query(None, ge=0, description="Maximum runtime in seconds"),
+    sort: str = Query("start_time", description="'start_time' or 'end_time'"),
+    order: str = Query("desc", description="'asc' or 'desc'"),
+    limit: int = Query(50, ge=1),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """List builds (running and completed) with filters and cursor pagination"""
+    try:
+        return await build_service.list_builds(
+            statuses=status,
+            environment=environment,
+            started_after=started_after,
+            started_before=started_before,
+            min_runtime=min_runtime,
+            max_runtime=max_runtime,
+            sort=sort,
+            order=order,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.delete("/{build_id}")
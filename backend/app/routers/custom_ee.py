@@ -1,16 +1,24 @@
 # backend/app/routers/custom_ee.py - Custom EE wizard endpoints
 
-from fastapi import APIRouter, HTTPException
-from app.models.custom_ee_models import CustomEERequest, CustomEEResponse, EETemplates
+from fastapi import APIRouter, File, Form, HTTPException, Request, Response, UploadFile
+from app.models.custom_ee_models import BulkImportResponse, CustomEERequest, CustomEEResponse, EETemplates
 from app.services.custom_ee_service import custom_ee_service
 from app.core.config import settings
+from app.utils.http_utils import make_etag, etag_matches, not_modified, set_etag
 
 router = APIRouter()
 
+# The base image catalog is static configuration
+BASE_IMAGES_ETAG = make_etag("base-images", settings.AVAILABLE_BASE_IMAGES)
+
 
 @router.get("/base-images")
-async def get_available_base_images():
+async def get_available_base_images(request: Request, response: Response):
     """Get list of available base images for custom EE creation"""
+    if etag_matches(request, BASE_IMAGES_ETAG):
+        return not_modified(BASE_IMAGES_ETAG)
+    
+    set_etag(response, BASE_IMAGES_ETAG)
     return {"base_images": settings.AVAILABLE_BASE_IMAGES}
 
 
@@ -27,7 +35,28 @@ async def create_custom_ee(custom_ee: CustomEERequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/import", response_model=BulkImportResponse)
+async def import_environments(file: UploadFile = File(...), build: bool = Form(False)):
+    """Import many environments from a tar/zip archive or multi-document YAML, all or none"""
+    data = await file.read(settings.IMPORT_MAX_BYTES + 1)
+    if len(data) > settings.IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.IMPORT_MAX_BYTES} bytes")
+    try:
+        return await custom_ee_service.import_environments(data, build=build)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/templates", response_model=EETemplates)
-async def get_ee_templates():
+async def get_ee_templates(request: Request, response: Response):
     """Get common templates/examples for custom EE creation"""
+    etag = custom_ee_service.get_templates_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    set_etag(response, etag)
     return custom_ee_service.get_ee_templates()
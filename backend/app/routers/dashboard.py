@@ -1,13 +1,19 @@
 # backend/app/routers/dashboard.py - Dashboard and analytics endpoints
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 from app.models.dashboard_models import DashboardStats
 from app.services.dashboard_service import dashboard_service
+from app.utils.http_utils import make_etag, etag_matches, not_modified, set_etag
 
 router = APIRouter()
 
 
 @router.get("/stats", response_model=DashboardStats)
-async def get_dashboard_stats():
+async def get_dashboard_stats(request: Request, response: Response):
     """Get dashboard statistics for environment health and build monitoring"""
+    etag = make_etag("dashboard-stats", dashboard_service.get_content_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    set_etag(response, etag)
     return dashboard_service.get_dashboard_stats()
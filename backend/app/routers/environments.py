@@ -1,13 +1,49 @@
 # backend/app/routers/environments.py - Environment management endpoints
 
-from fastapi import APIRouter
-from app.models.environment_models import EnvironmentList
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from app.models.environment_models import (
+    EnvironmentList, EnvironmentValidationRequest, EnvironmentValidationReport, DependencySearchResult
+)
 from app.services.environment_service import environment_service
+from app.services.dependency_index_service import dependency_index_service
+from app.utils.http_utils import make_etag, etag_matches, not_modified, set_etag
 
 router = APIRouter()
 
 
 @router.get("", response_model=EnvironmentList)
-async def get_environments():
+async def get_environments(request: Request, response: Response):
     """Get list of available environments"""
+    etag = make_etag("environments", environment_service.get_content_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    set_etag(response, etag)
     return environment_service.get_environments()
+
+
+@router.post("/validate", response_model=EnvironmentValidationReport)
+async def validate_environments(validation_request: EnvironmentValidationRequest = EnvironmentValidationRequest()):
+    """Validate environment definitions and their requirement files (all environments if none are named)"""
+    try:
+        return await environment_service.validate_environments(validation_request.environments)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/search", response_model=DependencySearchResult)
+async def search_dependencies(
+    q: str = Query(..., description="Package, collection or image, optionally with a constraint, e.g. ansible-core<2.17"),
+    kind: Optional[str] = Query(None, description="python, collection, system or image"),
+    constraint: Optional[str] = Query(None, description="Only entries whose declared constraint includes these clauses"),
+    allows: Optional[str] = Query(None, description="Only entries whose declared constraint admits this version"),
+    partial: bool = Query(False, description="Match names containing q")
+):
+    """Find the environments that declare a pip package, collection, bindep package or base image"""
+    try:
+        return await dependency_index_service.search(q, kind=kind, constraint=constraint, allows=allows, partial=partial)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
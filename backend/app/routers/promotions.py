@@ -0,0 +1,33 @@
+# backend/app/routers/promotions.py - Registry promotion endpoints
+
+from fastapi import APIRouter, HTTPException, Query
+from app.models.promotion_models import PromotionRequest, PromotionResponse, PromotionStatus, PromotionList
+from app.services.promotion_service import promotion_service
+
+router = APIRouter()
+
+
+@router.post("", response_model=PromotionResponse)
+async def start_promotion(promotion_request: PromotionRequest):
+    """Copy images from one registry to another, registry to registry"""
+    try:
+        return await promotion_service.start_promotion(promotion_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("", response_model=PromotionList)
+async def list_promotions(limit: int = Query(20, ge=1, le=100)):
+    """Recent promotions with per-image progress"""
+    return await promotion_service.list_promotions(limit)
+
+
+@router.get("/{promotion_id}", response_model=PromotionStatus)
+async def get_promotion(promotion_id: str):
+    """Per-image progress of a promotion"""
+    try:
+        return await promotion_service.get_promotion(promotion_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
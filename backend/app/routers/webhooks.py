@@ -0,0 +1,41 @@
+# backend/app/routers/webhooks.py - Build webhook endpoints
+
+from fastapi import APIRouter, HTTPException
+from app.models.webhook_models import WebhookRequest, Webhook, WebhookList
+from app.services.webhook_service import webhook_service
+
+router = APIRouter()
+
+
+@router.post("", response_model=Webhook)
+async def create_webhook(webhook_request: WebhookRequest):
+    """Register a URL to receive build events from now on"""
+    try:
+        return await webhook_service.create_webhook(webhook_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("", response_model=WebhookList)
+async def list_webhooks():
+    """Registered webhooks with their delivery state, and the events they can subscribe to"""
+    return await webhook_service.list_webhooks()
+
+
+@router.get("/{webhook_id}", response_model=Webhook)
+async def get_webhook(webhook_id: str):
+    """Delivery state of a webhook"""
+    try:
+        return await webhook_service.get_webhook(webhook_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.delete("/{webhook_id}")
+async def delete_webhook(webhook_id: str):
+    """Stop delivering build events to a webhook"""
+    try:
+        await webhook_service.delete_webhook(webhook_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"message": f"Webhook {webhook_id} removed"}
@@ -0,0 +1,132 @@
+# backend/app/services/admission_service.py - Resource-aware build admission
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.build_store import build_store
+from app.utils.container_utils import (
+    get_image_store_path, image_references, image_size_bytes, list_container_images, normalize_image_reference
+)
+from app.utils.host_metrics import admission_shortfalls, combine_reservations, process_tree_usage, read_host_metrics
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MIB = 1024 ** 2
+GIB = 1024 ** 3
+
+# How long the image store location is trusted before asking the runtime again
+STORE_PATH_CACHE_SECONDS = 600
+
+
+class AdmissionService:
+    """Decides when a queued build may start, from live host metrics and each environment's learned needs
+
+    A build reserves the memory, CPUs and image store space its
+    environments needed in past runs (defaults until they have been built
+    here). Running builds are measured through their process trees, which
+    covers Podman builds; Docker builds run in the daemon and only show up
+    in the host metrics.
+    """
+
+    def __init__(self):
+        self._store_path: Optional[str] = None
+        self._store_path_checked = 0.0
+
+    def reservation(self, environments: Sequence[str], parallel: int = 1) -> Dict[str, float]:
+        """Memory and disk bytes and CPUs a build of these environments, `parallel` at a time, is expected to need"""
+        profiles = build_store.get_environment_profiles(environments) if environments else {}
+        defaults = {
+            "memory": settings.ADMISSION_DEFAULT_MEMORY_MB * MIB,
+            "cpus": settings.ADMISSION_DEFAULT_CPUS,
+            "disk": settings.ADMISSION_DEFAULT_DISK_GB * GIB
+        }
+        needs = []
+        for env in environments:
+            profile = profiles.get(env) or {}
+            needs.append({resource: profile.get(resource) if profile.get(resource) is not None else default
+                          for resource, default in defaults.items()})
+        return combine_reservations(needs, parallel)
+
+    def _image_store_path(self) -> Optional[str]:
+        if time.monotonic() - self._store_path_checked > STORE_PATH_CACHE_SECONDS:
+            self._store_path = get_image_store_path()
+            self._store_path_checked = time.monotonic()
+        return self._store_path
+
+    def admit(self, build_id: str, reservation: Dict[str, float]) -> Tuple[bool, List[str]]:
+        """Start a queued build if it is next in line and fits; returns (admitted, what holds it back)"""
+        metrics = read_host_metrics(self._image_store_path()) if settings.ADMISSION_CONTROL else None
+
+        def shortfalls(pending: Dict[str, float]) -> List[str]:
+            if metrics is None:
+                return []
+            return admission_shortfalls(
+                metrics, reservation, pending,
+                min_free_memory=settings.ADMISSION_MIN_FREE_MEMORY_MB * MIB,
+                min_free_disk=settings.ADMISSION_MIN_FREE_DISK_GB * GIB,
+                max_load_per_cpu=settings.ADMISSION_MAX_LOAD_PER_CPU,
+                max_io_pressure=settings.ADMISSION_MAX_IO_PRESSURE
+            )
+
+        return build_store.admit_build(build_id, reservation, settings.MAX_CONCURRENT_BUILDS,
+                                       settings.ADMISSION_RAMP_SECONDS, shortfalls)
+
+    async def track_usage(self, build_info: dict, pid: int):
+        """Measure a build's process tree until it exits, charging it to the environment being built"""
+        usage = build_info["environment_usage"]
+        last_cpu = None
+        while True:
+            sample = await asyncio.to_thread(process_tree_usage, pid)
+            if sample is None:
+                return
+            rss, cpu_seconds = sample
+            # Environments built in parallel share the tree, so only one building alone is measured
+            env = build_info.get("current_environment")
+            if env is not None and env in usage:
+                entry = usage[env]
+                entry["memory"] = max(entry["memory"] or 0, rss)
+                if last_cpu is not None:
+                    entry["cpu_seconds"] += cpu_seconds - last_cpu
+                entry["samples"] += 1
+            last_cpu = cpu_seconds
+            await asyncio.sleep(settings.ADMISSION_SAMPLE_SECONDS)
+
+    def record_usage(self, build_info: dict):
+        """Learn from the environments a build finished successfully"""
+        usage = build_info.get("environment_usage") or {}
+        finished = {env: entry for env, entry in usage.items()
+                    if entry.get("finished") and env in build_info["successful_builds"]}
+        if not finished:
+            return
+
+        image_sizes = {}
+        try:
+            for image in list_container_images():
+                for reference in image_references(image):
+                    image_sizes[normalize_image_reference(reference)] = image_size_bytes(image)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not measure built image sizes: {e}")
+
+        measured = {}
+        for env, entry in finished.items():
+            duration = entry["finished"] - entry["started"]
+            if duration <= 0:
+                continue
+            sampled = entry["samples"] > 1
+            measured[env] = {
+                "memory": entry["memory"] if sampled else None,
+                "cpus": entry["cpu_seconds"] / duration if sampled else None,
+                "disk": image_sizes.get(normalize_image_reference(f"{env}:latest")) or None,
+                "duration": duration
+            }
+        try:
+            build_store.record_environment_usage(measured, settings.ADMISSION_LEARNING_WEIGHT)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record environment resource usage: {e}")
+
+
+# Create global service instance
+admission_service = AdmissionService()
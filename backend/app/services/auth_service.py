@@ -1,13 +1,23 @@
 # backend/app/services/auth_service.py - Authentication Service
 
+import asyncio
 import subprocess
+import time
+from typing import Optional, Tuple
 from app.models.auth_models import RHAuthRequest, RHAuthResponse, AuthStatus, LogoutResponse
 from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 
 class AuthService:
     """Service for Red Hat registry authentication"""
     
+    def __init__(self):
+        # (monotonic time, status) of the last registry login check
+        self._status_cache: Optional[Tuple[float, AuthStatus]] = None
+    
     async def login_redhat_registry(self, auth_request: RHAuthRequest) -> RHAuthResponse:
         """Authenticate with Red Hat registry using podman/docker login"""
         try:
@@ -17,7 +27,7 @@ class AuthService:
                     message="Username and password are required"
                 )
             
-            print(f"🔐 Attempting Red Hat registry login for user: {auth_request.username}")
+            logger.info(f"🔐 Attempting Red Hat registry login for user: {auth_request.username}")
             
             cmd = [
                 settings.CONTAINER_RUNTIME,
@@ -36,9 +46,10 @@ class AuthService:
             )
             
             stdout, stderr = process.communicate(input=auth_request.password)
+            self._status_cache = None
             
             if process.returncode == 0:
-                print(f"✅ Successfully authenticated with Red Hat registry for user: {auth_request.username}")
+                logger.info(f"✅ Successfully authenticated with Red Hat registry for user: {auth_request.username}")
                 return RHAuthResponse(
                     success=True,
                     message="Successfully authenticated with Red Hat registry"
@@ -53,16 +64,28 @@ class AuthService:
                 message=f"{settings.CONTAINER_RUNTIME} not found. Please install {settings.CONTAINER_RUNTIME}."
             )
         except Exception as e:
-            print(f"❌ Red Hat authentication error: {str(e)}")
+            logger.error(f"❌ Red Hat authentication error: {str(e)}")
             return RHAuthResponse(
                 success=False,
                 message="Authentication failed due to system error"
             )
     
     async def get_auth_status(self) -> AuthStatus:
-        """Check if already authenticated with Red Hat registry"""
+        """Check if already authenticated with Red Hat registry (cached briefly)"""
+        if self._status_cache:
+            checked_at, status = self._status_cache
+            if time.monotonic() - checked_at < settings.AUTH_STATUS_CACHE_SECONDS:
+                return status
+        
+        status = await self._check_auth_status()
+        self._status_cache = (time.monotonic(), status)
+        return status
+    
+    async def _check_auth_status(self) -> AuthStatus:
+        """Ask the container runtime whether we are logged in to the Red Hat registry"""
         try:
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 [settings.CONTAINER_RUNTIME, "login", "--get-login", settings.RH_REGISTRY_URL],
                 capture_output=True,
                 text=True,
@@ -95,7 +118,7 @@ class AuthService:
                 message=f"{settings.CONTAINER_RUNTIME} not found"
             )
         except Exception as e:
-            print(f"❌ Error checking RH auth status: {e}")
+            logger.error(f"❌ Error checking RH auth status: {e}")
             return AuthStatus(
                 authenticated=False,
                 username=None,
@@ -104,6 +127,7 @@ class AuthService:
     
     async def logout_redhat_registry(self) -> LogoutResponse:
         """Logout from Red Hat registry"""
+        self._status_cache = None
         try:
             result = subprocess.run(
                 [settings.CONTAINER_RUNTIME, "logout", settings.RH_REGISTRY_URL],
@@ -118,7 +142,7 @@ class AuthService:
             )
             
         except Exception as e:
-            print(f"❌ RH logout error: {e}")
+            logger.error(f"❌ RH logout error: {e}")
             return LogoutResponse(
                 success=False,
                 message="Logout failed due to system error"
@@ -3,17 +3,45 @@
 import asyncio
 import uuid
 import os
+import re
 import tempfile
 import yaml
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
-from app.models.build_models import BuildRequest, BuildResponse, BuildStatus, BuildListItem
+from app.models.build_models import (
+    BuildRequest, BuildResponse, BuildStatus, BuildListItem, BuildList, BuildLogs, BuildBatchStatusResponse,
+    BuildProfile, BuildProfileList
+)
 from app.core.config import settings
 from app.utils.container_utils import validate_container_runtime
 from app.utils.file_utils import cleanup_temp_file
+from app.utils.build_schedule import plan_build_lanes
+from app.utils.build_profiles import builder_arguments, builder_arguments_key, normalize_build_profile
+from app.utils.dependency_index import dependency_key
+from app.utils.stream_utils import read_line_batches
+from app.utils.log_archive import LOG_ARCHIVE_SUFFIX, LogArchive, write_log_archive, open_log_archive
+from app.services.build_store import SharedLogLines, build_store
+from app.services.environment_service import environment_service
+from app.services.publish_service import publish_service
+from app.services.image_gc_service import image_gc_service
+from app.services.admission_service import admission_service
+from app.services.eta_service import eta_service
+from app.services.isolation_service import isolation_service
+from app.services.preflight_service import preflight_service
+from app.services.dependency_index_service import dependency_index_service
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Cheap pre-filter for the lines _parse_build_results cares about
+RESULT_MARKERS = re.compile(r"✅ Successfully built|Complete!|❌ Failed to build|Error:")
+# The playbook task running ansible-builder once per environment, and its per-item results
+BUILD_TASK_MARKER = "TASK [Build execution environments]"
+ITEM_RESULT = re.compile(r"^(changed|ok|failed|fatal|skipping): \[[^\]]+\] (?:=> )?\(item=([^)]+)\)")
 
 
 class BuildService:
@@ -23,6 +51,43 @@ class BuildService:
         # Enhanced storage for builds - keeps completed builds for configured time
         self.running_builds: Dict[str, dict] = {}
         self.completed_builds: Dict[str, dict] = {}
+        self._history_checked = False
+        self._admission_task: Optional[asyncio.Task] = None
+        self._admission_wakeup = asyncio.Event()
+    
+    @property
+    def state_version(self) -> int:
+        """Changes whenever a build starts or finishes in any worker"""
+        try:
+            return build_store.get_state_version()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read build state version: {e}")
+            return 0
+    
+    def _check_interrupted_builds(self):
+        """Fail builds still marked running by worker processes that have exited"""
+        if self._history_checked:
+            return
+        interrupted = build_store.mark_interrupted()
+        if interrupted:
+            logger.warning(f"⚠️ Marked {interrupted} interrupted builds from a previous run as failed")
+        self._history_checked = True
+    
+    def _record_build(self, build_id: str, build_info: dict, event: Optional[str] = None):
+        """Persist a build's state to the shared build store"""
+        try:
+            self._check_interrupted_builds()
+            build_store.record_build(build_id, build_info, event)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record build {build_id} in history: {e}")
+    
+    def _record_events(self, build_id: str, event: str, events: List[dict]):
+        """Log build events of one kind for webhooks, in order"""
+        try:
+            for data in events:
+                build_store.record_event(build_id, event, data)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record {event} events for build {build_id}: {e}")
     
     def cleanup_old_builds(self):
         """Remove completed builds older than configured hours"""
@@ -34,30 +99,290 @@ class BuildService:
                 builds_to_remove.append(build_id)
         
         for build_id in builds_to_remove:
-            print(f"🧹 Cleaning up old build: {build_id}")
+            logger.info(f"🧹 Cleaning up old build: {build_id}")
             del self.completed_builds[build_id]
+        
+        history_cutoff = time.time() - settings.BUILD_HISTORY_RETENTION_DAYS * 86400
+        try:
+            build_store.prune(history_cutoff)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not prune build history: {e}")
+        
+        self.cleanup_old_log_archives()
+    
+    def cleanup_old_log_archives(self):
+        """Remove archived build logs older than the configured retention"""
+        archive_dir = Path(settings.LOG_ARCHIVE_DIR)
+        if not archive_dir.exists():
+            return
+        
+        cutoff = time.time() - settings.LOG_ARCHIVE_RETENTION_DAYS * 86400
+        for archive_path in archive_dir.glob(f"*{LOG_ARCHIVE_SUFFIX}"):
+            try:
+                if archive_path.stat().st_mtime < cutoff:
+                    archive_path.unlink()
+                    logger.info(f"🧹 Removed expired log archive: {archive_path.name}")
+            except OSError as e:
+                logger.warning(f"⚠️ Could not remove log archive {archive_path}: {e}")
     
     def get_build_info(self, build_id: str) -> Optional[dict]:
-        """Get build info from either running or completed builds"""
+        """Get build info from this worker's builds, or from the shared store for other workers' builds"""
         if build_id in self.running_builds:
             return self.running_builds[build_id]
         
         if build_id in self.completed_builds:
             return self.completed_builds[build_id]
         
-        return None
+        return self._load_shared_build(build_id)
     
-    def move_to_completed(self, build_id: str):
+    async def _find_build_info(self, build_id: str) -> Optional[dict]:
+        """get_build_info, reading builds this worker does not own off the event loop"""
+        if build_id in self.running_builds or build_id in self.completed_builds:
+            return self.get_build_info(build_id)
+        return await asyncio.to_thread(self._load_shared_build, build_id)
+    
+    def _load_shared_build(self, build_id: str) -> Optional[dict]:
+        """Build info for a build this worker does not own, read from the shared store"""
+        try:
+            state = build_store.get_build_state(build_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read shared state of build {build_id}: {e}")
+            return None
+        if not state:
+            return None
+        
+        return {
+            "process": None,
+            "environments": state["environments"],
+            "status": state["status"],
+            "start_time": datetime.fromtimestamp(state["start_time"]),
+            "end_time": datetime.fromtimestamp(state["end_time"]) if state["end_time"] else None,
+            "return_code": state["return_code"],
+            "logs": None,
+            "log_count": state["log_count"],
+            "log_archive": state["log_archive"],
+            "successful_builds": state["successful_builds"],
+            "failed_builds": state["failed_builds"],
+            "published": state["published"],
+            "publish_failures": state["publish_failures"],
+            "eta": state["eta"],
+            "progress": state["progress"],
+            "predicted_durations": state["predicted_durations"],
+            "shared_version": state["version"]
+        }
+    
+    async def get_status_version(self, build_id: str) -> Optional[list]:
+        """Cheap version of a build's status response (None if the build is unknown)"""
+        build_info = await self._find_build_info(build_id)
+        if not build_info:
+            return None
+        
+        if "shared_version" in build_info:
+            return [build_id, build_info["status"], "shared", build_info["shared_version"]]
+        
+        process = build_info.get("process")
+        logs = build_info.get("logs")
+        return [
+            build_id,
+            build_info.get("status"),
+            process.returncode if process else None,
+            build_info.get("return_code"),
+            build_id in self.running_builds,
+            len(logs) if logs is not None else build_info.get("log_count"),
+            len(build_info.get("successful_builds", [])),
+            len(build_info.get("failed_builds", [])),
+            bool(build_info.get("publishing")),
+            len(build_info.get("published", [])) + len(build_info.get("publish_failures", [])),
+            build_info.get("eta"),
+            build_info.get("progress")
+        ]
+    
+    def get_log_archive_path(self, build_id: str) -> Optional[Path]:
+        """Get the archive location for a build's logs (None for malformed IDs)"""
+        try:
+            uuid.UUID(build_id)
+        except ValueError:
+            return None
+        return Path(settings.LOG_ARCHIVE_DIR) / f"{build_id}{LOG_ARCHIVE_SUFFIX}"
+    
+    def get_logs(self, build_id: str, build_info: dict) -> List[str]:
+        """Get all log lines of a build, from memory, its archive or the shared store"""
+        if build_info.get("logs") is not None:
+            return build_info["logs"]
+        
+        if not build_info.get("log_archive"):
+            return build_store.get_log_lines(build_id)
+        
+        archive = open_log_archive(build_info["log_archive"])
+        return archive.read_lines() if archive else []
+    
+    def get_build_logs(self, build_id: str, start: Optional[int] = None,
+                       end: Optional[int] = None, tail: Optional[int] = None) -> BuildLogs:
+        """Get a line range (or the tail) of a build's logs"""
+        logs, archive = self._open_log_source(build_id)
+        total_lines = len(logs) if archive is None else archive.total_lines
+        start, end = self._resolve_log_range(total_lines, start, end, tail)
+        lines = logs[start:end] if archive is None else archive.read_lines(start, end)
+        
+        return BuildLogs.model_construct(
+            build_id=build_id,
+            total_lines=total_lines,
+            start=start,
+            end=start + len(lines),
+            lines=lines,
+            archived=archive is not None
+        )
+    
+    def stream_build_logs(self, build_id: str, start: Optional[int] = None,
+                          end: Optional[int] = None, tail: Optional[int] = None) -> Iterator[str]:
+        """Get a line range (or the tail) of a build's logs as newline-terminated text blocks
+        
+        The build is resolved eagerly so a missing build raises before streaming starts.
+        """
+        logs, archive = self._open_log_source(build_id)
+        total_lines = len(logs) if archive is None else archive.total_lines
+        start, end = self._resolve_log_range(total_lines, start, end, tail)
+        
+        def generate() -> Iterator[str]:
+            if archive is not None:
+                chunks = archive.iter_chunks(start, end)
+            else:
+                step = settings.LOG_ARCHIVE_CHUNK_LINES
+                chunks = (logs[i:min(i + step, end)] for i in range(start, end, step))
+            for chunk_lines in chunks:
+                if chunk_lines:
+                    yield "\n".join(chunk_lines) + "\n"
+        
+        return generate()
+    
+    def _open_log_source(self, build_id: str) -> tuple[Optional[List[str]], Optional[LogArchive]]:
+        """Find a build's logs: the live list while running, otherwise its archive"""
+        build_info = self.get_build_info(build_id)
+        if build_info and build_info.get("logs") is not None:
+            return build_info["logs"], None
+        
+        if build_info and not build_info.get("log_archive"):
+            # Running in another worker - read the lines it has shared so far
+            return SharedLogLines(build_store, build_id, build_info.get("log_count") or 0), None
+        
+        archive_path = build_info["log_archive"] if build_info else self.get_log_archive_path(build_id)
+        archive = open_log_archive(archive_path) if archive_path else None
+        if not archive:
+            raise ValueError(f"Logs for build {build_id} not found")
+        return None, archive
+    
+    def _resolve_log_range(self, total_lines: int, start: Optional[int],
+                           end: Optional[int], tail: Optional[int]) -> tuple[int, int]:
+        """Clamp a requested line range to the available lines"""
+        if tail is not None:
+            return max(0, total_lines - tail), total_lines
+        
+        start = min(max(0, start or 0), total_lines)
+        end = total_lines if end is None else min(max(start, end), total_lines)
+        return start, end
+    
+    def _archive_logs(self, build_id: str, build_info: dict):
+        """Write a finished build's logs to a compressed archive and release them from memory"""
+        archive_path = self.get_log_archive_path(build_id)
+        try:
+            line_count = write_log_archive(archive_path, build_info["logs"], settings.LOG_ARCHIVE_CHUNK_LINES)
+            build_info["log_archive"] = str(archive_path)
+            build_info["log_count"] = line_count
+            build_info["logs"] = None
+            logger.info(f"🗜️ Archived {line_count} log lines for build {build_id}")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not archive logs for build {build_id}, keeping them in memory: {e}")
+            return
+        
+        try:
+            build_store.set_log_archive(build_id, str(archive_path), line_count)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not share log archive of build {build_id}: {e}")
+    
+    async def _share_logs(self, build_id: str, build_info: dict):
+        """Copy log lines captured since the last call to the shared store"""
+        async with build_info["share_lock"]:
+            logs = build_info.get("logs")
+            if logs is None:
+                return
+            first_seq = build_info["shared_lines"]
+            new_lines = logs[first_seq:]
+            if not new_lines:
+                return
+            build_info["shared_lines"] = first_seq + len(new_lines)
+            try:
+                await asyncio.to_thread(build_store.append_logs, build_id, first_seq, new_lines)
+            except Exception as e:
+                build_info["shared_lines"] = first_seq
+                logger.warning(f"⚠️ Could not share logs of build {build_id}: {e}")
+    
+    async def _sync_shared_state(self, build_id: str, build_info: dict):
+        """While a build runs here, share its logs and act on cancel requests from other workers"""
+        while build_id in self.running_builds:
+            await asyncio.sleep(settings.BUILD_STATE_SYNC_SECONDS)
+            if build_id not in self.running_builds:
+                break
+            await self._share_logs(build_id, build_info)
+            if time.monotonic() - build_info.get("eta_refreshed", 0) >= settings.ETA_REFRESH_SECONDS:
+                await self._refresh_eta(build_id, build_info)
+            
+            try:
+                cancel_requested = await asyncio.to_thread(build_store.is_cancel_requested, build_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not check cancel requests for build {build_id}: {e}")
+                continue
+            if cancel_requested and build_info.get("status") in ("queued", "running"):
+                logger.info(f"🛑 Cancelling build {build_id} on request from another worker")
+                try:
+                    await self.cancel_build(build_id)
+                except (ValueError, RuntimeError) as e:
+                    logger.warning(f"⚠️ Could not cancel build {build_id}: {e}")
+                break
+    
+    async def _refresh_eta(self, build_id: str, build_info: dict):
+        """Recompute a queued or running build's ETA and progress, sharing them when they move"""
+        build_info["eta_refreshed"] = time.monotonic()
+        
+        def outlook():
+            shared_ids = list(set(build_info["shared_builds"].values()))
+            shared_etas = [summary["eta"] for summary in build_store.get_builds(shared_ids).values()
+                           if summary["eta"] and summary["status"] in ("queued", "running")]
+            queue_wait = 0.0
+            if build_info["status"] == "queued":
+                queue_wait = eta_service.queue_wait(*build_store.get_queue_outlook(build_id))
+            return shared_etas, queue_wait
+        
+        try:
+            shared_etas, queue_wait = await asyncio.to_thread(outlook)
+            eta, progress = eta_service.estimate(build_info, shared_etas, queue_wait)
+            if build_id not in self.running_builds:
+                return
+            build_info["eta"], build_info["progress"] = eta, progress
+            # Predictions drift every second; only share changes a client would notice
+            shared_eta, shared_progress = build_info.get("shared_eta") or (None, None)
+            if shared_eta is None or abs(eta - shared_eta) >= 2 or abs(progress - shared_progress) >= 1:
+                await asyncio.to_thread(build_store.set_progress, build_id, eta, progress)
+                build_info["shared_eta"] = (eta, progress)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not update ETA of build {build_id}: {e}")
+    
+    async def move_to_completed(self, build_id: str):
         """Move a build from running to completed storage"""
         if build_id in self.running_builds:
             build_info = self.running_builds[build_id]
             build_info["end_time"] = datetime.now()
+            build_info["eta"] = None
+            if build_info.get("status") == "completed":
+                build_info["progress"] = 100.0
             self.completed_builds[build_id] = build_info
             del self.running_builds[build_id]
-            print(f"✅ Moved build {build_id} to completed builds")
-            print(f"📊 Running builds: {len(self.running_builds)}, Completed: {len(self.completed_builds)}")
+            # Room may have freed up for queued builds
+            self._admission_wakeup.set()
+            await asyncio.to_thread(self._record_build, build_id, build_info, event=build_info.get("status"))
+            logger.info(f"✅ Moved build {build_id} to completed builds")
+            logger.debug("📊 Running builds: %d, Completed: %d", len(self.running_builds), len(self.completed_builds))
         else:
-            print(f"⚠️ Attempted to move non-existent build {build_id}")
+            logger.warning(f"⚠️ Attempted to move non-existent build {build_id}")
     
     async def start_build(self, build_request: BuildRequest) -> BuildResponse:
         """Start building selected environments using ansible-playbook"""
@@ -67,6 +392,17 @@ class BuildService:
         if not selected_environments:
             raise ValueError("No environments specified")
         
+        publish_registries = []
+        if build_request.publish:
+            publish_registries = [registry.strip().rstrip("/") for registry in
+                                  (build_request.publish_registries or settings.PUBLISH_REGISTRIES) if registry.strip()]
+            if not publish_registries:
+                raise ValueError("No publish registries given or configured (PUBLISH_REGISTRIES)")
+        
+        build_profiles, builder_args = self._resolve_build_profiles(
+            build_request.profile, selected_environments, container_runtime
+        )
+        
         # Validate environments exist
         environments_dir = Path(settings.ENVIRONMENTS_DIR)
         if not environments_dir.exists():
@@ -85,266 +421,723 @@ class BuildService:
         # Validate container runtime
         await validate_container_runtime()
         
-        # Check for concurrent build limit
-        if len(self.running_builds) >= settings.MAX_CONCURRENT_BUILDS:
-            raise RuntimeError(f"Maximum concurrent builds ({settings.MAX_CONCURRENT_BUILDS}) reached")
-        
-        # Create temporary variables file
-        variables = {
-            "selected_environments": selected_environments,
-            "container_runtime": container_runtime
-        }
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as temp_file:
-            yaml.dump(variables, temp_file, default_flow_style=False)
-            temp_vars_file = temp_file.name
-        
-        # Prepare ansible-playbook command
-        cmd = [
-            "ansible-playbook",
-            settings.PLAYBOOK_PATH,
-            "-e", f"@{temp_vars_file}",
-            "-v"
-        ]
+        # Resolve dependencies before taking a build slot, so impossible sets fail in seconds
+        preflight_logs = []
+        if settings.PREFLIGHT_ENABLED:
+            errors, warnings = await preflight_service.check_environments(
+                {env: environments_dir / env for env in selected_environments}
+            )
+            if errors:
+                raise ValueError("Dependency preflight failed: " + "; ".join(
+                    f"{env}: {', '.join(env_errors)}" for env, env_errors in errors.items()
+                ))
+            preflight_logs = [f"⚠️ Dependency preflight inconclusive for {env}: {'; '.join(env_warnings)}"
+                              for env, env_warnings in warnings.items()] or ["🔎 Dependency preflight passed"]
         
-        # Start build process
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,
-            cwd=os.getcwd()
-        )
+        # What each environment is built from, so identical in-flight builds can be joined
+        # and durations are predicted from builds of the same inputs and options
+        input_keys = await asyncio.to_thread(lambda: {
+            env: f"{container_runtime}:{environment_service.environment_digest(environments_dir / env)}"
+                 f":{builder_arguments_key(builder_args[env])}"
+            for env in selected_environments
+        })
+        predicted_durations = await asyncio.to_thread(eta_service.predict, selected_environments, input_keys)
         
         # Generate unique build ID
         build_id = str(uuid.uuid4())
         
-        print(f"🚀 Created build ID: {build_id}")
-        
-        # Store process info for monitoring
-        self.running_builds[build_id] = {
-            "process": process,
+        build_info = {
+            "process": None,
             "environments": selected_environments,
             "container_runtime": container_runtime,
-            "temp_vars_file": temp_vars_file,
+            "temp_vars_file": None,
+            "input_keys": input_keys,
+            "build_profiles": build_profiles,
+            "builder_args": builder_args,
+            "predicted_durations": predicted_durations,
+            "shared_builds": {},
             "status": "running",
             "start_time": datetime.now(),
             "end_time": None,
             "return_code": None,
-            "logs": [
-                f"🚀 Build started at {datetime.now().strftime('%H:%M:%S')}",
-                f"📦 Building environments: {', '.join(selected_environments)}",
-                f"🔧 Container runtime: {container_runtime}",
-                f"📋 Command: {' '.join(cmd[:3])} [...]",
-                "⏳ Starting ansible-playbook..."
-            ],
+            "logs": [f"🚀 Build started at {datetime.now().strftime('%H:%M:%S')}"],
             "successful_builds": [],
             "failed_builds": [],
-            "created_at": time.time()
+            "publish_registries": publish_registries,
+            "published": [],
+            "publish_failures": [],
+            "created_at": time.time(),
+            "shared_lines": 0,
+            "share_lock": asyncio.Lock()
         }
         
-        print(f"✅ Stored build {build_id}. Total running builds: {len(self.running_builds)}")
+        # Join the queue shared by all worker processes, leaving environments
+        # already building from the same inputs to their builds
+        recorded, shared_builds = await asyncio.to_thread(
+            build_store.reserve_build, build_id, build_info, settings.BUILD_QUEUE_MAX,
+            coalesce=settings.BUILD_COALESCING, join_whole=not publish_registries
+        )
+        if not recorded:
+            if not shared_builds:
+                raise RuntimeError(f"Build queue is full ({settings.BUILD_QUEUE_MAX} builds waiting)")
+            joined_id = next(iter(shared_builds.values()))
+            logger.info(
+                f"🔗 Joined in-flight build {joined_id} for environments: {selected_environments}",
+                extra={"build_id": joined_id, "environments": selected_environments}
+            )
+            return BuildResponse(
+                build_id=joined_id,
+                status="joined",
+                environments=selected_environments,
+                message=f"Joined build {joined_id}, which is already building these environments"
+            )
         
-        # Start background task to capture output
-        asyncio.create_task(self._capture_build_output(build_id))
+        logger.info(f"🚀 Created build ID: {build_id}")
+        build_info["shared_builds"] = shared_builds
+        build_info["own_environments"] = [env for env in selected_environments if env not in shared_builds]
+        # Longest expected builds first, so no long one is left to run alone at the end
+        build_info["build_lanes"] = await self._plan_build_lanes(build_info)
+        own_environments = [env for lane in build_info["build_lanes"] for env in lane]
+        build_info["own_environments"] = own_environments
+        
+        build_info["logs"] += [
+            *([f"📦 Building environments: {', '.join(own_environments)}"] if own_environments else []),
+            *([f"⚡ Building in {len(build_info['build_lanes'])} parallel lanes: "
+               + " | ".join(', '.join(lane) for lane in build_info["build_lanes"])]
+              if len(build_info["build_lanes"]) > 1 else []),
+            *(f"🔗 {env} is already building from identical inputs in build {shared_id}; sharing its result"
+              for env, shared_id in shared_builds.items()),
+            f"🔧 Container runtime: {container_runtime}",
+            (f"🎛️ Build profile: {next(iter(build_profiles.values()))}"
+             if len(set(build_profiles.values())) == 1
+             else f"🎛️ Build profiles: {', '.join(f'{env}={name}' for env, name in build_profiles.items())}"),
+            *([f"📤 Publishing to: {', '.join(publish_registries)}"] if publish_registries else []),
+            *preflight_logs
+        ]
+        # Kept running until the shared environments' builds finish
+        build_info["waiting"] = bool(shared_builds)
+        self.running_builds[build_id] = build_info
+        
+        admitted = True
+        if own_environments:
+            build_info["reservation"] = await asyncio.to_thread(
+                admission_service.reservation, own_environments, len(build_info["build_lanes"])
+            )
+            try:
+                admitted = await self._try_admit(build_id, build_info)
+            except Exception:
+                if build_info["status"] == "queued":
+                    build_info["status"] = "failed"
+                    await self.move_to_completed(build_id)
+                raise
+            if not admitted:
+                self._ensure_admission_loop()
+        else:
+            asyncio.create_task(self._capture_build_output(build_id))
+        
+        logger.info(f"✅ Stored build {build_id}. Total running builds: {len(self.running_builds)}")
+        await self._share_logs(build_id, build_info)
+        await self._refresh_eta(build_id, build_info)
+        
+        # Share logs with other workers and act on their cancel requests
+        asyncio.create_task(self._sync_shared_state(build_id, build_info))
         
         # Cleanup old builds
         self.cleanup_old_builds()
         
-        print(f"🎯 Started build {build_id} for environments: {selected_environments}")
+        if not admitted:
+            return BuildResponse(
+                build_id=build_id,
+                status="queued",
+                environments=selected_environments,
+                message=f"Queued building {len(own_environments)} environments: {build_info['queue_reason']}"
+            )
+        
+        logger.info(
+            f"🎯 Started build {build_id} for environments: {selected_environments}",
+            extra={"build_id": build_id, "environments": selected_environments}
+        )
         
+        message = f"Started building {len(own_environments)} environments"
+        if shared_builds:
+            message = (f"{message}, sharing {len(shared_builds)} with builds already in flight" if own_environments
+                       else f"Sharing {len(shared_builds)} environments with builds already in flight")
         return BuildResponse(
             build_id=build_id,
             status="started",
             environments=selected_environments,
-            message=f"Started building {len(selected_environments)} environments"
+            message=message
         )
     
+    def get_build_profiles(self) -> BuildProfileList:
+        """Configured build profiles with every option filled in"""
+        return BuildProfileList(
+            profiles={name: BuildProfile(**normalize_build_profile(name, profile))
+                      for name, profile in settings.BUILD_PROFILES.items()},
+            default_profile=settings.DEFAULT_BUILD_PROFILE,
+            environment_profiles=settings.ENVIRONMENT_BUILD_PROFILES
+        )
+    
+    def _resolve_build_profiles(self, requested: Optional[str], environments: Sequence[str],
+                                container_runtime: str) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+        """Each environment's build profile and the ansible-builder arguments it stands for"""
+        profiles = {env: requested or settings.ENVIRONMENT_BUILD_PROFILES.get(env) or settings.DEFAULT_BUILD_PROFILE
+                    for env in environments}
+        arguments = {}
+        for name in set(profiles.values()):
+            if name not in settings.BUILD_PROFILES:
+                raise ValueError(f"Unknown build profile '{name}'; configured: {', '.join(settings.BUILD_PROFILES)}")
+            arguments[name] = builder_arguments(normalize_build_profile(name, settings.BUILD_PROFILES[name]),
+                                                container_runtime)
+        return profiles, {env: arguments[name] for env, name in profiles.items()}
+    
+    async def _plan_build_lanes(self, build_info: dict) -> List[List[str]]:
+        """Spread a build's own environments over BUILD_PARALLELISM lanes, longest expected first"""
+        own_environments = build_info["own_environments"]
+        if len(own_environments) <= 1:
+            return [own_environments] if own_environments else []
+        
+        # An environment built on another one of this build must wait for that image
+        await dependency_index_service.refresh()
+        names = {env.lower(): env for env in own_environments}
+        builds_on = {}
+        for env, reference in dependency_index_service.base_images().items():
+            base = names.get(dependency_key("image", reference).removeprefix("localhost/"))
+            if env in own_environments and base:
+                builds_on[env] = base
+        
+        return plan_build_lanes(own_environments, build_info["predicted_durations"], builds_on,
+                                settings.BUILD_PARALLELISM)
+    
+    async def _try_admit(self, build_id: str, build_info: dict) -> bool:
+        """Start a queued build if the host has room for it now"""
+        admitted, blockers = await asyncio.to_thread(admission_service.admit, build_id, build_info["reservation"])
+        if build_info["status"] != "queued":
+            # Cancelled while admission was being decided
+            return False
+        if not admitted:
+            # Metrics move all the time; log only when what blocks the build changes
+            kinds = [blocker.split(":")[0] for blocker in blockers]
+            if kinds != build_info.get("queue_blockers"):
+                build_info["queue_blockers"] = kinds
+                build_info["logs"].append(f"⏸️ Queued: {'; '.join(blockers)}")
+            build_info["queue_reason"] = "; ".join(blockers)
+            return False
+        
+        if build_info.get("queue_blockers") is not None:
+            build_info["logs"].append(f"▶️ Admitted at {datetime.now().strftime('%H:%M:%S')}")
+        await self._launch_build(build_id, build_info)
+        return True
+    
+    async def _launch_build(self, build_id: str, build_info: dict):
+        """Start ansible-playbook for an admitted build's own environments"""
+        build_info["status"] = "running"
+        build_info["admitted_at"] = time.time()
+        
+        # Create temporary variables file
+        variables = {
+            "selected_environments": build_info["own_environments"],
+            "container_runtime": build_info["container_runtime"]
+        }
+        variables["builder_args"] = {env: build_info["builder_args"][env] for env in build_info["own_environments"]}
+        lanes = build_info["build_lanes"]
+        if len(lanes) > 1:
+            variables["build_lanes"] = lanes
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as temp_file:
+            yaml.dump(variables, temp_file, default_flow_style=False)
+            build_info["temp_vars_file"] = temp_file.name
+        
+        # Prepare ansible-playbook command
+        cmd = [
+            settings.ANSIBLE_PLAYBOOK_BIN,
+            settings.PLAYBOOK_PATH,
+            "-e", f"@{build_info['temp_vars_file']}",
+            "-v"
+        ]
+        if len(lanes) > 1:
+            cmd += ["--forks", str(len(lanes))]
+        build_info["logs"].append(f"📋 Command: {' '.join(cmd[:3])} [...]")
+        
+        # Keep heavy builds from starving the API and each other
+        cmd, build_info["cgroup"], isolation_note = await asyncio.to_thread(isolation_service.isolate, build_id, cmd)
+        build_info["logs"] += [*([isolation_note] if isolation_note else []), "⏳ Starting ansible-playbook..."]
+        
+        # Start build process
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=os.getcwd()
+            )
+        except Exception as e:
+            build_info.update(status="failed", return_code=-1)
+            build_info["logs"].append(f"❌ Could not start ansible-playbook: {e}")
+            cleanup_temp_file(build_info["temp_vars_file"])
+            isolation_service.release(build_info)
+            await self.move_to_completed(build_id)
+            raise
+        
+        # Store process info for monitoring
+        build_info["process"] = process
+        build_info["environment_usage"] = {
+            env: {"started": None, "finished": None, "memory": None, "cpu_seconds": 0.0, "samples": 0}
+            for env in build_info["own_environments"]
+        }
+        
+        # Start background tasks to capture output and measure what the build uses
+        asyncio.create_task(self._capture_build_output(build_id))
+        asyncio.create_task(admission_service.track_usage(build_info, process.pid))
+    
+    def _ensure_admission_loop(self):
+        if self._admission_task is None or self._admission_task.done():
+            self._admission_task = asyncio.create_task(self._admit_queued_builds())
+    
+    async def _admit_queued_builds(self):
+        """Retry admission of this worker's queued builds, oldest first, while any are queued"""
+        while True:
+            queued = sorted((build_info["created_at"], build_id) for build_id, build_info in self.running_builds.items()
+                            if build_info["status"] == "queued")
+            if not queued:
+                return
+            
+            # A build finishing here frees room at once; other workers' builds are noticed on the next retry
+            self._admission_wakeup.clear()
+            try:
+                await asyncio.wait_for(self._admission_wakeup.wait(), settings.ADMISSION_RETRY_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            
+            for _, build_id in queued:
+                build_info = self.running_builds.get(build_id)
+                if not build_info or build_info["status"] != "queued":
+                    continue
+                try:
+                    if not await self._try_admit(build_id, build_info):
+                        break
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not start queued build {build_id}: {e}", extra={"build_id": build_id})
+    
     async def get_build_status(self, build_id: str) -> BuildStatus:
         """Get build status, logs, and results"""
-        print(f"🔍 Looking for build: {build_id}")
+        logger.debug("🔍 Looking for build: %s", build_id)
         
-        build_info = self.get_build_info(build_id)
+        build_info = await self._find_build_info(build_id)
         if not build_info:
-            print(f"❌ Build {build_id} not found!")
+            logger.debug("❌ Build %s not found", build_id)
             raise ValueError(f"Build {build_id} not found")
         
-        print(f"✅ Found build {build_id} with status: {build_info.get('status')}")
-        
-        process = build_info.get("process")
+        logger.debug("✅ Found build %s with status: %s", build_id, build_info.get('status'))
         
-        # Determine status
+        # Determine status - the capture task records a build's outcome and moves it to completed
+        status = build_info.get("status")
         if build_id in self.running_builds:
-            if process and process.returncode is None:
+            if build_info.get("publishing") and status != "cancelled":
+                # Its outcome stands only once the images are pushed
                 status = "running"
-                end_time = None
-            else:
-                status = "completed" if build_info.get("return_code") == 0 else "failed"
-                end_time = build_info.get("end_time")
-                
-                # Move to completed if not already moved
-                if build_id in self.running_builds:
-                    self.move_to_completed(build_id)
-        else:
+        elif status not in ("queued", "running", "cancelled", "completed", "failed"):
             status = "completed" if build_info.get("return_code") == 0 else "failed"
-            end_time = build_info.get("end_time")
+        end_time = build_info.get("end_time")
         
-        # Update status in build_info
-        build_info["status"] = status
+        # Decompressing an archived log is CPU work - keep it off the event loop
+        if build_info.get("logs") is not None:
+            logs = build_info["logs"]
+        else:
+            logs = await asyncio.to_thread(self.get_logs, build_id, build_info)
         
-        return BuildStatus(
+        # Internal state is trusted, so skip re-validating every log line
+        return BuildStatus.model_construct(
             build_id=build_id,
             status=status,
             environments=build_info["environments"],
             start_time=build_info["start_time"],
             end_time=end_time,
             return_code=build_info.get("return_code"),
-            logs=build_info.get("logs", []),
+            logs=logs,
             successful_builds=build_info.get("successful_builds", []),
-            failed_builds=build_info.get("failed_builds", [])
+            failed_builds=build_info.get("failed_builds", []),
+            published=build_info.get("published", []),
+            publish_failures=build_info.get("publish_failures", []),
+            eta=datetime.fromtimestamp(build_info["eta"]) if build_info.get("eta") else None,
+            progress=build_info.get("progress"),
+            predicted_durations=build_info.get("predicted_durations") or {},
+            build_profiles=build_info.get("build_profiles") or {}
         )
     
     async def cancel_build(self, build_id: str) -> dict:
         """Cancel a running build"""
-        build_info = self.get_build_info(build_id)
+        build_info = await self._find_build_info(build_id)
         if not build_info:
             raise ValueError("Build not found")
         
         process = build_info.get("process")
         
+        if build_id not in self.running_builds and build_info.get("status") in ("queued", "running"):
+            return await self._cancel_shared_build(build_id)
+        
+        if build_id in self.running_builds and build_info.get("status") == "queued":
+            build_info["status"] = "cancelled"
+            build_info["logs"].append(f"❌ Build cancelled at {datetime.now().strftime('%H:%M:%S')} before it started")
+            await self._share_logs(build_id, build_info)
+            await self.move_to_completed(build_id)
+            await asyncio.to_thread(self._archive_logs, build_id, build_info)
+            return {"message": "Build cancelled successfully"}
+        
+        if build_id in self.running_builds and build_info.get("waiting") and not (process and process.returncode is None):
+            # Only waiting for builds it shares environments with - those keep running for their own requesters
+            build_info["status"] = "cancelled"
+            if process is None:
+                # Ran nothing of its own, like a build cancelled while queued
+                build_info["return_code"] = None
+            build_info["logs"].append(f"❌ Build cancelled at {datetime.now().strftime('%H:%M:%S')}")
+            if build_info.get("shared_task"):
+                build_info["shared_task"].cancel()
+            return {"message": "Build cancelled successfully"}
+        
+        if build_id in self.running_builds and build_info.get("publishing"):
+            # The playbook is done; stopping the pushes lets the capture task finish the build
+            build_info["status"] = "cancelled"
+            build_info["logs"].append(f"❌ Publishing cancelled at {datetime.now().strftime('%H:%M:%S')}")
+            build_info["publish_task"].cancel()
+            return {"message": "Build cancelled successfully"}
+        
         if build_id in self.running_builds and process and process.returncode is None:
             try:
+                build_info["status"] = "cancelled"
+                build_info["logs"].append(f"❌ Build cancelled at {datetime.now().strftime('%H:%M:%S')}")
+                
                 process.terminate()
                 await asyncio.sleep(2)
                 if process.returncode is None:
                     process.kill()
                 
-                build_info["status"] = "cancelled"
-                build_info["logs"].append(f"❌ Build cancelled at {datetime.now().strftime('%H:%M:%S')}")
-                
-                self.move_to_completed(build_id)
-                
+                # The capture task sees the process exit and moves the build to completed
                 return {"message": "Build cancelled successfully"}
             except Exception as e:
                 raise RuntimeError(f"Failed to cancel build: {str(e)}")
         else:
             raise ValueError("Build is not running")
     
-    def list_builds(self) -> List[BuildListItem]:
-        """List all builds (running and completed)"""
-        builds = []
+    async def _cancel_shared_build(self, build_id: str) -> dict:
+        """Cancel a build running in another worker and wait briefly for it to stop"""
+        if not await asyncio.to_thread(build_store.request_cancel, build_id):
+            raise ValueError("Build is not running")
         
-        # Add running builds
-        for build_id, build_info in self.running_builds.items():
-            process = build_info.get("process")
-            if process and process.returncode is None:
-                status = "running"
-            elif build_info.get("return_code") == 0:
-                status = "completed"
-            else:
-                status = "failed"
-            
-            builds.append(BuildListItem(
-                build_id=build_id,
-                status=status,
-                environments=build_info["environments"],
-                start_time=build_info["start_time"],
-                environment_count=len(build_info["environments"])
-            ))
+        # The owner notices within one sync interval, then takes up to 2s to stop the process
+        deadline = time.monotonic() + settings.BUILD_STATE_SYNC_SECONDS * 2 + 3
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.BUILD_STATE_SYNC_SECONDS)
+            state = await asyncio.to_thread(build_store.get_build_state, build_id)
+            if not state or state["status"] not in ("queued", "running"):
+                return {"message": "Build cancelled successfully"}
         
-        # Add completed builds
-        for build_id, build_info in self.completed_builds.items():
-            status = "completed" if build_info.get("return_code") == 0 else "failed"
-            
-            builds.append(BuildListItem(
-                build_id=build_id,
-                status=status,
-                environments=build_info["environments"],
-                start_time=build_info["start_time"],
-                end_time=build_info.get("end_time"),
-                environment_count=len(build_info["environments"])
-            ))
+        return {"message": "Cancellation requested"}
+    
+    async def list_builds(
+        self,
+        statuses: Optional[List[str]] = None,
+        environment: Optional[str] = None,
+        started_after: Optional[datetime] = None,
+        started_before: Optional[datetime] = None,
+        min_runtime: Optional[float] = None,
+        max_runtime: Optional[float] = None,
+        sort: str = "start_time",
+        order: str = "desc",
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> BuildList:
+        """List one page of builds from the indexed build history"""
+        summaries, next_cursor = await asyncio.to_thread(
+            build_store.query_builds,
+            statuses=statuses,
+            environment=environment,
+            started_after=started_after.timestamp() if started_after else None,
+            started_before=started_before.timestamp() if started_before else None,
+            min_runtime=min_runtime,
+            max_runtime=max_runtime,
+            sort=sort,
+            order=order,
+            limit=min(limit, settings.BUILD_LIST_MAX_LIMIT),
+            cursor=cursor
+        )
+        
+        return BuildList(
+            builds=[self._summary_to_list_item(summary) for summary in summaries],
+            next_cursor=next_cursor
+        )
+    
+    async def get_build_summaries(self, build_ids: List[str]) -> BuildBatchStatusResponse:
+        """Get summaries for many builds in one call"""
+        if len(build_ids) > settings.BUILD_LIST_MAX_LIMIT:
+            raise ValueError(f"At most {settings.BUILD_LIST_MAX_LIMIT} build IDs can be requested at once")
+        
+        found = await asyncio.to_thread(build_store.get_builds, build_ids)
         
-        return builds
+        return BuildBatchStatusResponse(
+            builds=[self._summary_to_list_item(found[build_id]) for build_id in dict.fromkeys(build_ids)
+                    if build_id in found],
+            not_found=[build_id for build_id in dict.fromkeys(build_ids) if build_id not in found]
+        )
+    
+    def _summary_to_list_item(self, summary: dict) -> BuildListItem:
+        """Convert a stored build summary into an API list item"""
+        end_time = summary["end_time"]
+        runtime = (end_time or time.time()) - summary["start_time"]
+        
+        return BuildListItem(
+            build_id=summary["build_id"],
+            status=summary["status"],
+            environments=summary["environments"],
+            start_time=datetime.fromtimestamp(summary["start_time"]),
+            end_time=datetime.fromtimestamp(end_time) if end_time else None,
+            environment_count=len(summary["environments"]),
+            return_code=summary["return_code"],
+            runtime_seconds=round(runtime, 3),
+            successful_builds=summary["successful_builds"],
+            failed_builds=summary["failed_builds"],
+            published=summary["published"],
+            publish_failures=summary["publish_failures"],
+            eta=datetime.fromtimestamp(summary["eta"]) if summary["eta"] else None,
+            progress=summary["progress"]
+        )
     
     async def _capture_build_output(self, build_id: str):
         """Background task to capture real-time output from ansible-playbook"""
         if build_id not in self.running_builds:
-            print(f"❌ Build {build_id} not found when trying to capture output")
+            logger.error(f"❌ Build {build_id} not found when trying to capture output")
             return
         
         build_info = self.running_builds[build_id]
         process = build_info["process"]
         
         try:
-            print(f"📡 Starting output capture for build {build_id}")
-            line_count = 0
-            
-            # Read output line by line
-            while True:
-                try:
-                    line = await asyncio.wait_for(process.stdout.readline(), timeout=1.0)
-                except asyncio.TimeoutError:
-                    if process.returncode is not None:
-                        break
-                    continue
-                
-                if not line:
-                    break
-                
-                line_text = line.decode('utf-8').strip()
-                if line_text:
-                    build_info["logs"].append(line_text)
-                    line_count += 1
-                    
-                    if line_count % 10 == 0:
-                        print(f"📊 Build {build_id}: captured {line_count} lines")
-                    
-                    # Parse for successful/failed builds
-                    self._parse_build_results(line_text, build_info)
-            
-            # Wait for process to complete
-            await process.wait()
-            
-            print(f"🏁 Build {build_id} completed with return code: {process.returncode}")
+            if process is not None:
+                await self._capture_process_output(build_id, build_info, process)
+                oom_note = await asyncio.to_thread(isolation_service.release, build_info)
+                if oom_note:
+                    build_info["logs"].append(oom_note)
+                # Learn what each environment needs and how long it takes, for admitting and predicting later builds
+                await asyncio.to_thread(admission_service.record_usage, build_info)
+                await asyncio.to_thread(eta_service.record, build_info)
+            else:
+                build_info["return_code"] = 0
             
-            # Update final status
-            build_info["return_code"] = process.returncode
+            # Environments left to builds already in flight share those builds' results
+            if build_info["shared_builds"] and build_info["status"] != "cancelled":
+                await self._await_shared_builds(build_id, build_info)
+            build_info["waiting"] = False
             
-            if process.returncode == 0:
+            if build_info["status"] == "cancelled":
+                pass
+            elif build_info["return_code"] == 0:
                 build_info["status"] = "completed"
                 build_info["logs"].append(f"✅ Build completed successfully at {datetime.now().strftime('%H:%M:%S')}")
-                if not build_info["successful_builds"] and not build_info["failed_builds"]:
-                    build_info["successful_builds"] = build_info["environments"].copy()
             else:
                 build_info["status"] = "failed"
-                build_info["logs"].append(f"❌ Build failed at {datetime.now().strftime('%H:%M:%S')} with return code {process.returncode}")
-                if not build_info["failed_builds"] and not build_info["successful_builds"]:
-                    build_info["failed_builds"] = build_info["environments"].copy()
+                build_info["logs"].append(f"❌ Build failed at {datetime.now().strftime('%H:%M:%S')} with return code {build_info['return_code']}")
+            
+            # Freshly built images are the last the image garbage collector evicts
+            await asyncio.to_thread(image_gc_service.record_built, build_info["successful_builds"])
+            
+            # Publish before the build is reported finished
+            if build_info["publish_registries"] and build_info["status"] == "completed" and build_info["successful_builds"]:
+                await self._publish_images(build_id, build_info)
             
             # Clean up temporary file
             cleanup_temp_file(build_info.get("temp_vars_file"))
             
+            # Share the final lines before other workers see the build finish
+            await self._share_logs(build_id, build_info)
+            
             # Move to completed builds
-            self.move_to_completed(build_id)
+            await self.move_to_completed(build_id)
+            
+            # Archive logs off the event loop
+            await asyncio.to_thread(self._archive_logs, build_id, build_info)
             
         except Exception as e:
-            print(f"❌ Error capturing output for build {build_id}: {e}")
+            logger.exception(f"❌ Error capturing output for build {build_id}: {e}", extra={"build_id": build_id})
             build_info["logs"].append(f"Error capturing output: {str(e)}")
             build_info["status"] = "failed"
             build_info["return_code"] = -1
             
             cleanup_temp_file(build_info.get("temp_vars_file"))
-            self.move_to_completed(build_id)
+            await asyncio.to_thread(isolation_service.release, build_info)
+            await self._share_logs(build_id, build_info)
+            await self.move_to_completed(build_id)
+            await asyncio.to_thread(self._archive_logs, build_id, build_info)
+    
+    async def _capture_process_output(self, build_id: str, build_info: dict, process: asyncio.subprocess.Process):
+        """Capture ansible-playbook's output until it exits and record its return code"""
+        logger.info(f"📡 Starting output capture for build {build_id}")
+        line_count = 0
+        
+        # Read output in large blocks and append lines in batches
+        logs = build_info["logs"]
+        async for lines in read_line_batches(
+            process.stdout,
+            chunk_size=settings.LOG_READ_CHUNK_BYTES,
+            max_line_bytes=settings.LOG_MAX_LINE_BYTES,
+            idle_timeout=1.0,
+            should_stop=lambda: process.returncode is not None
+        ):
+            logs.extend(lines)
+            line_count += len(lines)
+            logger.info(
+                "📊 Build %s: captured %d lines", build_id, line_count,
+                extra={"build_id": build_id, "lines": line_count, "sample": settings.LOG_PROGRESS_SAMPLE}
+            )
+            
+            # Parse for successful/failed builds and the environment being built
+            finished = []
+            for line_text in lines:
+                if RESULT_MARKERS.search(line_text):
+                    self._parse_build_results(line_text, build_info)
+                if BUILD_TASK_MARKER in line_text or "(item=" in line_text:
+                    event = self._track_environment(line_text, build_info)
+                    if event:
+                        finished.append(event)
+            if finished:
+                await asyncio.to_thread(self._record_events, build_id, "environment_finished", finished)
+        
+        # Wait for process to complete
+        await process.wait()
+        
+        logger.info(
+            f"🏁 Build {build_id} completed with return code: {process.returncode}",
+            extra={"build_id": build_id, "return_code": process.returncode, "lines": line_count}
+        )
+        
+        build_info["return_code"] = process.returncode
+        
+        # Without per-environment results in the output, the return code decides for all of them
+        if not build_info["successful_builds"] and not build_info["failed_builds"]:
+            if process.returncode == 0:
+                build_info["successful_builds"] = build_info["own_environments"].copy()
+            elif build_info["status"] != "cancelled":
+                build_info["failed_builds"] = build_info["own_environments"].copy()
+    
+    def _track_environment(self, line_text: str, build_info: dict) -> Optional[dict]:
+        """Follow which environments ansible-builder is on, from the build task's header and item results
+        
+        Returns the environment_finished event data when an environment's result comes in.
+        """
+        usage = build_info["environment_usage"]
+        if BUILD_TASK_MARKER in line_text:
+            # Every lane starts on its first environment
+            for lane in build_info["build_lanes"]:
+                if not usage[lane[0]]["started"]:
+                    self._start_next_environment(build_info, lane)
+            return None
+        match = ITEM_RESULT.match(line_text)
+        env = match.group(2) if match else None
+        if env in usage and usage[env]["started"] and not usage[env]["finished"]:
+            usage[env]["finished"] = time.time()
+            self._start_next_environment(build_info, next(lane for lane in build_info["build_lanes"] if env in lane))
+            return {
+                "environment": env,
+                "result": "failed" if match.group(1) in ("failed", "fatal") else "succeeded",
+                "duration": round(usage[env]["finished"] - usage[env]["started"], 1)
+            }
+        return None
+    
+    def _start_next_environment(self, build_info: dict, lane: List[str]):
+        usage = build_info["environment_usage"]
+        next_env = next((env for env in lane if not usage[env]["started"]), None)
+        if next_env is not None:
+            usage[next_env]["started"] = time.time()
+        building = [env for env, entry in usage.items() if entry["started"] and not entry["finished"]]
+        build_info["current_environment"] = building[0] if len(building) == 1 else None
+    
+    async def _await_shared_builds(self, build_id: str, build_info: dict):
+        """Wait for the in-flight builds this build shares environments with and take over their results"""
+        task = asyncio.create_task(self._follow_shared_builds(build_info))
+        build_info["shared_task"] = task
+        await asyncio.wait({task})
+        if task.cancelled():
+            return
+        
+        shared_failed = [env for env in build_info["shared_builds"] if env in build_info["failed_builds"]]
+        if shared_failed and build_info["return_code"] == 0:
+            build_info["return_code"] = 1
+        logger.info(
+            f"🔗 Build {build_id} took over {len(build_info['shared_builds'])} shared results, "
+            f"{len(shared_failed)} failed",
+            extra={"build_id": build_id, "shared_builds": build_info["shared_builds"]}
+        )
+    
+    async def _follow_shared_builds(self, build_info: dict):
+        pending = dict(build_info["shared_builds"])
+        while pending:
+            for shared_id in set(pending.values()):
+                try:
+                    state = await asyncio.to_thread(build_store.get_build_state, shared_id)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not read shared state of build {shared_id}: {e}")
+                    continue
+                if state and state["status"] in ("queued", "running"):
+                    continue
+                
+                succeeded = state["successful_builds"] if state else []
+                for env in [env for env, owner in pending.items() if owner == shared_id]:
+                    del pending[env]
+                    if env in succeeded:
+                        build_info["successful_builds"].append(env)
+                        build_info["logs"].append(f"✅ {env} was built by build {shared_id}")
+                    else:
+                        build_info["failed_builds"].append(env)
+                        build_info["logs"].append(f"❌ {env} failed in build {shared_id}")
+            if pending:
+                await asyncio.sleep(settings.BUILD_STATE_SYNC_SECONDS)
+    
+    async def _publish_images(self, build_id: str, build_info: dict):
+        """Push a finished build's successful images to its publish registries"""
+        environments = build_info["successful_builds"]
+        registries = build_info["publish_registries"]
+        build_info["logs"].append(f"📤 Publishing {len(environments)} images to {', '.join(registries)}")
+        
+        task = asyncio.create_task(publish_service.publish(
+            environments, registries, build_info["container_runtime"], build_info["logs"].append,
+            tls_verify=settings.PUBLISH_TLS_VERIFY
+        ))
+        build_info["publish_task"] = task
+        build_info["publishing"] = True
+        try:
+            await asyncio.wait({task})
+        finally:
+            build_info["publishing"] = False
+        if task.cancelled():
+            return
+        
+        try:
+            published, failed = task.result()
+        except Exception as e:
+            logger.exception(f"❌ Publishing failed for build {build_id}: {e}", extra={"build_id": build_id})
+            build_info["logs"].append(f"❌ Publishing failed: {e}")
+            published, failed = [], [f"{env} → {registry}" for registry in registries for env in environments]
+        
+        build_info["published"] = published
+        build_info["publish_failures"] = failed
+        await asyncio.to_thread(image_gc_service.record_used, environments)
+        if failed:
+            build_info["logs"].append(f"⚠️ Published {len(published)} of {len(published) + len(failed)} images")
+        else:
+            build_info["logs"].append(f"✅ Published {len(published)} images")
+        logger.info(
+            f"📤 Build {build_id} published {len(published)} images, {len(failed)} failed",
+            extra={"build_id": build_id, "published": len(published), "publish_failures": len(failed)}
+        )
     
     def _parse_build_results(self, line_text: str, build_info: dict):
         """Parse output line for build success/failure indicators"""
         if "✅ Successfully built" in line_text or "Complete!" in line_text:
-            for env in build_info["environments"]:
+            for env in build_info["own_environments"]:
                 if env in line_text and env not in build_info["successful_builds"]:
                     build_info["successful_builds"].append(env)
         
         elif "❌ Failed to build" in line_text or "Error:" in line_text:
-            for env in build_info["environments"]:
+            for env in build_info["own_environments"]:
                 if env in line_text and env not in build_info["failed_builds"]:
                     build_info["failed_builds"].append(env)
 
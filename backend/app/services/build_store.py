@@ -0,0 +1,985 @@
+# backend/app/services/build_store.py - Indexed Build History Store
+
+import base64
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.core.config import settings
+
+
+# Running builds have no end time yet; they sort after every finished build
+RUNNING_END_SORT_KEY = 1e300
+
+SORT_EXPRESSIONS = {
+    "start_time": "start_time",
+    "end_time": f"ifnull(end_time, {RUNNING_END_SORT_KEY})"
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS builds (
+    build_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    return_code INTEGER,
+    environments TEXT NOT NULL,
+    successful_builds TEXT NOT NULL DEFAULT '[]',
+    failed_builds TEXT NOT NULL DEFAULT '[]',
+    owner_pid INTEGER,
+    owner TEXT,
+    log_count INTEGER NOT NULL DEFAULT 0,
+    log_archive TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0,
+    published TEXT NOT NULL DEFAULT '[]',
+    publish_failures TEXT NOT NULL DEFAULT '[]',
+    reservation TEXT,
+    admitted_at REAL,
+    predicted_durations TEXT,
+    eta REAL,
+    progress REAL
+);
+CREATE INDEX IF NOT EXISTS idx_builds_start ON builds (start_time, build_id);
+CREATE INDEX IF NOT EXISTS idx_builds_end ON builds ({SORT_EXPRESSIONS["end_time"]}, build_id);
+CREATE INDEX IF NOT EXISTS idx_builds_status_start ON builds (status, start_time, build_id);
+CREATE TABLE IF NOT EXISTS build_environments (
+    environment TEXT NOT NULL,
+    build_id TEXT NOT NULL REFERENCES builds (build_id) ON DELETE CASCADE,
+    input_key TEXT,
+    PRIMARY KEY (environment, build_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_build_environments_build ON build_environments (build_id);
+CREATE TABLE IF NOT EXISTS build_logs (
+    build_id TEXT NOT NULL REFERENCES builds (build_id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    line TEXT NOT NULL,
+    PRIMARY KEY (build_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS build_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    build_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_build_events_created ON build_events (created_at);
+CREATE TABLE IF NOT EXISTS promotions (
+    promotion_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    owner_pid INTEGER,
+    owner TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_promotions_start ON promotions (start_time);
+CREATE TABLE IF NOT EXISTS environment_profiles (
+    environment TEXT PRIMARY KEY,
+    memory REAL,
+    cpus REAL,
+    disk REAL,
+    duration REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS environment_durations (
+    environment TEXT NOT NULL,
+    input_key TEXT NOT NULL,
+    duration REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (environment, input_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS images (
+    reference TEXT PRIMARY KEY,
+    last_built REAL,
+    last_used REAL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS webhooks (
+    webhook_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    events TEXT NOT NULL DEFAULT '[]',
+    secret TEXT,
+    created_at REAL NOT NULL,
+    last_seq INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    last_delivered_at REAL,
+    delivered INTEGER NOT NULL DEFAULT 0,
+    dropped INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    heartbeat REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Columns added after the first release of the schema, with their definitions, by table
+ADDED_COLUMNS = {
+    "builds": {
+        "owner_pid": "INTEGER",
+        "owner": "TEXT",
+        "log_count": "INTEGER NOT NULL DEFAULT 0",
+        "log_archive": "TEXT",
+        "cancel_requested": "INTEGER NOT NULL DEFAULT 0",
+        "version": "INTEGER NOT NULL DEFAULT 0",
+        "published": "TEXT NOT NULL DEFAULT '[]'",
+        "publish_failures": "TEXT NOT NULL DEFAULT '[]'",
+        "reservation": "TEXT",
+        "admitted_at": "REAL",
+        "predicted_durations": "TEXT",
+        "eta": "REAL",
+        "progress": "REAL",
+    },
+    "build_environments": {
+        "input_key": "TEXT",
+    },
+    "build_events": {
+        "data": "TEXT",
+    },
+    "promotions": {
+        "owner": "TEXT",
+    },
+}
+
+# Builds that hold or wait for a build slot
+ACTIVE_STATUSES = ("running", "queued")
+ACTIVE_SQL = "status IN ('running', 'queued')"
+
+# Keep IN (...) lists well below SQLite's bound-parameter limit
+MAX_QUERY_PARAMETERS = 500
+
+
+def pid_exists(pid: int) -> bool:
+    """Whether a process with this PID exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BuildStore:
+    """SQLite-backed build state shared by every API worker process
+
+    Holds the indexed build history, the live state and log lines of running
+    builds, a build event log and the webhooks it is delivered to, registry
+    promotions, when each built image was last built or used and the
+    resources each environment's build needs. WAL mode lets readers in one
+    worker run alongside the writer in another.
+
+    Builds, promotions and webhook leases are owned by a worker ID that is
+    new in every process, not by a PID, which a restarted container or
+    another process can reuse. A worker renews its heartbeat in the workers
+    table from a background thread; once it stops for WORKER_LEASE_SECONDS
+    whatever it owns is orphaned.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._worker_id: Optional[str] = None
+        self._worker_pid: Optional[int] = None
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    @property
+    def worker_id(self) -> str:
+        """ID of this worker process (a forked child gets its own)"""
+        if self._worker_pid != os.getpid():
+            self._worker_id = uuid.uuid4().hex
+            self._worker_pid = os.getpid()
+        return self._worker_id
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the database lazily so importing the app never touches disk"""
+        if self._conn is None:
+            if self.db_path != ":memory:":
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA busy_timeout = {int(settings.BUILD_DB_BUSY_TIMEOUT_SECONDS * 1000)}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            self._conn = conn
+            self._start_heartbeat()
+        return self._conn
+
+    def _start_heartbeat(self):
+        """Register this worker and keep its heartbeat fresh from a daemon thread"""
+        self._write_heartbeat()
+        self._heartbeat_stop.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="build-store-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self):
+        while not self._heartbeat_stop.wait(settings.WORKER_HEARTBEAT_SECONDS):
+            try:
+                with self._lock:
+                    self._write_heartbeat()
+            except sqlite3.Error:
+                # Busy past the timeout; the lease outlasts several missed beats
+                pass
+
+    def _write_heartbeat(self):
+        now = time.time()
+        self._conn.execute(
+            "INSERT INTO workers (worker_id, host, pid, heartbeat) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (worker_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+            (self.worker_id, socket.gethostname(), os.getpid(), now)
+        )
+        self._conn.execute(
+            "DELETE FROM workers WHERE heartbeat < ?", (now - settings.WORKER_LEASE_SECONDS * 10,)
+        )
+
+    def shutdown(self):
+        """Stop the heartbeat and retire this worker, orphaning anything it still owns"""
+        if self._heartbeat_thread is None:
+            return
+        self._heartbeat_stop.set()
+        self._heartbeat_thread.join(timeout=5)
+        self._heartbeat_thread = None
+        with self._lock:
+            self._conn.execute("DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+
+    def _live_workers(self, conn: sqlite3.Connection) -> Set[str]:
+        """IDs of workers whose heartbeat is current (caller holds the lock)
+
+        A worker on this host whose process is gone, or whose PID is now this
+        process's, is dead however recent its last heartbeat.
+        """
+        host, pid = socket.gethostname(), os.getpid()
+        rows = conn.execute(
+            "SELECT worker_id, host, pid FROM workers WHERE heartbeat >= ?",
+            (time.time() - settings.WORKER_LEASE_SECONDS,)
+        ).fetchall()
+        live = {self.worker_id}
+        for row in rows:
+            if row["host"] == host and (row["pid"] == pid or not pid_exists(row["pid"])):
+                continue
+            live.add(row["worker_id"])
+        return live
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Add columns introduced after a database was first created"""
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for column, definition in columns.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def _build_row(self, build_id: str, build_info: dict) -> tuple:
+        """Column values for a build's row"""
+        end_time = build_info.get("end_time")
+        return (
+            build_id,
+            build_info.get("status", "running"),
+            build_info["start_time"].timestamp(),
+            end_time.timestamp() if end_time else None,
+            build_info.get("return_code"),
+            json.dumps(build_info["environments"]),
+            json.dumps(build_info.get("successful_builds", [])),
+            json.dumps(build_info.get("failed_builds", [])),
+            os.getpid(),
+            self.worker_id,
+            build_info.get("log_count") or 0,
+            build_info.get("log_archive"),
+            json.dumps(build_info.get("published", [])),
+            json.dumps(build_info.get("publish_failures", [])),
+            json.dumps(build_info.get("predicted_durations") or {}),
+            build_info.get("eta"),
+            build_info.get("progress")
+        )
+
+    def _insert_build(self, conn: sqlite3.Connection, build_id: str, build_info: dict, event: Optional[str]):
+        """Upsert a build's row inside the caller's transaction"""
+        exists = conn.execute("SELECT 1 FROM builds WHERE build_id = ?", (build_id,)).fetchone()
+        conn.execute(
+            "INSERT INTO builds (build_id, status, start_time, end_time, return_code, environments, "
+            "successful_builds, failed_builds, owner_pid, owner, log_count, log_archive, published, "
+            "publish_failures, predicted_durations, eta, progress) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (build_id) DO UPDATE SET status = excluded.status, "
+            "end_time = excluded.end_time, return_code = excluded.return_code, "
+            "successful_builds = excluded.successful_builds, failed_builds = excluded.failed_builds, "
+            "log_count = max(log_count, excluded.log_count), "
+            "log_archive = ifnull(excluded.log_archive, log_archive), published = excluded.published, "
+            "publish_failures = excluded.publish_failures, eta = excluded.eta, "
+            "progress = ifnull(excluded.progress, progress), version = version + 1",
+            self._build_row(build_id, build_info)
+        )
+        if not exists:
+            input_keys = build_info.get("input_keys") or {}
+            conn.executemany(
+                "INSERT OR IGNORE INTO build_environments (environment, build_id, input_key) VALUES (?, ?, ?)",
+                [(env, build_id, input_keys.get(env)) for env in build_info["environments"]]
+            )
+        if event:
+            conn.execute(
+                "INSERT INTO build_events (build_id, event, created_at) VALUES (?, ?, ?)",
+                (build_id, event, time.time())
+            )
+
+    def _transaction(self, immediate: bool = False):
+        """Run a block in one transaction on the shared connection (caller holds the lock)"""
+        return _Transaction(self.conn, immediate)
+
+    def record_build(self, build_id: str, build_info: dict, event: Optional[str] = None):
+        """Insert or update the row for a build, optionally logging a build event"""
+        with self._lock, self._transaction() as conn:
+            self._insert_build(conn, build_id, build_info, event)
+
+    def reserve_build(self, build_id: str, build_info: dict, max_queued: int, coalesce: bool = True,
+                      join_whole: bool = False) -> Tuple[bool, Dict[str, str]]:
+        """Record a new build, queued unless it only waits for others, if fewer than max_queued are queued
+
+        With coalesce, environments that a queued or running build is already
+        building from the same inputs (build_info["input_keys"]) are left to
+        that build and returned as {environment: its build ID}; the new
+        build's input keys then cover only what it builds itself. With
+        join_whole, a request one such build covers entirely records nothing.
+        Returns (whether the build was recorded, shared environments) -
+        (False, {}) means the queue is full.
+        """
+        input_keys = build_info.get("input_keys") or {}
+        with self._lock, self._transaction(immediate=True) as conn:
+            self._fail_orphaned(conn)
+            shared = self._find_in_flight(conn, input_keys) if coalesce else {}
+            if join_whole and shared and len(shared) == len(build_info["environments"]) \
+                    and len(set(shared.values())) == 1:
+                return False, shared
+            # A build that only waits for others needs no slot and runs straight away
+            queued = any(env not in shared for env in build_info["environments"])
+            if queued:
+                waiting = conn.execute("SELECT count(*) FROM builds WHERE status = 'queued'").fetchone()[0]
+                if waiting >= max_queued:
+                    return False, {}
+            build_info["status"] = "queued" if queued else "running"
+            build_info["input_keys"] = {env: key for env, key in input_keys.items() if env not in shared}
+            self._insert_build(conn, build_id, build_info, "queued" if queued else "started")
+            return True, shared
+
+    def admit_build(self, build_id: str, reservation: Dict[str, float], max_running: int, ramp_seconds: float,
+                    shortfalls: Callable[[Dict[str, float]], List[str]]) -> Tuple[bool, List[str]]:
+        """Move a queued build to running, holding its reservation, if it is next in line and the host can take it
+
+        shortfalls(pending) tells why the host can't, given the combined
+        reservation of builds admitted in the last ramp_seconds, whose usage
+        live metrics don't show yet. With nothing running a build is always
+        admitted. Returns (whether the build now runs, what holds it back).
+        """
+        with self._lock, self._transaction(immediate=True) as conn:
+            self._fail_orphaned(conn)
+            row = conn.execute("SELECT status FROM builds WHERE build_id = ?", (build_id,)).fetchone()
+            if not row or row["status"] != "queued":
+                return bool(row and row["status"] == "running"), []
+            ahead = conn.execute(
+                "SELECT count(*) FROM builds WHERE status = 'queued' AND (start_time, build_id) < "
+                "(SELECT start_time, build_id FROM builds WHERE build_id = ?)",
+                (build_id,)
+            ).fetchone()[0]
+            if ahead:
+                return False, [f"{ahead} earlier builds queued"]
+
+            running = conn.execute("SELECT reservation, admitted_at FROM builds WHERE status = 'running'").fetchall()
+            if max_running and len(running) >= max_running:
+                return False, [f"{len(running)} builds running, the maximum is {max_running}"]
+            if running:
+                pending = {"memory": 0.0, "cpus": 0.0, "disk": 0.0}
+                ramp_start = time.time() - ramp_seconds
+                for other in running:
+                    if other["reservation"] and (other["admitted_at"] or 0) > ramp_start:
+                        for resource, amount in json.loads(other["reservation"]).items():
+                            pending[resource] = pending.get(resource, 0.0) + amount
+                blockers = shortfalls(pending)
+                if blockers:
+                    return False, blockers
+
+            now = time.time()
+            conn.execute(
+                "UPDATE builds SET status = 'running', reservation = ?, admitted_at = ?, version = version + 1 "
+                "WHERE build_id = ?",
+                (json.dumps(reservation), now, build_id)
+            )
+            conn.execute(
+                "INSERT INTO build_events (build_id, event, created_at) VALUES (?, ?, ?)",
+                (build_id, "started", now)
+            )
+            return True, []
+
+    def _find_in_flight(self, conn: sqlite3.Connection, input_keys: Dict[str, str]) -> Dict[str, str]:
+        """Running builds building any of the given environments from the same inputs"""
+        if not input_keys:
+            return {}
+        rows = conn.execute(
+            "SELECT be.environment, be.build_id, be.input_key FROM builds b "
+            "JOIN build_environments be ON be.build_id = b.build_id "
+            f"WHERE b.{ACTIVE_SQL} AND be.input_key IS NOT NULL ORDER BY b.start_time"
+        ).fetchall()
+        shared = {}
+        for row in rows:
+            if input_keys.get(row["environment"]) == row["input_key"]:
+                shared.setdefault(row["environment"], row["build_id"])
+        return shared
+
+    def get_build_state(self, build_id: str) -> Optional[dict]:
+        """Full shared state of one build, failing it first if its owner worker has died"""
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM builds WHERE build_id = ?", (build_id,)).fetchone()
+            if row and row["status"] in ACTIVE_STATUSES and row["owner"] not in self._live_workers(self.conn):
+                with self._transaction(immediate=True) as conn:
+                    self._fail_orphaned(conn)
+                row = self.conn.execute("SELECT * FROM builds WHERE build_id = ?", (build_id,)).fetchone()
+        if not row:
+            return None
+
+        state = self._to_summary(dict(row))
+        state.update(
+            owner_pid=row["owner_pid"],
+            owner=row["owner"],
+            log_count=row["log_count"],
+            log_archive=row["log_archive"],
+            cancel_requested=bool(row["cancel_requested"]),
+            version=row["version"],
+            predicted_durations=json.loads(row["predicted_durations"] or "{}")
+        )
+        return state
+
+    def get_running_builds(self, include_queued: bool = False) -> List[dict]:
+        """Summaries of every build currently running (or queued) in any worker"""
+        with self._lock:
+            condition = ACTIVE_SQL if include_queued else "status = 'running'"
+            rows = self.conn.execute(f"SELECT * FROM builds WHERE {condition} ORDER BY start_time").fetchall()
+            live = self._live_workers(self.conn)
+        return [self._to_summary(dict(row)) for row in rows if row["owner"] in live]
+
+    def count_builds_since(self, started_after: float) -> Tuple[int, int]:
+        """Number of builds started after a timestamp, and how many of them succeeded"""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT count(*), ifnull(sum(return_code = 0 AND NOT {ACTIVE_SQL}), 0) "
+                "FROM builds WHERE start_time > ?",
+                (started_after,)
+            ).fetchone()
+        return row[0], row[1]
+
+    def append_logs(self, build_id: str, first_seq: int, lines: List[str]):
+        """Share a batch of a running build's log lines with the other workers"""
+        if not lines:
+            return
+        with self._lock, self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO build_logs (build_id, seq, line) VALUES (?, ?, ?)",
+                [(build_id, first_seq + i, line) for i, line in enumerate(lines)]
+            )
+            conn.execute(
+                "UPDATE builds SET log_count = max(log_count, ?), version = version + 1 WHERE build_id = ?",
+                (first_seq + len(lines), build_id)
+            )
+
+    def get_log_lines(self, build_id: str, start: int = 0, end: Optional[int] = None) -> List[str]:
+        """Shared log lines [start, end) of a build whose logs are not archived"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT line FROM build_logs WHERE build_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (build_id, start, end if end is not None else 2 ** 62)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_log_archive(self, build_id: str, archive_path: str, log_count: int):
+        """Point readers at a build's log archive and drop its shared log lines"""
+        with self._lock, self._transaction() as conn:
+            conn.execute(
+                "UPDATE builds SET log_archive = ?, log_count = ?, version = version + 1 WHERE build_id = ?",
+                (archive_path, log_count, build_id)
+            )
+            conn.execute("DELETE FROM build_logs WHERE build_id = ?", (build_id,))
+
+    def request_cancel(self, build_id: str) -> bool:
+        """Ask the worker that owns a queued or running build to cancel it"""
+        with self._lock, self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE builds SET cancel_requested = 1, version = version + 1 "
+                f"WHERE build_id = ? AND {ACTIVE_SQL}",
+                (build_id,)
+            )
+            if cursor.rowcount:
+                conn.execute(
+                    "INSERT INTO build_events (build_id, event, created_at) VALUES (?, ?, ?)",
+                    (build_id, "cancel_requested", time.time())
+                )
+        return cursor.rowcount > 0
+
+    def is_cancel_requested(self, build_id: str) -> bool:
+        """Whether another worker has asked to cancel this build"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT cancel_requested FROM builds WHERE build_id = ?", (build_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def record_event(self, build_id: str, event: str, data: Optional[dict] = None):
+        """Log a build event, with optional details, for webhooks and state versions"""
+        with self._lock, self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO build_events (build_id, event, created_at, data) VALUES (?, ?, ?, ?)",
+                (build_id, event, time.time(), json.dumps(data) if data else None)
+            )
+
+    def get_events_after(self, seq: int, limit: int) -> List[dict]:
+        """Build events logged after the given sequence number, oldest first"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM build_events WHERE seq > ? ORDER BY seq LIMIT ?", (seq, limit)
+            ).fetchall()
+        return [dict(row, data=json.loads(row["data"]) if row["data"] else {}) for row in rows]
+
+    def create_webhook(self, webhook_id: str, url: str, events: List[str], secret: Optional[str]) -> dict:
+        """Register a webhook; it receives events logged from now on"""
+        with self._lock, self._transaction(immediate=True) as conn:
+            last_seq = conn.execute("SELECT ifnull(max(seq), 0) FROM build_events").fetchone()[0]
+            conn.execute(
+                "INSERT INTO webhooks (webhook_id, url, events, secret, created_at, last_seq) VALUES (?, ?, ?, ?, ?, ?)",
+                (webhook_id, url, json.dumps(events), secret, time.time(), last_seq)
+            )
+            row = conn.execute("SELECT * FROM webhooks WHERE webhook_id = ?", (webhook_id,)).fetchone()
+        return self._to_webhook(row)
+
+    def get_webhooks(self, webhook_id: Optional[str] = None) -> List[dict]:
+        """One webhook or all of them, oldest first, with how many build events are still to go"""
+        with self._lock:
+            sql = "SELECT w.*, (SELECT count(*) FROM build_events e WHERE e.seq > w.last_seq) AS pending FROM webhooks w"
+            if webhook_id:
+                rows = self.conn.execute(f"{sql} WHERE webhook_id = ?", (webhook_id,)).fetchall()
+            else:
+                rows = self.conn.execute(f"{sql} ORDER BY created_at").fetchall()
+        return [self._to_webhook(row) for row in rows]
+
+    def delete_webhook(self, webhook_id: str) -> bool:
+        with self._lock, self._transaction() as conn:
+            cursor = conn.execute("DELETE FROM webhooks WHERE webhook_id = ?", (webhook_id,))
+        return cursor.rowcount > 0
+
+    def claim_webhooks(self, lease_seconds: float) -> List[dict]:
+        """Lease the webhooks due for delivery that no live worker is delivering to"""
+        now = time.time()
+        with self._lock, self._transaction(immediate=True) as conn:
+            rows = conn.execute(
+                "SELECT * FROM webhooks WHERE next_attempt_at <= ? AND "
+                "last_seq < (SELECT ifnull(max(seq), 0) FROM build_events)",
+                (now,)
+            ).fetchall()
+            live = self._live_workers(conn)
+            claimed = [row for row in rows if row["lease_owner"] in (None, self.worker_id)
+                       or row["lease_until"] < now or row["lease_owner"] not in live]
+            conn.executemany(
+                "UPDATE webhooks SET lease_owner = ?, lease_until = ? WHERE webhook_id = ?",
+                [(self.worker_id, now + lease_seconds, row["webhook_id"]) for row in claimed]
+            )
+        return [self._to_webhook(row, include_secret=True) for row in claimed]
+
+    def finish_webhook_delivery(self, webhook_id: str, last_seq: int, delivered: int = 0, dropped: int = 0,
+                                attempts: int = 0, next_attempt_at: float = 0, error: Optional[str] = None):
+        """Record a delivery attempt and release the webhook's lease
+
+        last_seq moves past events delivered or given up on; attempts counts
+        failures of the batch now pending.
+        """
+        with self._lock, self._transaction() as conn:
+            conn.execute(
+                "UPDATE webhooks SET last_seq = max(last_seq, ?), delivered = delivered + ?, dropped = dropped + ?, "
+                "attempts = ?, next_attempt_at = ?, last_error = ?, "
+                "last_delivered_at = CASE WHEN ? > 0 THEN ? ELSE last_delivered_at END, "
+                "lease_owner = NULL, lease_until = NULL WHERE webhook_id = ?",
+                (last_seq, delivered, dropped, attempts, next_attempt_at, error, delivered, time.time(), webhook_id)
+            )
+
+    def _to_webhook(self, row, include_secret: bool = False) -> dict:
+        webhook = dict(row)
+        webhook["events"] = json.loads(webhook["events"])
+        webhook["has_secret"] = bool(webhook["secret"])
+        if not include_secret:
+            del webhook["secret"]
+        return webhook
+
+    def get_state_version(self) -> int:
+        """Sequence number of the latest build event in any worker"""
+        with self._lock:
+            row = self.conn.execute("SELECT max(seq) FROM build_events").fetchone()
+        return row[0] or 0
+
+    def query_builds(
+        self,
+        statuses: Optional[List[str]] = None,
+        environment: Optional[str] = None,
+        started_after: Optional[float] = None,
+        started_before: Optional[float] = None,
+        min_runtime: Optional[float] = None,
+        max_runtime: Optional[float] = None,
+        sort: str = "start_time",
+        order: str = "desc",
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Return one page of builds matching the filters and the cursor for the next page"""
+        if sort not in SORT_EXPRESSIONS:
+            raise ValueError(f"Invalid sort field '{sort}'. Use one of: {', '.join(SORT_EXPRESSIONS)}")
+        if order not in ("asc", "desc"):
+            raise ValueError("Invalid sort order. Use 'asc' or 'desc'")
+
+        sort_expr = SORT_EXPRESSIONS[sort]
+        conditions = []
+        params: list = []
+
+        if statuses:
+            conditions.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if environment:
+            conditions.append("build_id IN (SELECT build_id FROM build_environments WHERE environment = ?)")
+            params.append(environment)
+        if started_after is not None:
+            conditions.append("start_time >= ?")
+            params.append(started_after)
+        if started_before is not None:
+            conditions.append("start_time < ?")
+            params.append(started_before)
+        if min_runtime is not None or max_runtime is not None:
+            runtime_expr = "(ifnull(end_time, ?) - start_time)"
+            if min_runtime is not None:
+                conditions.append(f"{runtime_expr} >= ?")
+                params.extend([time.time(), min_runtime])
+            if max_runtime is not None:
+                conditions.append(f"{runtime_expr} <= ?")
+                params.extend([time.time(), max_runtime])
+        if cursor:
+            sort_value, cursor_id = self._decode_cursor(cursor, sort)
+            comparison = "<" if order == "desc" else ">"
+            conditions.append(f"({sort_expr}, build_id) {comparison} (?, ?)")
+            params.extend([sort_value, cursor_id])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        direction = order.upper()
+        sql = (
+            f"SELECT *, {sort_expr} AS sort_key FROM builds {where} "
+            f"ORDER BY {sort_expr} {direction}, build_id {direction} LIMIT ?"
+        )
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = [dict(row) for row in self.conn.execute(sql, params)]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(sort, rows[-1]["sort_key"], rows[-1]["build_id"])
+
+        return [self._to_summary(row) for row in rows], next_cursor
+
+    def get_builds(self, build_ids: List[str]) -> Dict[str, dict]:
+        """Look up many build summaries by ID"""
+        found: Dict[str, dict] = {}
+        unique_ids = list(dict.fromkeys(build_ids))
+
+        with self._lock:
+            for i in range(0, len(unique_ids), MAX_QUERY_PARAMETERS):
+                batch = unique_ids[i:i + MAX_QUERY_PARAMETERS]
+                sql = f"SELECT * FROM builds WHERE build_id IN ({', '.join('?' * len(batch))})"
+                for row in self.conn.execute(sql, batch):
+                    found[row["build_id"]] = self._to_summary(dict(row))
+
+        return found
+
+    def record_promotion(self, promotion_id: str, promotion_info: dict):
+        """Insert or update a registry promotion; data holds everything but the indexed columns"""
+        data = {key: value for key, value in promotion_info.items()
+                if key not in ("promotion_id", "status", "start_time", "end_time")}
+        end_time = promotion_info.get("end_time")
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO promotions (promotion_id, status, start_time, end_time, owner_pid, owner, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (promotion_id) DO UPDATE SET status = excluded.status, "
+                "end_time = excluded.end_time, data = excluded.data",
+                (promotion_id, promotion_info["status"], promotion_info["start_time"].timestamp(),
+                 end_time.timestamp() if end_time else None, os.getpid(), self.worker_id,
+                 json.dumps(data, default=str))
+            )
+
+    def get_promotions(self, promotion_id: Optional[str] = None, limit: int = 50) -> List[dict]:
+        """One promotion or the most recent ones; those whose owner worker died read as failed"""
+        with self._lock:
+            if promotion_id is not None:
+                rows = self.conn.execute(
+                    "SELECT * FROM promotions WHERE promotion_id = ?", (promotion_id,)
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT * FROM promotions ORDER BY start_time DESC LIMIT ?", (limit,)
+                ).fetchall()
+            live = self._live_workers(self.conn)
+
+        promotions = []
+        for row in rows:
+            promotion = json.loads(row["data"])
+            promotion.update(
+                promotion_id=row["promotion_id"],
+                status=row["status"],
+                start_time=row["start_time"],
+                end_time=row["end_time"]
+            )
+            if row["status"] == "running" and row["owner"] not in live:
+                promotion["status"] = "failed"
+            promotions.append(promotion)
+        return promotions
+
+    def touch_images(self, references: Sequence[str], built: bool = False):
+        """Stamp images as just built (or just used) for the image garbage collector"""
+        column = "last_built" if built else "last_used"
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                f"INSERT INTO images (reference, {column}) VALUES (?, ?) "
+                f"ON CONFLICT (reference) DO UPDATE SET {column} = excluded.{column}",
+                [(reference, now) for reference in references]
+            )
+
+    def get_image_usage(self) -> Dict[str, float]:
+        """Image reference -> latest of its last build and last use"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT reference, max(ifnull(last_built, 0), ifnull(last_used, 0)) FROM images"
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def forget_images(self, references: Sequence[str]):
+        """Drop usage records of images that were removed or no longer exist"""
+        with self._lock:
+            self.conn.executemany("DELETE FROM images WHERE reference = ?", [(reference,) for reference in references])
+
+    def get_environment_profiles(self, environments: Sequence[str]) -> Dict[str, dict]:
+        """Learned memory, CPU, disk and duration of each environment's build (never-built ones are left out)"""
+        profiles = {}
+        with self._lock:
+            for i in range(0, len(environments), MAX_QUERY_PARAMETERS):
+                chunk = list(environments[i:i + MAX_QUERY_PARAMETERS])
+                rows = self.conn.execute(
+                    f"SELECT * FROM environment_profiles WHERE environment IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                profiles.update({row["environment"]: dict(row) for row in rows})
+        return profiles
+
+    def record_environment_usage(self, usage: Dict[str, dict], weight: float):
+        """Blend measured memory, cpus, disk and duration (None if unmeasured) into environments' profiles
+
+        weight is how much a new measurement counts (exponential moving
+        average); the first measurement of an environment is taken as is.
+        """
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            for environment, measured in usage.items():
+                row = conn.execute(
+                    "SELECT * FROM environment_profiles WHERE environment = ?", (environment,)
+                ).fetchone()
+                values = {resource: measured.get(resource) for resource in ("memory", "cpus", "disk", "duration")}
+                if row:
+                    for resource, value in values.items():
+                        # A figure that couldn't be measured this time keeps the old one
+                        if value is None or row[resource] is None:
+                            values[resource] = row[resource] if value is None else value
+                        else:
+                            values[resource] = row[resource] + weight * (value - row[resource])
+                conn.execute(
+                    "INSERT OR REPLACE INTO environment_profiles "
+                    "(environment, memory, cpus, disk, duration, samples, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (environment, values["memory"], values["cpus"], values["disk"], values["duration"],
+                     (row["samples"] if row else 0) + 1, now)
+                )
+
+    def get_environment_durations(self, environments: Sequence[str]) -> Dict[str, Dict[str, float]]:
+        """Learned build duration of each environment by input key"""
+        durations: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for i in range(0, len(environments), MAX_QUERY_PARAMETERS):
+                chunk = list(environments[i:i + MAX_QUERY_PARAMETERS])
+                rows = self.conn.execute(
+                    "SELECT environment, input_key, duration FROM environment_durations "
+                    f"WHERE environment IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for row in rows:
+                    durations.setdefault(row["environment"], {})[row["input_key"]] = row["duration"]
+        return durations
+
+    def get_profile_durations(self) -> Dict[str, float]:
+        """Learned build duration of every environment built so far"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT environment, duration FROM environment_profiles WHERE duration IS NOT NULL"
+            ).fetchall()
+        return {row["environment"]: row["duration"] for row in rows}
+
+    def record_environment_durations(self, durations: Dict[str, Tuple[str, float]], weight: float):
+        """Blend measured (input key, seconds) into each environment's duration for those inputs"""
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            for environment, (input_key, duration) in durations.items():
+                row = conn.execute(
+                    "SELECT duration, samples FROM environment_durations WHERE environment = ? AND input_key = ?",
+                    (environment, input_key)
+                ).fetchone()
+                if row:
+                    duration = row["duration"] + weight * (duration - row["duration"])
+                conn.execute(
+                    "INSERT OR REPLACE INTO environment_durations "
+                    "(environment, input_key, duration, samples, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (environment, input_key, duration, (row["samples"] if row else 0) + 1, now)
+                )
+
+    def set_progress(self, build_id: str, eta: Optional[float], progress: Optional[float]):
+        """Share a running or queued build's predicted finish time and percent complete"""
+        with self._lock, self._transaction() as conn:
+            conn.execute(
+                "UPDATE builds SET eta = ?, progress = ?, version = version + 1 WHERE build_id = ?",
+                (eta, progress, build_id)
+            )
+
+    def get_queue_outlook(self, build_id: str) -> Tuple[int, List[float]]:
+        """A queued build's place in the queue (0 = next) and the predicted finish times of running builds"""
+        with self._lock:
+            position = self.conn.execute(
+                "SELECT count(*) FROM builds WHERE status = 'queued' AND (start_time, build_id) < "
+                "(SELECT start_time, build_id FROM builds WHERE build_id = ?)",
+                (build_id,)
+            ).fetchone()[0]
+            etas = [row[0] for row in self.conn.execute(
+                "SELECT eta FROM builds WHERE status = 'running' AND eta IS NOT NULL ORDER BY eta"
+            )]
+        return position, etas
+
+    def mark_interrupted(self) -> int:
+        """Fail builds left queued or running by workers that are no longer alive"""
+        with self._lock, self._transaction(immediate=True) as conn:
+            return self._fail_orphaned(conn)
+
+    def _fail_orphaned(self, conn: sqlite3.Connection) -> int:
+        """Fail queued and running builds whose owner is gone (caller holds a write transaction)"""
+        rows = conn.execute(f"SELECT build_id, owner FROM builds WHERE {ACTIVE_SQL}").fetchall()
+        live = self._live_workers(conn)
+        orphaned = [row["build_id"] for row in rows if row["owner"] not in live]
+        now = time.time()
+        for build_id in orphaned:
+            conn.execute(
+                "UPDATE builds SET status = 'failed', return_code = -1, end_time = ?, version = version + 1 "
+                "WHERE build_id = ?",
+                (now, build_id)
+            )
+            conn.execute(
+                "INSERT INTO build_events (build_id, event, created_at) VALUES (?, ?, ?)",
+                (build_id, "interrupted", now)
+            )
+        return len(orphaned)
+
+    def prune(self, older_than: float) -> int:
+        """Delete finished builds and promotions that ended, and events and durations logged, before the given timestamp"""
+        with self._lock, self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM builds WHERE end_time IS NOT NULL AND end_time < ?", (older_than,)
+            )
+            conn.execute("DELETE FROM build_events WHERE created_at < ?", (older_than,))
+            conn.execute("DELETE FROM promotions WHERE end_time IS NOT NULL AND end_time < ?", (older_than,))
+            conn.execute("DELETE FROM environment_durations WHERE updated_at < ?", (older_than,))
+        return cursor.rowcount
+
+    def _to_summary(self, row: dict) -> dict:
+        """Convert a database row into a plain build summary"""
+        return {
+            "build_id": row["build_id"],
+            "status": row["status"],
+            "start_time": row["start_time"],
+            "end_time": row["end_time"],
+            "return_code": row["return_code"],
+            "environments": json.loads(row["environments"]),
+            "successful_builds": json.loads(row["successful_builds"]),
+            "failed_builds": json.loads(row["failed_builds"]),
+            "published": json.loads(row["published"]),
+            "publish_failures": json.loads(row["publish_failures"]),
+            "eta": row["eta"],
+            "progress": row["progress"]
+        }
+
+    def _encode_cursor(self, sort: str, sort_value: float, build_id: str) -> str:
+        """Encode an opaque keyset-pagination cursor"""
+        payload = json.dumps([sort, sort_value, build_id]).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).decode("ascii")
+
+    def _decode_cursor(self, cursor: str, sort: str) -> Tuple[float, str]:
+        """Decode a cursor, rejecting ones produced for a different sort field"""
+        try:
+            cursor_sort, sort_value, build_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if cursor_sort != sort:
+            raise ValueError(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+        return float(sort_value), str(build_id)
+
+
+class SharedLogLines(Sequence):
+    """Read-only list view of the log lines a running build has shared so far"""
+
+    def __init__(self, store: BuildStore, build_id: str, count: int):
+        self.store = store
+        self.build_id = build_id
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.count)
+            lines = self.store.get_log_lines(self.build_id, start, stop) if start < stop else []
+            return lines[::step] if step != 1 else lines
+        if index < 0:
+            index += self.count
+        lines = self.store.get_log_lines(self.build_id, index, index + 1) if 0 <= index < self.count else []
+        if not lines:
+            raise IndexError("log line index out of range")
+        return lines[0]
+
+
+class _Transaction:
+    """Context manager for BEGIN/COMMIT on an autocommit connection"""
+
+    def __init__(self, conn: sqlite3.Connection, immediate: bool):
+        self.conn = conn
+        self.immediate = immediate
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE" if self.immediate else "BEGIN")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# Create global store instance
+build_store = BuildStore(settings.BUILD_DB_PATH)
@@ -1,24 +1,43 @@
 # backend/app/services/custom_ee_service.py - Custom EE Wizard Service
 
+import asyncio
+import shutil
+import uuid
 import yaml
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
-from app.models.custom_ee_models import CustomEERequest, CustomEEResponse, EETemplates
+from app.models.custom_ee_models import BulkImportResponse, CustomEERequest, CustomEEResponse, EETemplates
 from app.models.build_models import BuildRequest
 from app.core.config import settings
 from app.utils.file_utils import ensure_directory_exists, write_yaml_file, write_text_file
+from app.utils.http_utils import make_etag
+from app.utils.environment_archive import read_environment_bundle
 from app.services.build_service import build_service
+from app.services.environment_service import environment_service
+from app.services.preflight_service import preflight_service
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 
 class CustomEEService:
     """Service for creating custom execution environments"""
     
+    def __init__(self):
+        self._templates_etag = None
+    
+    def get_templates_etag(self) -> str:
+        """ETag for the (static) template catalog, computed once"""
+        if self._templates_etag is None:
+            self._templates_etag = make_etag("templates", self.get_ee_templates().model_dump())
+        return self._templates_etag
+    
     async def create_custom_ee(self, custom_ee: CustomEERequest) -> CustomEEResponse:
         """Create a custom execution environment with wizard inputs or YAML import"""
         # Validate name
-        if not custom_ee.name or not custom_ee.name.replace('-', '').replace('_', '').isalnum():
+        if not self._valid_name(custom_ee.name):
             raise ValueError("Environment name must contain only letters, numbers, hyphens, and underscores")
         
         # Check if environment already exists
@@ -28,16 +47,32 @@ class CustomEEService:
         if env_path.exists():
             raise FileExistsError(f"Environment '{custom_ee.name}' already exists")
         
-        # Create environment directory
-        ensure_directory_exists(str(env_path))
+        # Write into a hidden staging directory (skipped by environment scans) until the preflight passes
+        staging_path = environments_dir / f".{custom_ee.name}.staging"
+        shutil.rmtree(staging_path, ignore_errors=True)
+        ensure_directory_exists(str(staging_path))
         
-        # Handle YAML import mode vs wizard mode
-        if custom_ee.import_mode == "yaml":
-            await self._create_from_yaml(custom_ee, env_path)
-        else:
-            await self._create_from_wizard(custom_ee, env_path)
+        try:
+            # Handle YAML import mode vs wizard mode
+            if custom_ee.import_mode == "yaml":
+                await self._create_from_yaml(custom_ee, staging_path)
+            else:
+                await self._create_from_wizard(custom_ee, staging_path)
+            
+            # Reject impossible dependency sets before the environment appears
+            if settings.PREFLIGHT_ENABLED:
+                errors, warnings = await preflight_service.check_environment(staging_path)
+                if errors:
+                    raise ValueError(f"Dependency preflight failed: {'; '.join(errors)}")
+                for warning in warnings:
+                    logger.warning(f"⚠️ Dependency preflight inconclusive for {custom_ee.name}: {warning}")
+            
+            staging_path.rename(env_path)
+        except BaseException:
+            shutil.rmtree(staging_path, ignore_errors=True)
+            raise
         
-        print(f"✅ Created custom environment: {custom_ee.name} at {env_path}")
+        logger.info(f"✅ Created custom environment: {custom_ee.name} at {env_path}")
         
         # Optionally start build immediately
         build_id = None
@@ -49,9 +84,9 @@ class CustomEEService:
                 )
                 build_response = await build_service.start_build(build_request)
                 build_id = build_response.build_id
-                print(f"🚀 Started immediate build for {custom_ee.name}: {build_id}")
+                logger.info(f"🚀 Started immediate build for {custom_ee.name}: {build_id}")
             except Exception as e:
-                print(f"⚠️ Failed to start immediate build: {e}")
+                logger.warning(f"⚠️ Failed to start immediate build: {e}")
         
         return CustomEEResponse(
             success=True,
@@ -61,6 +96,107 @@ class CustomEEService:
             build_id=build_id
         )
     
+    def _valid_name(self, name: str) -> bool:
+        return bool(name) and name.replace('-', '').replace('_', '').isalnum()
+    
+    async def import_environments(self, data: bytes, build: bool = False) -> BulkImportResponse:
+        """Create many environments from a tar/zip archive or multi-document YAML, all or none
+        
+        Every definition is validated and dependency-preflighted in parallel
+        while staged next to its final location; only if all pass are they
+        renamed into place.
+        """
+        bundle = await asyncio.to_thread(
+            read_environment_bundle, data, settings.IMPORT_MAX_BYTES, settings.IMPORT_MAX_ENVIRONMENTS
+        )
+        
+        invalid_names = [name for name in bundle if not self._valid_name(name)]
+        if invalid_names:
+            raise ValueError("Environment names must contain only letters, numbers, hyphens, and underscores: "
+                             + ", ".join(invalid_names))
+        
+        environments_dir = Path(settings.ENVIRONMENTS_DIR)
+        existing = sorted(name for name in bundle if (environments_dir / name).exists())
+        if existing:
+            raise FileExistsError(f"Environments already exist: {', '.join(existing)}")
+        
+        # Hidden staging directories at the same depth, so relative paths resolve as they will later
+        import_id = uuid.uuid4().hex[:8]
+        staged = {name: environments_dir / f".{name}.import-{import_id}" for name in bundle}
+        moved = []
+        try:
+            await asyncio.to_thread(self._write_staged, bundle, staged)
+            errors, warnings = await self._check_staged(staged)
+            if errors:
+                raise ValueError("Import rejected, no environments were created: " + "; ".join(
+                    f"{name}: {', '.join(env_errors)}" for name, env_errors in errors.items()
+                ))
+            
+            for name, staging_path in staged.items():
+                target = environments_dir / name
+                if target.exists():
+                    raise FileExistsError(f"Environment '{name}' already exists")
+                staging_path.rename(target)
+                moved.append(name)
+        except BaseException:
+            for name in reversed(moved):
+                (environments_dir / name).rename(staged[name])
+            for staging_path in staged.values():
+                shutil.rmtree(staging_path, ignore_errors=True)
+            raise
+        
+        names = list(bundle)
+        logger.info(f"✅ Imported {len(names)} custom environments: {', '.join(names)}")
+        
+        # Optionally build them all in one batched build
+        build_id = None
+        message = f"Imported {len(names)} environments"
+        if build:
+            try:
+                build_response = await build_service.start_build(BuildRequest(
+                    environments=names,
+                    container_runtime=settings.CONTAINER_RUNTIME
+                ))
+                build_id = build_response.build_id
+                logger.info(f"🚀 Started batched build for {len(names)} imported environments: {build_id}")
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to start build of imported environments: {e}")
+                message += f"; build not started: {e}"
+        
+        return BulkImportResponse(
+            success=True,
+            message=message,
+            environments=names,
+            warnings=[f"{name}: {warning}" for name, env_warnings in warnings.items() for warning in env_warnings],
+            build_id=build_id
+        )
+    
+    def _write_staged(self, bundle: Dict[str, Dict[str, bytes]], staged: Dict[str, Path]):
+        for name, files in bundle.items():
+            for relative_path, content in files.items():
+                file_path = staged[name] / relative_path
+                ensure_directory_exists(str(file_path.parent))
+                file_path.write_bytes(content)
+    
+    async def _check_staged(self, staged: Dict[str, Path]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """Validation and preflight errors, plus preflight warnings, per staged environment"""
+        checks = [environment_service.validate_paths(list(staged.values()))]
+        if settings.PREFLIGHT_ENABLED:
+            checks.append(preflight_service.check_environments(staged))
+        results = await asyncio.gather(*checks)
+        
+        errors: Dict[str, List[str]] = {}
+        for name, validation in zip(staged, results[0]):
+            for issue in validation.errors:
+                location = f"{issue.file}:{issue.line}" if issue.line else issue.file
+                errors.setdefault(name, []).append(f"{location}: {issue.message}")
+        warnings: Dict[str, List[str]] = {}
+        if len(results) > 1:
+            preflight_errors, warnings = results[1]
+            for name, env_errors in preflight_errors.items():
+                errors.setdefault(name, []).extend(env_errors)
+        return errors, warnings
+    
     async def _create_from_yaml(self, custom_ee: CustomEERequest, env_path: Path):
         """Create environment from YAML import"""
         if not custom_ee.yaml_content or not custom_ee.yaml_content.strip():
@@ -6,15 +6,30 @@ from typing import Dict, List
 
 from app.models.dashboard_models import DashboardStats, SuccessRate, BuildIssue, LargeImage, RecentUpdate, CurrentBuild
 from app.core.config import settings
-from app.services.environment_service import EnvironmentService
+from app.services.environment_service import environment_service
 from app.services.build_service import build_service
+from app.services.build_store import build_store
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 
 class DashboardService:
     """Service for dashboard analytics and statistics"""
     
     def __init__(self):
-        self.environment_service = EnvironmentService()
+        # Share the global service so its parse cache is shared too
+        self.environment_service = environment_service
+    
+    def get_content_version(self) -> list:
+        """Cheap version of everything the dashboard stats are computed from"""
+        # Durations and "days ago" are reported in whole minutes
+        minute = int(datetime.now().timestamp() // 60)
+        return [
+            self.environment_service.get_content_version(include_files=True),
+            build_service.state_version,
+            minute
+        ]
     
     def get_dashboard_stats(self) -> DashboardStats:
         """Get comprehensive dashboard statistics"""
@@ -71,16 +86,15 @@ class DashboardService:
                             days_ago=(datetime.now() - modified_time).days
                         ))
             
-            # Get currently building environments
-            for build_id, build_info in build_service.running_builds.items():
-                process = build_info.get("process")
-                if process and process.returncode is None:
-                    current_builds.append(CurrentBuild(
-                        build_id=build_id,
-                        environments=build_info["environments"],
-                        started=build_info["start_time"].isoformat(),
-                        duration_minutes=int((datetime.now() - build_info["start_time"]).total_seconds() / 60)
-                    ))
+            # Get currently building environments (in any worker)
+            for build in build_store.get_running_builds():
+                started = datetime.fromtimestamp(build["start_time"])
+                current_builds.append(CurrentBuild(
+                    build_id=build["build_id"],
+                    environments=build["environments"],
+                    started=started.isoformat(),
+                    duration_minutes=int((datetime.now() - started).total_seconds() / 60)
+                ))
             
             # Calculate success rate
             success_rate = self._calculate_build_success_rate()
@@ -108,7 +122,7 @@ class DashboardService:
             )
             
         except Exception as e:
-            print(f"❌ Error getting dashboard stats: {e}")
+            logger.error(f"❌ Error getting dashboard stats: {e}")
             return self._empty_stats()
     
     def _calculate_build_success_rate(self) -> SuccessRate:
@@ -116,20 +130,8 @@ class DashboardService:
         try:
             cutoff_date = datetime.now() - timedelta(days=30)
             
-            total_builds = 0
-            successful_builds = 0
-            
-            # Check completed builds
-            for build_id, build_info in build_service.completed_builds.items():
-                if build_info.get("start_time") and build_info["start_time"] > cutoff_date:
-                    total_builds += 1
-                    if build_info.get("return_code") == 0:
-                        successful_builds += 1
-            
-            # Check running builds (count as in-progress)
-            for build_id, build_info in build_service.running_builds.items():
-                if build_info.get("start_time") and build_info["start_time"] > cutoff_date:
-                    total_builds += 1
+            # Running builds count towards the total as in-progress
+            total_builds, successful_builds = build_store.count_builds_since(cutoff_date.timestamp())
             
             percentage = 100 if total_builds == 0 else round((successful_builds / total_builds) * 100)
             
@@ -141,7 +143,7 @@ class DashboardService:
             )
             
         except Exception as e:
-            print(f"❌ Error calculating success rate: {e}")
+            logger.error(f"❌ Error calculating success rate: {e}")
             return SuccessRate(percentage=0, successful_builds=0, total_builds=0, period_days=30)
     
     def _empty_stats(self) -> DashboardStats:
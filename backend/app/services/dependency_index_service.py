@@ -0,0 +1,183 @@
+# backend/app/services/dependency_index_service.py - Inverted dependency index
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.models.environment_models import DependencyMatch, DependencySearchResult
+from app.core.config import settings
+from app.services.environment_service import environment_service
+from app.utils.dependency_index import (
+    DEPENDENCY_KINDS, constraint_allows, constraint_matches, dependency_key,
+    environment_build_inputs, extract_environment_dependencies, image_keys, parse_dependency_query
+)
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class DependencyIndexService:
+    """Maps pip packages, collections, bindep packages and base images to the environments using them"""
+
+    def __init__(self):
+        # env name -> file fingerprint the entries were extracted from
+        self._fingerprints: Dict[str, list] = {}
+        # env name -> dependency entries
+        self._entries: Dict[str, List[dict]] = {}
+        # env name -> resolved paths of every file its build reads
+        self._inputs: Dict[str, List[str]] = {}
+        # kind -> key -> env name -> entries
+        self._index: Dict[str, Dict[str, Dict[str, List[dict]]]] = {kind: {} for kind in DEPENDENCY_KINDS}
+        self._refreshed_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+
+    def _scan(self) -> Tuple[List[str], Dict[str, Tuple[list, List[dict], List[str]]]]:
+        """Current environment names plus fresh entries and inputs for those whose files changed"""
+        environments_dir = Path(settings.ENVIRONMENTS_DIR)
+        if not environments_dir.exists():
+            return [], {}
+        playbook_dir = str(Path(settings.PLAYBOOK_PATH).resolve().parent)
+
+        names = []
+        changed = {}
+        with os.scandir(environments_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_dir():
+                    continue
+                names.append(entry.name)
+                fingerprint = environment_service.environment_fingerprint(Path(entry.path))
+                if self._fingerprints.get(entry.name) != fingerprint:
+                    changed[entry.name] = (fingerprint, extract_environment_dependencies(entry.path),
+                                           environment_build_inputs(entry.path, playbook_dir))
+        return names, changed
+
+    def _index_keys(self, entry: dict) -> List[str]:
+        return sorted(image_keys(entry["name"])) if entry["kind"] == "image" else [entry["key"]]
+
+    def _remove(self, name: str):
+        for entry in self._entries.pop(name, []):
+            for key in self._index_keys(entry):
+                by_env = self._index[entry["kind"]].get(key)
+                if by_env is not None:
+                    by_env.pop(name, None)
+                    if not by_env:
+                        del self._index[entry["kind"]][key]
+        self._fingerprints.pop(name, None)
+        self._inputs.pop(name, None)
+
+    def _add(self, name: str, fingerprint: list, entries: List[dict], inputs: List[str]):
+        self._fingerprints[name] = fingerprint
+        self._entries[name] = entries
+        self._inputs[name] = inputs
+        for entry in entries:
+            for key in self._index_keys(entry):
+                self._index[entry["kind"]].setdefault(key, {}).setdefault(name, []).append(entry)
+
+    async def refresh(self, force: bool = False) -> int:
+        """Re-extract environments whose files changed since the last scan; returns how many did"""
+        if not force and time.monotonic() - self._refreshed_at < settings.DEPENDENCY_INDEX_REFRESH_SECONDS:
+            return 0
+
+        async with self._refresh_lock:
+            if not force and time.monotonic() - self._refreshed_at < settings.DEPENDENCY_INDEX_REFRESH_SECONDS:
+                return 0
+            names, changed = await asyncio.to_thread(self._scan)
+
+            removed = set(self._entries) - set(names)
+            for name in removed:
+                self._remove(name)
+            for name, (fingerprint, entries, inputs) in changed.items():
+                self._remove(name)
+                self._add(name, fingerprint, entries, inputs)
+            self._refreshed_at = time.monotonic()
+
+        if changed or removed:
+            logger.debug("🗂️ Dependency index updated: %d changed, %d removed", len(changed), len(removed))
+        return len(changed)
+
+    @property
+    def environment_count(self) -> int:
+        return len(self._entries)
+
+    def base_images(self) -> Dict[str, str]:
+        """Base image reference of every indexed environment that declares one"""
+        return {name: entry["name"] for name, entries in self._entries.items()
+                for entry in entries if entry["kind"] == "image"}
+
+    def environments_reading(self, path: str) -> Dict[str, List[str]]:
+        """Environments whose build reads the given file, or any file under the given directory"""
+        path = os.path.realpath(path)
+        prefix = path.rstrip(os.sep) + os.sep
+        environments_dir = os.path.realpath(settings.ENVIRONMENTS_DIR)
+        readers: Dict[str, List[str]] = {}
+        for name, inputs in self._inputs.items():
+            matched = [input_path for input_path in inputs if input_path == path or input_path.startswith(prefix)]
+            # A file being added to an environment directory isn't among its inputs yet
+            if not matched and (path + os.sep).startswith(os.path.join(environments_dir, name) + os.sep):
+                matched = [path]
+            if matched:
+                readers[name] = matched
+        return readers
+
+    async def search(self, query: str, kind: Optional[str] = None, constraint: Optional[str] = None,
+                     allows: Optional[str] = None, partial: bool = False) -> DependencySearchResult:
+        """Environments that declare a dependency, optionally narrowed by its version constraint
+
+        The query may carry its own constraint ('ansible-core<2.17',
+        'community.vmware:>=3.0'). With partial, names containing the query match.
+        """
+        if kind is not None and kind not in DEPENDENCY_KINDS:
+            raise ValueError(f"Unknown dependency kind '{kind}'; expected one of {', '.join(DEPENDENCY_KINDS)}")
+        if not query.strip():
+            raise ValueError("Search query must not be empty")
+
+        await self.refresh()
+
+        name, query_constraint = parse_dependency_query(query, kind)
+        constraint = constraint or query_constraint
+
+        matches: List[DependencyMatch] = []
+        for search_kind in ([kind] if kind else DEPENDENCY_KINDS):
+            by_key = self._index[search_kind]
+            # Images carry no version constraint; a tag in the query is dropped with it
+            key = dependency_key(search_kind, query if search_kind == "image" else name)
+            if partial:
+                keys = [candidate for candidate in by_key if key in candidate]
+            else:
+                keys = [key] if key in by_key else []
+
+            seen = set()
+            for matched_key in keys:
+                for env_name, entries in by_key[matched_key].items():
+                    for entry in entries:
+                        if id(entry) in seen:
+                            continue
+                        seen.add(id(entry))
+                        if search_kind != "image":
+                            if not constraint_matches(search_kind, entry["constraint"], constraint):
+                                continue
+                            if allows is not None and not constraint_allows(search_kind, entry["constraint"], allows):
+                                continue
+                        matches.append(DependencyMatch(
+                            environment=env_name,
+                            kind=search_kind,
+                            name=entry["name"],
+                            constraint=entry["constraint"],
+                            source=entry["source"]
+                        ))
+
+        matches.sort(key=lambda match: (match.environment, match.kind, match.name))
+        return DependencySearchResult(
+            query=query,
+            kind=kind,
+            constraint=constraint,
+            environments=sorted({match.environment for match in matches}),
+            matches=matches,
+            indexed_environments=self.environment_count
+        )
+
+
+# Create global service instance
+dependency_index_service = DependencyIndexService()
@@ -1,17 +1,76 @@
 # backend/app/services/environment_service.py - Environment Management Service
 
+import asyncio
+import hashlib
+import math
+import multiprocessing
+import os
+import time
 import yaml
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional, Tuple
 
-from app.models.environment_models import Environment, EnvironmentList, EnvironmentHealth, EnvironmentAnalysis
+from app.models.environment_models import (
+    Environment, EnvironmentList, EnvironmentHealth, EnvironmentAnalysis,
+    EnvironmentValidation, EnvironmentValidationReport
+)
 from app.core.config import settings
+from app.utils.ee_validation import validate_environment_dirs
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 
 class EnvironmentService:
     """Service for managing execution environments"""
     
+    def __init__(self):
+        # path -> (mtime_ns, size, parsed content); entries refresh when the file changes
+        self._parse_cache: Dict[str, Tuple[int, int, Any]] = {}
+        # env dir -> (file fingerprint, validation result)
+        self._validation_cache: Dict[str, Tuple[list, dict]] = {}
+        # env dir -> (file fingerprint, content digest)
+        self._digest_cache: Dict[str, Tuple[list, str]] = {}
+        self._validation_pool: Optional[ProcessPoolExecutor] = None
+    
+    def _cached_parse(self, file_path: Path, parser: Callable[[Any], Any]) -> Any:
+        """Parse a file once per (mtime, size) and reuse the result until it changes"""
+        stat = file_path.stat()
+        key = str(file_path)
+        cached = self._parse_cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        
+        with open(file_path, 'r') as f:
+            parsed = parser(f)
+        self._parse_cache[key] = (stat.st_mtime_ns, stat.st_size, parsed)
+        return parsed
+    
+    def load_yaml(self, file_path: Path) -> Any:
+        """Load a YAML file through the parse cache (callers must not mutate the result)"""
+        return self._cached_parse(file_path, yaml.safe_load)
+    
+    def load_lines(self, file_path: Path) -> List[str]:
+        """Read a text file's lines through the parse cache"""
+        return self._cached_parse(file_path, lambda f: f.readlines())
+    
+    def warm_parse_cache(self) -> int:
+        """Parse every environment definition so later requests hit the cache"""
+        environments_dir = Path(settings.ENVIRONMENTS_DIR)
+        if not environments_dir.exists():
+            return 0
+        
+        count = 0
+        for env_dir in environments_dir.iterdir():
+            if env_dir.is_dir() and not env_dir.name.startswith('.'):
+                self.analyze_environment_health(env_dir)
+                self.estimate_image_size(env_dir)
+                count += 1
+        return count
+    
     def get_environments(self) -> EnvironmentList:
         """Get list of available environments"""
         environments = []
@@ -32,6 +91,166 @@ class EnvironmentService:
         
         return EnvironmentList(environments=sorted(environments, key=lambda x: x.name))
     
+    def get_content_version(self, include_files: bool = False) -> list:
+        """Cheap fingerprint of ENVIRONMENTS_DIR built from directory entries and stat data
+        
+        Without include_files it covers what get_environments() returns; with it,
+        every file's size and mtime is included so edits to definitions show up too.
+        """
+        environments_dir = Path(settings.ENVIRONMENTS_DIR)
+        if not environments_dir.exists():
+            return []
+        
+        version = []
+        with os.scandir(environments_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_dir():
+                    continue
+                
+                if include_files:
+                    files = []
+                    with os.scandir(entry.path) as env_entries:
+                        for env_entry in env_entries:
+                            if env_entry.is_file():
+                                stat = env_entry.stat()
+                                files.append((env_entry.name, stat.st_mtime_ns, stat.st_size))
+                    version.append((entry.name, sorted(files)))
+                else:
+                    has_ee_file = os.path.exists(os.path.join(entry.path, "execution-environment.yml"))
+                    version.append((entry.name, has_ee_file))
+        
+        return sorted(version)
+    
+    def _resolve_environment_dirs(self, names: Optional[List[str]]) -> List[Path]:
+        """Environment directories to validate - all of them, or the named ones"""
+        environments_dir = Path(settings.ENVIRONMENTS_DIR)
+        if not environments_dir.exists():
+            raise FileNotFoundError("Environments directory not found")
+        
+        if names is None:
+            return sorted(
+                (env_dir for env_dir in environments_dir.iterdir()
+                 if env_dir.is_dir() and not env_dir.name.startswith('.')),
+                key=lambda env_dir: env_dir.name
+            )
+        
+        env_dirs = []
+        for name in dict.fromkeys(names):
+            if not name or name.startswith('.') or '/' in name or '\\' in name:
+                raise ValueError(f"Invalid environment name '{name}'")
+            env_dir = environments_dir / name
+            if not env_dir.is_dir():
+                raise FileNotFoundError(f"Environment '{name}' not found")
+            env_dirs.append(env_dir)
+        return env_dirs
+    
+    def environment_fingerprint(self, env_dir: Path) -> list:
+        """Names, sizes and mtimes of every file in an environment directory"""
+        fingerprint = []
+        for root, _, files in os.walk(env_dir):
+            for file_name in files:
+                stat = os.stat(os.path.join(root, file_name))
+                fingerprint.append((os.path.relpath(os.path.join(root, file_name), env_dir),
+                                    stat.st_mtime_ns, stat.st_size))
+        return sorted(fingerprint)
+    
+    def environment_digest(self, env_dir: Path) -> str:
+        """SHA-256 over the paths and contents of every file in an environment directory
+        
+        Recomputed only when the directory's fingerprint changes.
+        """
+        fingerprint = self.environment_fingerprint(env_dir)
+        cached = self._digest_cache.get(str(env_dir))
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+        
+        digest = hashlib.sha256()
+        for relative_path, _, size in fingerprint:
+            digest.update(f"{relative_path}\0{size}\0".encode())
+            with open(env_dir / relative_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        self._digest_cache[str(env_dir)] = (fingerprint, digest.hexdigest())
+        return digest.hexdigest()
+    
+    def _get_validation_pool(self) -> Tuple[ProcessPoolExecutor, int]:
+        """Create the validation process pool on first use"""
+        workers = settings.VALIDATION_WORKERS or os.cpu_count() or 1
+        if self._validation_pool is None:
+            # spawn rather than fork: this process runs threads (logging, to_thread)
+            self._validation_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._validation_pool, workers
+    
+    def shutdown_validation_pool(self):
+        """Stop the validation worker processes"""
+        if self._validation_pool is not None:
+            self._validation_pool.shutdown(wait=False, cancel_futures=True)
+            self._validation_pool = None
+    
+    async def _run_validation(self, env_dirs: List[str]) -> List[dict]:
+        """Validate environment directories, spreading large batches across the process pool"""
+        if len(env_dirs) <= settings.VALIDATION_INLINE_MAX:
+            return await asyncio.to_thread(validate_environment_dirs, env_dirs)
+        
+        pool, workers = self._get_validation_pool()
+        # A few chunks per worker keeps them all busy when some environments are slower
+        chunk_size = max(1, math.ceil(len(env_dirs) / (workers * 4)))
+        chunks = [env_dirs[i:i + chunk_size] for i in range(0, len(env_dirs), chunk_size)]
+        loop = asyncio.get_running_loop()
+        try:
+            batches = await asyncio.gather(
+                *(loop.run_in_executor(pool, validate_environment_dirs, chunk) for chunk in chunks)
+            )
+        except BrokenProcessPool:
+            logger.warning("⚠️ Validation process pool failed, validating in a thread instead")
+            self.shutdown_validation_pool()
+            return await asyncio.to_thread(validate_environment_dirs, env_dirs)
+        
+        return [result for batch in batches for result in batch]
+    
+    async def validate_paths(self, env_dirs: List[Path]) -> List[EnvironmentValidation]:
+        """Validate directories outside the environment listing, such as staged imports (uncached)"""
+        results = await self._run_validation([str(env_dir) for env_dir in env_dirs])
+        return [EnvironmentValidation(**result) for result in results]
+    
+    async def validate_environments(self, names: Optional[List[str]] = None) -> EnvironmentValidationReport:
+        """Validate environment definitions against the ansible-builder schema in parallel
+        
+        Results are cached per environment until one of its files changes.
+        """
+        started = time.perf_counter()
+        env_dirs = [str(env_dir) for env_dir in self._resolve_environment_dirs(names)]
+        
+        fingerprints = await asyncio.to_thread(
+            lambda: {env_dir: self.environment_fingerprint(Path(env_dir)) for env_dir in env_dirs}
+        )
+        results: Dict[str, dict] = {}
+        stale = []
+        for env_dir in env_dirs:
+            cached = self._validation_cache.get(env_dir)
+            if cached and cached[0] == fingerprints[env_dir]:
+                results[env_dir] = cached[1]
+            else:
+                stale.append(env_dir)
+        
+        if stale:
+            for env_dir, result in zip(stale, await self._run_validation(stale)):
+                self._validation_cache[env_dir] = (fingerprints[env_dir], result)
+                results[env_dir] = result
+        
+        validations = [EnvironmentValidation(**results[env_dir]) for env_dir in env_dirs]
+        valid_count = sum(1 for validation in validations if validation.valid)
+        
+        return EnvironmentValidationReport(
+            results=validations,
+            total=len(validations),
+            valid_count=valid_count,
+            invalid_count=len(validations) - valid_count,
+            duration_ms=round((time.perf_counter() - started) * 1000)
+        )
+    
     def analyze_environment_health(self, env_dir: Path) -> EnvironmentHealth:
         """Analyze an environment for build readiness and issues"""
         issues = []
@@ -48,8 +267,7 @@ class EnvironmentService:
             )
         
         try:
-            with open(ee_file, 'r') as f:
-                ee_config = yaml.safe_load(f)
+            ee_config = self.load_yaml(ee_file)
             
             if not ee_config:
                 return EnvironmentHealth(
@@ -124,8 +342,7 @@ class EnvironmentService:
             return estimated_size
         
         try:
-            with open(ee_file, 'r') as f:
-                ee_config = yaml.safe_load(f)
+            ee_config = self.load_yaml(ee_file)
             
             if not ee_config:
                 return estimated_size
@@ -138,7 +355,7 @@ class EnvironmentService:
             estimated_size += self._estimate_system_packages(env_dir, dependencies.get("system"))
             
         except Exception as e:
-            print(f"❌ Error estimating size for {env_dir.name}: {e}")
+            logger.error(f"❌ Error estimating size for {env_dir.name}: {e}")
         
         return min(estimated_size, 2000)  # Cap at 2GB
     
@@ -164,8 +381,7 @@ class EnvironmentService:
             return 0
         
         try:
-            with open(req_path, 'r') as f:
-                lines = f.readlines()
+            lines = self.load_lines(req_path)
             package_count = len([line for line in lines if line.strip() and not line.startswith('#')])
             return package_count * 10  # ~10MB per package
         except:
@@ -185,8 +401,7 @@ class EnvironmentService:
             return 0
         
         try:
-            with open(req_path, 'r') as f:
-                galaxy_config = yaml.safe_load(f)
+            galaxy_config = self.load_yaml(req_path)
             
             if galaxy_config and "collections" in galaxy_config:
                 collection_count = len(galaxy_config["collections"])
@@ -210,8 +425,7 @@ class EnvironmentService:
             return 0
         
         try:
-            with open(req_path, 'r') as f:
-                lines = f.readlines()
+            lines = self.load_lines(req_path)
             package_count = len([line for line in lines if line.strip() and not line.startswith('#')])
             return package_count * 20  # ~20MB per system package
         except:
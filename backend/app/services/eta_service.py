@@ -0,0 +1,124 @@
+# backend/app/services/eta_service.py - Build duration prediction and progress
+
+import time
+from pathlib import Path
+from statistics import mean, median
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.build_store import build_store
+from app.services.environment_service import environment_service
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# An environment running past its prediction is assumed to need this share of it again
+OVERRUN_ALLOWANCE = 0.1
+
+
+class EtaService:
+    """Predicts how long environment builds take and how far along a build is
+
+    An environment rebuilt from inputs it was built from before is predicted
+    from those builds (layer caches make them far faster than a first
+    build); otherwise from all its builds. One never built is predicted
+    from the mean of all environments, scaled by the estimated size of its
+    definition relative to theirs, so first builds are still ordered and
+    packed by expected cost. Every successful build refines the moving
+    averages.
+    """
+
+    def predict(self, environments: Sequence[str], input_keys: Dict[str, str]) -> Dict[str, float]:
+        """Predicted build seconds for each environment"""
+        by_input = build_store.get_environment_durations(environments)
+        profiles = build_store.get_environment_profiles(environments)
+        predictions = {}
+        for env in environments:
+            duration = by_input.get(env, {}).get(input_keys.get(env))
+            if duration is None:
+                duration = (profiles.get(env) or {}).get("duration")
+            if duration is not None:
+                predictions[env] = round(duration, 1)
+
+        cold = [env for env in environments if env not in predictions]
+        if cold:
+            predictions.update(self._predict_unbuilt(cold))
+        return {env: predictions[env] for env in environments}
+
+    def _predict_unbuilt(self, environments: Sequence[str]) -> Dict[str, float]:
+        """Mean learned duration times each environment's size relative to the median of built ones"""
+        learned = build_store.get_profile_durations()
+        environments_dir = Path(settings.ENVIRONMENTS_DIR)
+        sizes = {env: environment_service.estimate_image_size(environments_dir / env)
+                 for env in dict.fromkeys([*environments, *learned]) if (environments_dir / env).is_dir()}
+
+        fallback = mean(learned.values()) if learned else settings.ETA_DEFAULT_SECONDS
+        # Before anything was built, the environments at hand are the yardstick
+        reference = [sizes[env] for env in learned if env in sizes] or list(sizes.values())
+        if not reference:
+            return {env: round(fallback, 1) for env in environments}
+        typical = median(reference)
+        return {env: round(fallback * sizes.get(env, typical) / typical, 1) for env in environments}
+
+    def estimate(self, build_info: dict, shared_etas: List[float], queue_wait: float = 0.0,
+                 now: Optional[float] = None) -> Tuple[Optional[float], float]:
+        """(predicted finish timestamp, percent complete) of a queued or running build
+
+        shared_etas are the predicted finish times of the builds this one
+        shares environments with; queue_wait is how long a queued build is
+        expected to wait for admission.
+        """
+        now = now or time.time()
+        predicted = build_info.get("predicted_durations") or {}
+        usage = build_info.get("environment_usage") or {}
+        # Lanes build in parallel, each one environment after another
+        remaining = 0.0
+        for lane in build_info.get("build_lanes") or [build_info.get("own_environments") or []]:
+            lane_remaining = 0.0
+            for env in lane:
+                entry = usage.get(env) or {}
+                duration = predicted.get(env, settings.ETA_DEFAULT_SECONDS)
+                if entry.get("finished"):
+                    continue
+                if entry.get("started"):
+                    lane_remaining += max(duration - (now - entry["started"]), duration * OVERRUN_ALLOWANCE)
+                else:
+                    lane_remaining += duration
+            remaining = max(remaining, lane_remaining)
+
+        if build_info.get("status") == "queued":
+            remaining += queue_wait
+        remaining = max([remaining] + [eta - now for eta in shared_etas])
+
+        started = build_info.get("admitted_at") or build_info["created_at"]
+        elapsed = max(now - started, 0.0) if build_info.get("status") != "queued" else 0.0
+        progress = 100.0 * elapsed / (elapsed + remaining) if elapsed + remaining > 0 else 99.0
+        return now + remaining, round(min(progress, 99.0), 1)
+
+    def queue_wait(self, position: int, running_etas: List[float], now: Optional[float] = None) -> float:
+        """Expected wait of a queued build: until as many running builds finish as are ahead of it, plus one"""
+        now = now or time.time()
+        if not running_etas:
+            return 0.0
+        return max(running_etas[min(position, len(running_etas) - 1)] - now, 0.0)
+
+    def record(self, build_info: dict):
+        """Learn the durations of the environments a build finished successfully"""
+        usage = build_info.get("environment_usage") or {}
+        input_keys = build_info.get("input_keys") or {}
+        durations = {
+            env: (input_keys[env], entry["finished"] - entry["started"])
+            for env, entry in usage.items()
+            if entry.get("finished") and entry.get("started") and env in input_keys
+            and env in build_info["successful_builds"]
+        }
+        if not durations:
+            return
+        try:
+            build_store.record_environment_durations(durations, settings.ETA_LEARNING_WEIGHT)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record environment build durations: {e}")
+
+
+# Create global service instance
+eta_service = EtaService()
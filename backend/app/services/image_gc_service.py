@@ -0,0 +1,208 @@
+# backend/app/services/image_gc_service.py - Disk-pressure-aware image garbage collection
+
+import asyncio
+import fcntl
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.services.build_store import build_store
+from app.services.dependency_index_service import dependency_index_service
+from app.utils.container_utils import (
+    get_image_store_path, image_references, image_size_bytes, list_container_images,
+    normalize_image_reference, prune_dangling_images, remove_container_image
+)
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+GIB = 1024 ** 3
+
+
+class ImageGCService:
+    """Evicts the least recently built or used images when the image store runs short of space
+
+    Candidates are the environment images this API built and the base images
+    its environments are built from; anything else in the store is left
+    alone. Images needed by builds running in any worker are never evicted.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def record_built(self, environments: Iterable[str]):
+        """Stamp environment images as just built"""
+        self._touch(environments, built=True)
+
+    def record_used(self, environments: Iterable[str]):
+        """Stamp environment images as just used (pushed, for example)"""
+        self._touch(environments, built=False)
+
+    def _touch(self, environments: Iterable[str], built: bool):
+        references = [normalize_image_reference(f"{env}:latest") for env in environments]
+        if not references:
+            return
+        try:
+            build_store.touch_images(references, built=built)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record image usage: {e}")
+
+    def start(self):
+        """Start the periodic collector (unless IMAGE_GC_INTERVAL_SECONDS is 0)"""
+        if settings.IMAGE_GC_INTERVAL_SECONDS <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.IMAGE_GC_INTERVAL_SECONDS)
+            try:
+                await self.collect()
+            except Exception as e:
+                logger.warning(f"⚠️ Image garbage collection failed: {e}")
+
+    def _acquire_worker_lock(self):
+        """Exclusive lock file next to the build database so one API worker collects at a time"""
+        lock_path = Path(settings.BUILD_DB_PATH).parent / "image-gc.lock"
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(lock_path, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    async def collect(self) -> Optional[List[str]]:
+        """Run one collection pass; returns the evicted tags (None if another worker is collecting)"""
+        async with self._lock:
+            lock_file = self._acquire_worker_lock()
+            if lock_file is None:
+                return None
+            try:
+                await dependency_index_service.refresh()
+                base_images = dependency_index_service.base_images()
+                return await asyncio.to_thread(self._collect, base_images)
+            finally:
+                lock_file.close()
+
+    def _free_percent(self, store_path: Optional[str]) -> Optional[float]:
+        if store_path is None:
+            return None
+        try:
+            usage = shutil.disk_usage(store_path)
+        except OSError:
+            return None
+        return usage.free * 100.0 / usage.total if usage.total else None
+
+    def _store_bytes(self, images: List[dict]) -> int:
+        # Shared layers are counted once per image, so this errs on the large side
+        sizes = {image.get("Id") or image.get("ID") or id(image): image_size_bytes(image) for image in images}
+        return sum(sizes.values())
+
+    def _over_watermark(self, free_percent: Optional[float], store_bytes: int, high: bool) -> bool:
+        """Whether the store crosses the high watermark (start collecting) or the low one (keep going)"""
+        min_free = settings.IMAGE_GC_MIN_FREE_PERCENT if high else settings.IMAGE_GC_TARGET_FREE_PERCENT
+        if free_percent is not None and free_percent < min_free:
+            return True
+        max_store = settings.IMAGE_GC_MAX_STORE_GB
+        if max_store <= 0:
+            return False
+        if not high:
+            max_store = settings.IMAGE_GC_TARGET_STORE_GB or max_store * 0.8
+        return store_bytes > max_store * GIB
+
+    def _protected_images(self, base_images: Dict[str, str]) -> Set[str]:
+        """Images and base images of every environment a queued or running build is building"""
+        protected = set()
+        for build in build_store.get_running_builds(include_queued=True):
+            for env in build["environments"]:
+                protected.add(normalize_image_reference(f"{env}:latest"))
+                if env in base_images:
+                    protected.add(normalize_image_reference(base_images[env]))
+        return protected
+
+    def _collect(self, base_images: Dict[str, str]) -> List[str]:
+        store_path = get_image_store_path()
+        images = list_container_images()
+        free_percent = self._free_percent(store_path)
+        store_bytes = self._store_bytes(images)
+        if not self._over_watermark(free_percent, store_bytes, high=True):
+            return []
+
+        logger.info(f"🧹 Image store under pressure ({self._describe(free_percent, store_bytes)}), collecting")
+        protected = self._protected_images(base_images)
+
+        # Dangling layers first: nothing references them. A running build may still be using its cache though
+        if not protected and prune_dangling_images():
+            images = list_container_images()
+            free_percent = self._free_percent(store_path)
+            store_bytes = self._store_bytes(images)
+
+        # A base image was last used by the most recent build of an environment built from it
+        usage = build_store.get_image_usage()
+        last_used = dict(usage)
+        for env, base_image in base_images.items():
+            base_image = normalize_image_reference(base_image)
+            last_used[base_image] = max(last_used.get(base_image, 0.0),
+                                        usage.get(normalize_image_reference(f"{env}:latest"), 0.0))
+
+        candidates = []
+        tags_left: Dict[str, int] = {}
+        present = set()
+        for image in images:
+            image_id = image.get("Id") or image.get("ID")
+            for reference in image_references(image):
+                normalized = normalize_image_reference(reference)
+                present.add(normalized)
+                tags_left[image_id] = tags_left.get(image_id, 0) + 1
+                if normalized in last_used and normalized not in protected:
+                    candidates.append((last_used[normalized], reference, image_id, image_size_bytes(image)))
+
+        evicted = []
+        for _, reference, image_id, size in sorted(candidates, key=lambda candidate: candidate[0]):
+            if not self._over_watermark(free_percent, store_bytes, high=False):
+                break
+            if not remove_container_image(reference):
+                continue
+            evicted.append(reference)
+            # Space only comes back once the image's last tag is gone
+            tags_left[image_id] -= 1
+            if tags_left[image_id] == 0:
+                store_bytes -= size
+            free_percent = self._free_percent(store_path)
+
+        # Records of images removed outside the collector go too (an empty listing may just be an error)
+        gone = [normalize_image_reference(reference) for reference in evicted]
+        if images:
+            gone += [reference for reference in usage if reference not in present]
+        try:
+            build_store.forget_images(gone)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not update image usage records: {e}")
+
+        if self._over_watermark(free_percent, store_bytes, high=False):
+            logger.warning(f"⚠️ Evicted {len(evicted)} images, still under pressure: "
+                           f"{self._describe(free_percent, store_bytes)}", extra={"evicted": evicted})
+        else:
+            logger.info(f"🧹 Evicted {len(evicted)} images, now {self._describe(free_percent, store_bytes)}",
+                        extra={"evicted": evicted})
+        return evicted
+
+    def _describe(self, free_percent: Optional[float], store_bytes: int) -> str:
+        free = f"{free_percent:.1f}% free" if free_percent is not None else "free space unknown"
+        return f"{free}, images {store_bytes / GIB:.1f} GiB"
+
+
+# Create global service instance
+image_gc_service = ImageGCService()
@@ -0,0 +1,110 @@
+# backend/app/services/isolation_service.py - Resource isolation of build processes
+
+import os
+import shutil
+import subprocess
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.cgroups import cgroup_oom_kills, create_cgroup, is_cgroup2, join_cgroup_command, remove_cgroup
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ISOLATION_MODES = ("auto", "systemd", "cgroup", "off")
+MIB = 1024 ** 2
+
+
+class IsolationService:
+    """Runs each build's process tree in a cgroup of its own, with lower CPU and I/O weight than the API
+
+    With systemd the build runs in a transient scope (systemd-run --scope);
+    otherwise in a cgroup created under BUILD_CGROUP_PARENT. Containers that
+    a daemon or Podman's systemd cgroup manager places in cgroups of their
+    own are outside the build's cgroup.
+    """
+
+    def __init__(self):
+        self._mode: Optional[str] = None
+        # Cgroups of finished builds that still held processes when the build ended
+        self._leftover: List[str] = []
+
+    def _systemd_run_command(self) -> List[str]:
+        return ["systemd-run", *([] if os.geteuid() == 0 else ["--user"]), "--scope", "--quiet", "--collect"]
+
+    def _systemd_available(self) -> bool:
+        if not shutil.which("systemd-run"):
+            return False
+        try:
+            result = subprocess.run([*self._systemd_run_command(), "true"], capture_output=True, timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return result.returncode == 0
+
+    def _cgroup_available(self) -> bool:
+        parent = settings.BUILD_CGROUP_PARENT
+        return bool(parent) and is_cgroup2(parent) and os.access(parent, os.W_OK)
+
+    @property
+    def mode(self) -> str:
+        """Isolation in use: "systemd", "cgroup" or "off" (decided once per process)"""
+        if self._mode is None:
+            requested = settings.BUILD_ISOLATION
+            if requested not in ISOLATION_MODES:
+                logger.warning(f"⚠️ Unknown BUILD_ISOLATION '{requested}'; builds run without isolation")
+                self._mode = "off"
+            elif requested in ("auto", "systemd") and self._systemd_available():
+                self._mode = "systemd"
+            elif requested in ("auto", "cgroup") and self._cgroup_available():
+                self._mode = "cgroup"
+            else:
+                if requested not in ("auto", "off"):
+                    logger.warning(f"⚠️ Build isolation '{requested}' is not available here; builds run without it")
+                self._mode = "off"
+            logger.info(f"🧱 Build isolation: {self._mode}")
+        return self._mode
+
+    def _limits(self) -> str:
+        memory = f", memory max {settings.BUILD_MEMORY_MAX_MB} MiB" if settings.BUILD_MEMORY_MAX_MB else ""
+        return f"cpu weight {settings.BUILD_CPU_WEIGHT}, io weight {settings.BUILD_IO_WEIGHT}{memory}"
+
+    def isolate(self, build_id: str, cmd: List[str]) -> Tuple[List[str], Optional[str], Optional[str]]:
+        """The build command wrapped to run isolated, its cgroup directory (cgroup mode) and a log line"""
+        mode = self.mode
+        if mode == "systemd":
+            properties = [f"CPUWeight={settings.BUILD_CPU_WEIGHT}", f"IOWeight={settings.BUILD_IO_WEIGHT}"]
+            if settings.BUILD_MEMORY_MAX_MB:
+                properties.append(f"MemoryMax={settings.BUILD_MEMORY_MAX_MB}M")
+            wrapped = [*self._systemd_run_command(), f"--unit=ee-build-{build_id}",
+                       *(arg for prop in properties for arg in ("-p", prop)), "--", *cmd]
+            return wrapped, None, f"🧱 Isolated in scope ee-build-{build_id}.scope ({self._limits()})"
+
+        if mode == "cgroup":
+            path = os.path.join(settings.BUILD_CGROUP_PARENT, f"ee-build-{build_id}")
+            try:
+                memory_max = settings.BUILD_MEMORY_MAX_MB * MIB if settings.BUILD_MEMORY_MAX_MB else None
+                not_applied = create_cgroup(path, settings.BUILD_CPU_WEIGHT, settings.BUILD_IO_WEIGHT, memory_max)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not create cgroup for build {build_id}: {e}")
+                return cmd, None, f"⚠️ Running without isolation: could not create cgroup ({e})"
+            message = f"🧱 Isolated in cgroup {path} ({self._limits()})"
+            if not_applied:
+                message += f"; controllers not enabled for: {', '.join(not_applied)}"
+            return join_cgroup_command(path, cmd), path, message
+
+        return cmd, None, None
+
+    def release(self, build_info: dict) -> Optional[str]:
+        """Remove a finished build's cgroup; returns a log line if the memory limit killed part of it"""
+        path = build_info.get("cgroup")
+        if not path:
+            return None
+        message = None
+        if cgroup_oom_kills(path):
+            message = f"⚠️ Build processes were killed for exceeding BUILD_MEMORY_MAX_MB ({settings.BUILD_MEMORY_MAX_MB} MiB)"
+        self._leftover = [leftover for leftover in [*self._leftover, path] if not remove_cgroup(leftover)]
+        return message
+
+
+# Create global service instance
+isolation_service = IsolationService()
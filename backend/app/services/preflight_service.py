@@ -0,0 +1,169 @@
+# backend/app/services/preflight_service.py - Dependency preflight before builds
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin
+
+from app.core.config import settings
+from app.utils.dependency_preflight import (
+    collection_tarball_versions, collection_version_error, parse_pip_resolution, pip_dry_run_command,
+    preflight_inputs
+)
+from app.utils.stream_utils import run_streaming
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# (errors, reason the check was inconclusive)
+CheckResult = Tuple[List[str], Optional[str]]
+
+
+class PreflightService:
+    """Resolves environments' pip requirements and collection versions before a build starts
+
+    A dependency set that can't be installed fails here in seconds instead
+    of minutes into ansible-builder. Only the local sources configured are
+    used unless remote indexes are opted into. An index that can't be
+    reached, or a check that outlasts PREFLIGHT_REQUEST_TIMEOUT_SECONDS,
+    is inconclusive, which never blocks a build; an unfinished check keeps
+    running and later requests reuse its result.
+    """
+
+    def __init__(self):
+        # Conclusive results by input, shared by concurrent identical checks
+        self._pip_results: Dict[Tuple[str, ...], Tuple[float, asyncio.Task]] = {}
+        self._collection_versions: Dict[str, Tuple[float, asyncio.Task]] = {}
+        self._pip_slots = asyncio.Semaphore(max(1, settings.PREFLIGHT_CONCURRENCY))
+        self._processes: Set[asyncio.subprocess.Process] = set()
+
+    async def check_environments(self, env_dirs: Dict[str, Path]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """Errors and inconclusive-check warnings per environment name, checking all of them in parallel"""
+        results = await asyncio.gather(*(self.check_environment(env_dir) for env_dir in env_dirs.values()))
+        errors = {name: result[0] for name, result in zip(env_dirs, results) if result[0]}
+        warnings = {name: result[1] for name, result in zip(env_dirs, results) if result[1]}
+        return errors, warnings
+
+    async def check_environment(self, env_dir: Path) -> Tuple[List[str], List[str]]:
+        """Errors and warnings for one environment directory, within PREFLIGHT_REQUEST_TIMEOUT_SECONDS"""
+        timeout = settings.PREFLIGHT_REQUEST_TIMEOUT_SECONDS
+        try:
+            return await asyncio.wait_for(self._check_environment(env_dir), timeout)
+        except asyncio.TimeoutError:
+            return [], [f"dependency checks not finished within {timeout:g}s"]
+
+    async def _check_environment(self, env_dir: Path) -> Tuple[List[str], List[str]]:
+        requirements, collections = await asyncio.to_thread(preflight_inputs, str(env_dir))
+        results = await asyncio.gather(
+            self._check_pip(tuple(requirements)),
+            *(self._check_collection(name, constraint) for name, constraint in collections)
+        )
+        errors = [error for result_errors, _ in results for error in result_errors]
+        warnings = list(dict.fromkeys(warning for _, warning in results if warning))
+        return errors, warnings
+
+    async def _shared(self, cache: dict, key, check: Callable[[], Awaitable[CheckResult]]) -> CheckResult:
+        """Run a check once per key, reusing conclusive results for PREFLIGHT_CACHE_SECONDS"""
+        now = time.monotonic()
+        entry = cache.get(key)
+        if entry is not None:
+            started, task = entry
+            reusable = not task.done() or (
+                now - started < settings.PREFLIGHT_CACHE_SECONDS
+                and not task.cancelled() and task.exception() is None and task.result()[1] is None
+            )
+            if not reusable:
+                entry = None
+        if entry is None:
+            for stale_key in [k for k, (started, task) in cache.items()
+                              if task.done() and now - started >= settings.PREFLIGHT_CACHE_SECONDS]:
+                del cache[stale_key]
+            entry = (now, asyncio.create_task(check()))
+            cache[key] = entry
+        # One caller giving up must not cancel the check for the others
+        return await asyncio.shield(entry[1])
+
+    async def _check_pip(self, requirements: Tuple[str, ...]) -> CheckResult:
+        if not requirements or not (settings.PREFLIGHT_PIP_INDEX_URL or settings.PREFLIGHT_PIP_FIND_LINKS
+                                    or settings.PREFLIGHT_PIP_DEFAULT_INDEX):
+            return [], None
+        return await self._shared(self._pip_results, requirements, lambda: self._resolve_pip(requirements))
+
+    async def _resolve_pip(self, requirements: Tuple[str, ...]) -> CheckResult:
+        fd, requirements_file = tempfile.mkstemp(prefix="preflight-", suffix=".txt")
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(requirements) + "\n")
+
+        output: List[str] = []
+        command = pip_dry_run_command(requirements_file, settings.PREFLIGHT_PIP_INDEX_URL,
+                                      settings.PREFLIGHT_PIP_FIND_LINKS, settings.PREFLIGHT_INDEX_TIMEOUT_SECONDS)
+        try:
+            async with self._pip_slots:
+                return_code = await run_streaming(command, output.extend, settings.PREFLIGHT_TIMEOUT_SECONDS,
+                                                  self._processes, settings.LOG_READ_CHUNK_BYTES,
+                                                  settings.LOG_MAX_LINE_BYTES)
+        except asyncio.TimeoutError:
+            return [], f"pip resolution timed out after {settings.PREFLIGHT_TIMEOUT_SECONDS}s"
+        except OSError as e:
+            return [], f"could not run pip: {e}"
+        finally:
+            os.unlink(requirements_file)
+        return parse_pip_resolution(output, return_code)
+
+    async def _check_collection(self, name: str, constraint: Optional[str]) -> CheckResult:
+        if not settings.PREFLIGHT_COLLECTIONS_DIR and not settings.PREFLIGHT_GALAXY_SERVER:
+            return [], None
+        versions, warning = await self._shared(self._collection_versions, name,
+                                               lambda: self._lookup_collection(name))
+        if warning:
+            return [], warning
+        error = collection_version_error(name, constraint, versions)
+        return ([error] if error else []), None
+
+    async def _lookup_collection(self, name: str) -> Tuple[List[str], Optional[str]]:
+        """Available versions of a collection: the local tarball directory first, then the Galaxy server"""
+        if settings.PREFLIGHT_COLLECTIONS_DIR:
+            versions = await asyncio.to_thread(collection_tarball_versions, settings.PREFLIGHT_COLLECTIONS_DIR, name)
+            if versions or not settings.PREFLIGHT_GALAXY_SERVER:
+                return versions, None
+        try:
+            return await asyncio.to_thread(self._galaxy_versions, name), None
+        except (OSError, ValueError) as e:
+            return [], f"collection index unreachable ({e})"
+
+    def _galaxy_versions(self, name: str) -> List[str]:
+        """Every published version of a collection, following the v3 API's pagination"""
+        namespace, collection = name.split(".", 1)
+        url = urljoin(settings.PREFLIGHT_GALAXY_SERVER.rstrip("/") + "/",
+                      f"v3/collections/{namespace}/{collection}/versions/?limit=100")
+        versions = []
+        while url:
+            request = urllib.request.Request(url, headers={"Accept": "application/json"})
+            try:
+                with urllib.request.urlopen(request, timeout=settings.PREFLIGHT_INDEX_TIMEOUT_SECONDS) as response:
+                    body = json.load(response)
+            except urllib.error.HTTPError as e:
+                if e.code == 404:
+                    return []
+                raise
+            versions.extend(item["version"] for item in body.get("data") or []
+                            if isinstance(item, dict) and isinstance(item.get("version"), str))
+            next_link = (body.get("links") or {}).get("next")
+            url = urljoin(url, next_link) if next_link else None
+        return versions
+
+    def shutdown(self):
+        """Kill pip resolutions still running when the API stops"""
+        for process in list(self._processes):
+            if process.returncode is None:
+                process.kill()
+
+
+# Create global service instance
+preflight_service = PreflightService()
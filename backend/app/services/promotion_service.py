@@ -0,0 +1,283 @@
+# backend/app/services/promotion_service.py - Registry-to-registry image promotion
+
+import asyncio
+import shutil
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from app.models.promotion_models import (
+    ImagePromotion, PromotionList, PromotionRequest, PromotionResponse, PromotionStatus
+)
+from app.core.config import settings
+from app.services.build_store import build_store
+from app.utils.ee_validation import validate_image_reference
+from app.utils.file_utils import cleanup_temp_file
+from app.utils.registry_utils import (
+    manifest_blobs, parse_skopeo_progress, registry_reference, skopeo_copy_command,
+    skopeo_inspect_command, write_registry_authfile
+)
+from app.utils.stream_utils import run_streaming
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PromotionService:
+    """Copies image lists between registries concurrently with skopeo, without local storage"""
+
+    def __init__(self):
+        # Promotions running in this worker; finished ones are read back from the build store
+        self.promotions: Dict[str, dict] = {}
+        self._processes: Set[asyncio.subprocess.Process] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._record_locks: Dict[str, asyncio.Lock] = {}
+        self._progress_recorded_at: Dict[str, float] = {}
+
+    async def _record(self, promotion_info: dict):
+        """Share a promotion's state with other workers, writing in the order states were reached"""
+        promotion_id = promotion_info["promotion_id"]
+        async with self._record_locks.setdefault(promotion_id, asyncio.Lock()):
+            # Copied here, as the copies running on the event loop keep updating it
+            snapshot = {**promotion_info, "images": [dict(state) for state in promotion_info["images"]]}
+            try:
+                await asyncio.to_thread(build_store.record_promotion, promotion_id, snapshot)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not record promotion {promotion_id}: {e}")
+
+    def _record_progress(self, promotion_info: dict):
+        """Share blob progress at most once per PROMOTION_PROGRESS_RECORD_SECONDS"""
+        promotion_id = promotion_info["promotion_id"]
+        now = time.monotonic()
+        if now - self._progress_recorded_at.get(promotion_id, 0.0) < settings.PROMOTION_PROGRESS_RECORD_SECONDS:
+            return
+        self._progress_recorded_at[promotion_id] = now
+        task = asyncio.create_task(self._record(promotion_info))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def start_promotion(self, promotion_request: PromotionRequest) -> PromotionResponse:
+        """Validate a promotion request and start copying its images in the background"""
+        images = list(dict.fromkeys(image.strip() for image in promotion_request.images if image.strip()))
+        if not images:
+            raise ValueError("No images specified")
+        for registry in (promotion_request.source_registry, promotion_request.destination_registry):
+            if not registry.strip() or "/" in registry.strip().rstrip("/"):
+                raise ValueError(f"Invalid registry '{registry}'; expected a host[:port]")
+
+        promotion_id = str(uuid.uuid4())
+        image_states = []
+        for image in images:
+            source = registry_reference(promotion_request.source_registry, image)
+            destination = registry_reference(promotion_request.destination_registry, image,
+                                             promotion_request.destination_namespace)
+            for reference in (source, destination):
+                error, _ = validate_image_reference(reference[len("docker://"):])
+                if error:
+                    raise ValueError(error)
+            image_states.append({"image": image, "source": source, "destination": destination, "status": "pending"})
+
+        if shutil.which(settings.SKOPEO_BIN) is None:
+            raise RuntimeError(f"{settings.SKOPEO_BIN} not installed or not in PATH")
+
+        credentials = {}
+        if promotion_request.source_credentials:
+            credentials[promotion_request.source_registry] = (
+                promotion_request.source_credentials.username, promotion_request.source_credentials.password
+            )
+        if promotion_request.destination_credentials:
+            credentials[promotion_request.destination_registry] = (
+                promotion_request.destination_credentials.username, promotion_request.destination_credentials.password
+            )
+        authfile = write_registry_authfile(credentials) if credentials else None
+
+        promotion_info = {
+            "promotion_id": promotion_id,
+            "status": "running",
+            "start_time": datetime.now(),
+            "end_time": None,
+            "source_registry": promotion_request.source_registry,
+            "destination_registry": promotion_request.destination_registry,
+            "images": image_states,
+        }
+        self.promotions[promotion_id] = promotion_info
+        await self._record(promotion_info)
+
+        task = asyncio.create_task(self._run_promotion(promotion_info, promotion_request, authfile))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        logger.info(f"🚚 Promotion {promotion_id}: {len(images)} images "
+                    f"{promotion_request.source_registry} → {promotion_request.destination_registry}")
+        return PromotionResponse(
+            promotion_id=promotion_id,
+            status="started",
+            images=images,
+            message=f"Promoting {len(images)} images to {promotion_request.destination_registry}"
+        )
+
+    async def _run_promotion(self, promotion_info: dict, promotion_request: PromotionRequest,
+                             authfile: Optional[str]):
+        """Copy every image, at most PROMOTION_CONCURRENCY at a time"""
+        semaphore = asyncio.Semaphore(max(1, settings.PROMOTION_CONCURRENCY))
+        try:
+            await asyncio.gather(*(
+                self._promote_image(promotion_info, image_state, promotion_request, authfile, semaphore)
+                for image_state in promotion_info["images"]
+            ))
+        finally:
+            cleanup_temp_file(authfile)
+            failed = [state["image"] for state in promotion_info["images"] if state["status"] != "completed"]
+            promotion_info["status"] = "failed" if failed else "completed"
+            promotion_info["end_time"] = datetime.now()
+            await self._record(promotion_info)
+            self.promotions.pop(promotion_info["promotion_id"], None)
+            self._record_locks.pop(promotion_info["promotion_id"], None)
+            self._progress_recorded_at.pop(promotion_info["promotion_id"], None)
+
+        if failed:
+            logger.error(f"❌ Promotion {promotion_info['promotion_id']} failed for: {', '.join(failed)}")
+        else:
+            logger.info(f"✅ Promotion {promotion_info['promotion_id']} completed")
+
+    async def _run_skopeo(self, command: List[str], on_lines, timeout: float) -> int:
+        return await run_streaming(command, on_lines, timeout, self._processes,
+                                   settings.LOG_READ_CHUNK_BYTES, settings.LOG_MAX_LINE_BYTES)
+
+    async def _promote_image(self, promotion_info: dict, image_state: dict, promotion_request: PromotionRequest,
+                             authfile: Optional[str], semaphore: asyncio.Semaphore):
+        async with semaphore:
+            image_state.update(status="copying", start_time=datetime.now())
+            await self._record(promotion_info)
+            try:
+                await self._copy_image(promotion_info, image_state, promotion_request, authfile)
+            except asyncio.TimeoutError:
+                image_state.update(status="failed",
+                                   error=f"Timed out after {settings.PROMOTION_TIMEOUT_MINUTES} minutes")
+            except asyncio.CancelledError:
+                image_state.update(status="failed", error="Cancelled")
+                raise
+            except Exception as e:
+                image_state.update(status="failed", error=str(e))
+            finally:
+                image_state["end_time"] = datetime.now()
+                await self._record(promotion_info)
+
+            if image_state["status"] == "failed":
+                logger.warning(f"⚠️ Promotion of {image_state['image']} failed: {image_state['error']}")
+
+    async def _copy_image(self, promotion_info: dict, image_state: dict, promotion_request: PromotionRequest,
+                          authfile: Optional[str]):
+        """skopeo copy one image, tracking which blobs were copied and which the destination already had"""
+        timeout = settings.PROMOTION_TIMEOUT_MINUTES * 60
+
+        # Layer list and sizes from the source manifest give the progress denominator
+        manifest_lines: List[str] = []
+        inspect_command = skopeo_inspect_command(settings.SKOPEO_BIN, image_state["source"],
+                                                 promotion_request.source_tls_verify, authfile)
+        blob_sizes = None
+        if await self._run_skopeo(inspect_command, manifest_lines.extend, timeout) == 0:
+            blob_sizes = manifest_blobs("\n".join(manifest_lines))
+        if blob_sizes is not None:
+            image_state["blobs_total"] = len(blob_sizes)
+            image_state["bytes_total"] = sum(blob_sizes.values())
+
+        blob_states: Dict[str, str] = {}
+        output_tail: deque = deque(maxlen=20)
+
+        def on_lines(lines: List[str]):
+            changed = False
+            for line in lines:
+                output_tail.append(line)
+                progress = parse_skopeo_progress(line)
+                if progress is None:
+                    continue
+                _, digest, state = progress
+                if blob_states.get(digest) not in ("copied", "skipped"):
+                    blob_states[digest] = state
+                    changed = True
+            if changed:
+                self._update_blob_counts(image_state, blob_states, blob_sizes)
+                self._record_progress(promotion_info)
+
+        copy_command = skopeo_copy_command(
+            settings.SKOPEO_BIN, image_state["source"], image_state["destination"],
+            src_tls_verify=promotion_request.source_tls_verify,
+            dest_tls_verify=promotion_request.destination_tls_verify,
+            authfile=authfile,
+            all_architectures=promotion_request.all_architectures,
+            retry_times=settings.PROMOTION_RETRY_TIMES
+        )
+        return_code = await self._run_skopeo(copy_command, on_lines, timeout)
+
+        if return_code != 0:
+            message = next((line for line in reversed(output_tail) if line), f"skopeo exited with {return_code}")
+            image_state.update(status="failed", error=message)
+            return
+
+        # Without a terminal skopeo only announces each blob, so started blobs finished with the copy
+        for digest, state in blob_states.items():
+            if state == "copying":
+                blob_states[digest] = "copied"
+        self._update_blob_counts(image_state, blob_states, blob_sizes)
+        image_state["status"] = "completed"
+
+    def _update_blob_counts(self, image_state: dict, blob_states: Dict[str, str], blob_sizes: Optional[Dict[str, int]]):
+        image_state["blobs_copied"] = sum(1 for state in blob_states.values() if state == "copied")
+        image_state["blobs_skipped"] = sum(1 for state in blob_states.values() if state == "skipped")
+        if blob_sizes:
+            # skopeo may print shortened digests, so match by prefix
+            image_state["bytes_skipped"] = sum(
+                size for digest, size in blob_sizes.items()
+                if any(digest.startswith(prefix) for prefix, state in blob_states.items() if state == "skipped")
+            )
+
+    def _to_status(self, promotion_info: dict) -> PromotionStatus:
+        def as_datetime(value):
+            return datetime.fromtimestamp(value) if isinstance(value, (int, float)) else value
+
+        images = [ImagePromotion(**state) for state in promotion_info["images"]]
+        return PromotionStatus(
+            promotion_id=promotion_info["promotion_id"],
+            status=promotion_info["status"],
+            source_registry=promotion_info["source_registry"],
+            destination_registry=promotion_info["destination_registry"],
+            start_time=as_datetime(promotion_info["start_time"]),
+            end_time=as_datetime(promotion_info.get("end_time")),
+            images=images,
+            completed_count=sum(1 for image in images if image.status == "completed"),
+            failed_count=sum(1 for image in images if image.status == "failed")
+        )
+
+    async def get_promotion(self, promotion_id: str) -> PromotionStatus:
+        """Per-image progress of a promotion started by any worker"""
+        promotion_info = self.promotions.get(promotion_id)
+        if promotion_info is None:
+            stored = await asyncio.to_thread(build_store.get_promotions, promotion_id)
+            if not stored:
+                raise ValueError("Promotion not found")
+            promotion_info = stored[0]
+        return self._to_status(promotion_info)
+
+    async def list_promotions(self, limit: int = 20) -> PromotionList:
+        """Most recent promotions first"""
+        promotions = []
+        for stored in await asyncio.to_thread(build_store.get_promotions, limit=limit):
+            promotions.append(self._to_status(self.promotions.get(stored["promotion_id"], stored)))
+        return PromotionList(promotions=promotions)
+
+    async def shutdown(self):
+        """Stop running copies so no skopeo process outlives the API"""
+        for process in list(self._processes):
+            if process.returncode is None:
+                process.kill()
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+# Create global service instance
+promotion_service = PromotionService()
@@ -0,0 +1,120 @@
+# backend/app/services/publish_service.py - Post-build image publishing
+
+import asyncio
+import json
+from typing import Callable, Dict, List, Set, Tuple
+
+from app.core.config import settings
+from app.utils.registry_utils import parse_push_progress, runtime_push_commands
+from app.utils.stream_utils import run_streaming
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PublishService:
+    """Pushes built images to registries, uploading layers shared between images once per registry"""
+
+    def __init__(self):
+        self._processes: Set[asyncio.subprocess.Process] = set()
+
+    async def _run(self, command: List[str], on_lines: Callable[[List[str]], None]) -> int:
+        return await run_streaming(command, on_lines, settings.PUBLISH_TIMEOUT_MINUTES * 60, self._processes,
+                                   settings.LOG_READ_CHUNK_BYTES, settings.LOG_MAX_LINE_BYTES)
+
+    async def _image_layers(self, runtime: str, image: str) -> List[str]:
+        """Layer diff IDs of a local image, base layers first (empty if it can't be inspected)"""
+        output: List[str] = []
+        try:
+            return_code = await self._run(
+                [runtime, "image", "inspect", "--format", "{{json .RootFS.Layers}}", image], output.extend
+            )
+            layers = json.loads("".join(output)) if return_code == 0 else None
+        except (OSError, ValueError, asyncio.TimeoutError):
+            layers = None
+        return [layer for layer in layers if isinstance(layer, str)] if isinstance(layers, list) else []
+
+    async def publish(self, environments: List[str], registries: List[str], runtime: str,
+                      log: Callable[[str], None], tls_verify: bool = True) -> Tuple[List[str], List[str]]:
+        """Push each environment's {env}:latest image to every registry ("host[:port][/namespace]")
+
+        Pushes run in parallel up to PUBLISH_CONCURRENCY. Within a registry an
+        image that shares layers with an earlier one waits for that push to
+        finish, so the layers are already there and get skipped rather than
+        uploaded twice. Returns the "env → registry" pushes that succeeded and
+        those that failed.
+        """
+        layers = dict(zip(environments, await asyncio.gather(
+            *(self._image_layers(runtime, f"{env}:latest") for env in environments)
+        )))
+        semaphore = asyncio.Semaphore(max(1, settings.PUBLISH_CONCURRENCY))
+
+        pushes = []
+        for registry in registries:
+            registry = registry.strip().rstrip("/")
+            # Fewest layers first: base-like images claim the shared layers and finish soonest
+            claimed: Dict[str, asyncio.Event] = {}
+            for env in sorted(environments, key=lambda env: len(layers[env])):
+                waits = {claimed[layer] for layer in layers[env] if layer in claimed}
+                done = asyncio.Event()
+                for layer in layers[env]:
+                    claimed.setdefault(layer, done)
+                pushes.append(self._push(env, registry, runtime, tls_verify, waits, done, semaphore, log))
+
+        results = await asyncio.gather(*pushes)
+        published = [target for target, ok in results if ok]
+        failed = [target for target, ok in results if not ok]
+        return published, failed
+
+    async def _push(self, env: str, registry: str, runtime: str, tls_verify: bool, waits: Set[asyncio.Event],
+                    done: asyncio.Event, semaphore: asyncio.Semaphore, log: Callable[[str], None]) -> Tuple[str, bool]:
+        target = f"{env} → {registry}"
+        destination = f"{registry}/{env}:latest"
+        try:
+            for event in waits:
+                await event.wait()
+
+            async with semaphore:
+                log(f"📤 Pushing {target}")
+                blob_states: Dict[str, str] = {}
+                output_tail: List[str] = []
+
+                def on_lines(lines: List[str]):
+                    output_tail[:] = (output_tail + lines)[-20:]
+                    for line in lines:
+                        progress = parse_push_progress(line)
+                        if progress and blob_states.get(progress[1]) not in ("copied", "skipped"):
+                            blob_states[progress[1]] = progress[2]
+
+                return_code = 0
+                for command in runtime_push_commands(runtime, f"{env}:latest", destination, tls_verify):
+                    return_code = await self._run(command, on_lines)
+                    if return_code != 0:
+                        break
+
+            if return_code != 0:
+                reason = next((line for line in reversed(output_tail) if line), f"exit code {return_code}")
+                log(f"❌ Failed to push {target}: {reason}")
+                return target, False
+
+            skipped = sum(1 for state in blob_states.values() if state == "skipped")
+            log(f"✅ Pushed {target} ({len(blob_states) - skipped} layers uploaded, {skipped} already present)")
+            return target, True
+        except asyncio.TimeoutError:
+            log(f"❌ Failed to push {target}: timed out after {settings.PUBLISH_TIMEOUT_MINUTES} minutes")
+            return target, False
+        except OSError as e:
+            log(f"❌ Failed to push {target}: {e}")
+            return target, False
+        finally:
+            done.set()
+
+    def shutdown(self):
+        """Kill pushes still running when the API stops"""
+        for process in list(self._processes):
+            if process.returncode is None:
+                process.kill()
+
+
+# Create global service instance
+publish_service = PublishService()
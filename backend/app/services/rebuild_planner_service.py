@@ -0,0 +1,107 @@
+# backend/app/services/rebuild_planner_service.py - Change-impact rebuild planning
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from app.models.build_models import BuildInputChange, BuildRequest, RebuildPlan, RebuildPlanRequest, RebuildReason
+from app.core.config import settings
+from app.services.build_service import build_service
+from app.services.dependency_index_service import dependency_index_service
+from app.utils.dependency_index import DEPENDENCY_KINDS, constraint_allows, image_tag
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CHANGE_KINDS = DEPENDENCY_KINDS + ("file",)
+
+
+class RebuildPlannerService:
+    """Works out which environments a change to their build inputs affects"""
+
+    def _describe(self, change: BuildInputChange) -> str:
+        return f"{change.kind} {change.name}" + (f" {change.version}" if change.version else "")
+
+    async def _dependency_impact(self, change: BuildInputChange) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Environments declaring a changed package, collection or image, split by whether it reaches them"""
+        affected: Dict[str, str] = {}
+        unaffected: Dict[str, str] = {}
+        result = await dependency_index_service.search(change.name, kind=change.kind)
+
+        changed_tag = image_tag(change.name, default=None) if change.kind == "image" else None
+        for match in result.matches:
+            if change.kind == "image":
+                declared_tag = image_tag(match.name)
+                if changed_tag is None and declared_tag.startswith("sha256:"):
+                    unaffected[match.environment] = f"pins {match.name} by digest"
+                elif changed_tag is not None and declared_tag != changed_tag:
+                    unaffected[match.environment] = f"uses {match.name}"
+                else:
+                    affected[match.environment] = f"base image {match.name}"
+                continue
+
+            declared = f"{match.name}{match.constraint or ''} in {match.source}"
+            # bindep versions are distribution-specific, so any system package change counts
+            if change.version and change.kind != "system" and not constraint_allows(
+                    change.kind, match.constraint, change.version):
+                unaffected[match.environment] = f"{declared} excludes {change.version}"
+            else:
+                affected[match.environment] = declared
+        return affected, unaffected
+
+    def _file_impact(self, change: BuildInputChange) -> Dict[str, str]:
+        """Environments whose build reads a changed file or anything under a changed directory"""
+        path = Path(change.name)
+        if not path.is_absolute():
+            path = Path(settings.PLAYBOOK_PATH).resolve().parent / path
+        readers = dependency_index_service.environments_reading(str(path))
+        return {
+            name: ", ".join(Path(input_path).name for input_path in inputs[:3]) + (" ..." if len(inputs) > 3 else "")
+            for name, inputs in readers.items()
+        }
+
+    async def plan(self, plan_request: RebuildPlanRequest) -> RebuildPlan:
+        """Minimal set of environments to rebuild for the given changes, optionally started as one build"""
+        if not plan_request.changes:
+            raise ValueError("No changes specified")
+        for change in plan_request.changes:
+            if change.kind not in CHANGE_KINDS:
+                raise ValueError(f"Unknown change kind '{change.kind}'; expected one of {', '.join(CHANGE_KINDS)}")
+            if not change.name.strip():
+                raise ValueError("Each change needs a name")
+
+        await dependency_index_service.refresh(force=True)
+
+        reasons: List[RebuildReason] = []
+        unaffected: List[RebuildReason] = []
+        for change in plan_request.changes:
+            description = self._describe(change)
+            if change.kind == "file":
+                affected, skipped = self._file_impact(change), {}
+            else:
+                affected, skipped = await self._dependency_impact(change)
+            reasons.extend(RebuildReason(environment=name, change=description, detail=detail)
+                           for name, detail in affected.items())
+            unaffected.extend(RebuildReason(environment=name, change=description, detail=detail)
+                              for name, detail in skipped.items())
+
+        environments = sorted({reason.environment for reason in reasons})
+        affected_names = set(environments)
+        plan = RebuildPlan(
+            environments=environments,
+            reasons=sorted(reasons, key=lambda reason: (reason.environment, reason.change)),
+            unaffected=sorted((reason for reason in unaffected if reason.environment not in affected_names),
+                              key=lambda reason: (reason.environment, reason.change)),
+            total_environments=dependency_index_service.environment_count
+        )
+        logger.info(f"🧭 Rebuild plan: {len(environments)} of {plan.total_environments} environments affected")
+
+        if plan_request.execute and environments:
+            plan.build = await build_service.start_build(BuildRequest(
+                environments=environments,
+                container_runtime=plan_request.container_runtime or settings.CONTAINER_RUNTIME
+            ))
+        return plan
+
+
+# Create global service instance
+rebuild_planner_service = RebuildPlannerService()
@@ -0,0 +1,115 @@
+# backend/app/services/warmup_service.py - Startup Warm-up Service
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.models.system_models import ReadinessStatus, WarmupStep
+from app.utils.container_utils import validate_container_runtime
+from app.services.environment_service import environment_service
+from app.services.dependency_index_service import dependency_index_service
+from app.services.auth_service import auth_service
+from app.services.isolation_service import isolation_service
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class WarmupService:
+    """Service that pre-populates indexes and caches in the background after startup"""
+    
+    def __init__(self):
+        self.steps: List[Tuple[str, Callable[[], Awaitable[Optional[str]]]]] = [
+            ("environment_index", self._warm_environment_index),
+            ("parse_cache", self._warm_parse_cache),
+            ("dependency_index", self._warm_dependency_index),
+            ("auth_status", self._warm_auth_status),
+            ("container_runtime", self._warm_container_runtime),
+            ("build_isolation", self._warm_build_isolation),
+        ]
+        self.progress: Dict[str, WarmupStep] = {}
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._reset_progress()
+    
+    def _reset_progress(self):
+        self.progress = {name: WarmupStep(name=name, status="pending") for name, _ in self.steps}
+    
+    def start(self):
+        """Kick off the warm-up without blocking startup"""
+        if self._task and not self._task.done():
+            return
+        self._reset_progress()
+        self.started_at = datetime.now()
+        self.completed_at = None
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Cancel an unfinished warm-up on shutdown"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+    
+    def is_ready(self) -> bool:
+        return self.completed_at is not None
+    
+    def get_status(self) -> ReadinessStatus:
+        """Report warm-up progress for the readiness endpoint"""
+        return ReadinessStatus(
+            ready=self.is_ready(),
+            started_at=self.started_at,
+            completed_at=self.completed_at,
+            steps=list(self.progress.values())
+        )
+    
+    async def _run(self):
+        logger.info("🔥 Warming up environment index and caches...")
+        for name, step in self.steps:
+            progress = self.progress[name]
+            progress.status = "running"
+            started = time.monotonic()
+            try:
+                progress.detail = await step()
+                progress.status = "completed"
+            except Exception as e:
+                # A failed probe is reported but does not hold back readiness
+                progress.status = "failed"
+                progress.detail = str(e)
+                logger.warning(f"⚠️ Warm-up step {name} failed: {e}")
+            progress.duration_ms = int((time.monotonic() - started) * 1000)
+        
+        self.completed_at = datetime.now()
+        total_ms = int((self.completed_at - self.started_at).total_seconds() * 1000)
+        logger.info(f"✅ Warm-up finished in {total_ms} ms")
+    
+    async def _warm_environment_index(self) -> str:
+        environments = await asyncio.to_thread(environment_service.get_environments)
+        return f"{len(environments.environments)} environments"
+    
+    async def _warm_parse_cache(self) -> str:
+        count = await asyncio.to_thread(environment_service.warm_parse_cache)
+        return f"{count} definitions parsed"
+    
+    async def _warm_dependency_index(self) -> str:
+        await dependency_index_service.refresh(force=True)
+        return f"{dependency_index_service.environment_count} environments indexed"
+    
+    async def _warm_auth_status(self) -> str:
+        status = await auth_service.get_auth_status()
+        return status.message
+    
+    async def _warm_container_runtime(self) -> str:
+        await validate_container_runtime()
+        return "available"
+    
+    async def _warm_build_isolation(self) -> str:
+        return await asyncio.to_thread(lambda: isolation_service.mode)
+
+
+# Create global service instance
+warmup_service = WarmupService()
@@ -0,0 +1,199 @@
+# backend/app/services/webhook_service.py - Build event delivery to webhooks
+
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import random
+import socket
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.models.webhook_models import Webhook, WebhookList, WebhookRequest
+from app.services.build_store import build_store
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+WEBHOOK_EVENTS = (
+    "queued", "started", "environment_finished", "completed", "failed", "cancelled",
+    "cancel_requested", "interrupted"
+)
+BUILD_FIELDS = ("status", "environments", "successful_builds", "failed_builds", "return_code", "progress", "eta")
+
+
+class WebhookService:
+    """Delivers the build event log to registered webhooks
+
+    Every worker polls the shared event log; a webhook is leased to one
+    worker at a time, which POSTs the events logged since its last delivery
+    as one batch. A failed batch is retried with exponential backoff and
+    dropped after WEBHOOK_MAX_ATTEMPTS, so delivery is at least once and in
+    order; receivers can skip events whose seq they have already seen.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def create_webhook(self, request: WebhookRequest) -> Webhook:
+        unknown = [event for event in request.events if event not in WEBHOOK_EVENTS]
+        if unknown:
+            raise ValueError(f"Unknown build events: {', '.join(unknown)}")
+        await asyncio.to_thread(self._check_target, request.url)
+
+        webhook = await asyncio.to_thread(
+            build_store.create_webhook,
+            str(uuid.uuid4()), request.url, list(dict.fromkeys(request.events)), request.secret or None
+        )
+        logger.info(f"🪝 Registered webhook {webhook['webhook_id']} for {request.url}")
+        return self._to_model(webhook)
+
+    async def list_webhooks(self) -> WebhookList:
+        webhooks = await asyncio.to_thread(build_store.get_webhooks)
+        return WebhookList(webhooks=[self._to_model(webhook) for webhook in webhooks], events=list(WEBHOOK_EVENTS))
+
+    async def get_webhook(self, webhook_id: str) -> Webhook:
+        webhooks = await asyncio.to_thread(build_store.get_webhooks, webhook_id)
+        if not webhooks:
+            raise ValueError(f"Webhook {webhook_id} not found")
+        return self._to_model(webhooks[0])
+
+    async def delete_webhook(self, webhook_id: str):
+        if not await asyncio.to_thread(build_store.delete_webhook, webhook_id):
+            raise ValueError(f"Webhook {webhook_id} not found")
+        logger.info(f"🪝 Removed webhook {webhook_id}")
+
+    def _check_target(self, url: str):
+        """Reject URLs this API shouldn't call: other schemes, hosts not allowed, and
+        private, loopback or link-local addresses unless WEBHOOK_PRIVATE_HOSTS lists the host"""
+        parsed = urlparse(url)
+        host = parsed.hostname
+        if parsed.scheme not in ("http", "https") or not host:
+            raise ValueError("Webhook URL must be an http or https URL")
+        if settings.WEBHOOK_ALLOWED_HOSTS and host not in settings.WEBHOOK_ALLOWED_HOSTS:
+            raise ValueError(f"Webhook host '{host}' is not in WEBHOOK_ALLOWED_HOSTS")
+        if host in settings.WEBHOOK_PRIVATE_HOSTS:
+            return
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or 443, proto=socket.IPPROTO_TCP)}
+        except (socket.gaierror, UnicodeError) as e:
+            raise ValueError(f"Webhook host '{host}' does not resolve: {e}")
+        for address in addresses:
+            if not ipaddress.ip_address(address.split("%")[0]).is_global:
+                raise ValueError(f"Webhook host '{host}' resolves to non-public address {address}; "
+                                 "list it in WEBHOOK_PRIVATE_HOSTS to allow it")
+
+    def _to_model(self, webhook: dict) -> Webhook:
+        return Webhook(**{**webhook, "next_attempt_at": webhook["next_attempt_at"] or None})
+
+    def start(self):
+        """Start delivering (unless WEBHOOK_POLL_SECONDS is 0)"""
+        if settings.WEBHOOK_POLL_SECONDS <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.WEBHOOK_POLL_SECONDS)
+            try:
+                await self.deliver_pending()
+            except Exception as e:
+                logger.warning(f"⚠️ Webhook delivery failed: {e}")
+
+    async def deliver_pending(self):
+        """Deliver one batch to every webhook that has events waiting and isn't backing off"""
+        # Long enough for a delivery that times out; a lease outlives its worker only that long
+        lease_seconds = settings.WEBHOOK_TIMEOUT_SECONDS * 3
+        webhooks = await asyncio.to_thread(build_store.claim_webhooks, lease_seconds)
+        if webhooks:
+            await asyncio.gather(*(self._deliver(webhook) for webhook in webhooks))
+
+    async def _deliver(self, webhook: dict):
+        webhook_id = webhook["webhook_id"]
+        events = await asyncio.to_thread(build_store.get_events_after, webhook["last_seq"], settings.WEBHOOK_BATCH_SIZE)
+        if not events:
+            await asyncio.to_thread(build_store.finish_webhook_delivery, webhook_id, webhook["last_seq"],
+                                    attempts=webhook["attempts"])
+            return
+        last_seq = events[-1]["seq"]
+        selected = [event for event in events if not webhook["events"] or event["event"] in webhook["events"]]
+        if not selected:
+            await asyncio.to_thread(build_store.finish_webhook_delivery, webhook_id, last_seq)
+            return
+
+        payload = await asyncio.to_thread(self._payload, selected)
+        body = json.dumps({"webhook_id": webhook_id, "events": payload}).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": f"{settings.APP_NAME}/{settings.VERSION}"
+        }
+        if webhook["secret"]:
+            digest = hmac.new(webhook["secret"].encode(), body, hashlib.sha256).hexdigest()
+            headers["X-EE-Signature"] = f"sha256={digest}"
+
+        try:
+            await asyncio.to_thread(self._post, webhook["url"], body, headers)
+        except Exception as e:
+            error = str(e)
+            attempts = webhook["attempts"] + 1
+            if attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                logger.warning(f"⚠️ Dropped {len(selected)} events for webhook {webhook_id} after {attempts} attempts: {error}")
+                await asyncio.to_thread(build_store.finish_webhook_delivery, webhook_id, last_seq,
+                                        dropped=len(selected), error=error)
+                return
+            delay = min(settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.WEBHOOK_RETRY_MAX_SECONDS)
+            # Jitter keeps webhooks that failed together from retrying in lockstep
+            delay *= random.uniform(0.8, 1.2)
+            logger.debug("🪝 Delivery to webhook %s failed (attempt %d), retrying in %.0fs: %s",
+                         webhook_id, attempts, delay, error)
+            await asyncio.to_thread(build_store.finish_webhook_delivery, webhook_id, webhook["last_seq"],
+                                    attempts=attempts, next_attempt_at=time.time() + delay, error=error)
+            return
+
+        await asyncio.to_thread(build_store.finish_webhook_delivery, webhook_id, last_seq, delivered=len(selected))
+        logger.debug("🪝 Delivered %d events to webhook %s", len(selected), webhook_id)
+
+    def _payload(self, events: List[dict]) -> List[dict]:
+        """Events with the current state of their builds"""
+        builds = build_store.get_builds([event["build_id"] for event in events])
+        payload = []
+        for event in events:
+            build = builds.get(event["build_id"])
+            payload.append({
+                "seq": event["seq"],
+                "event": event["event"],
+                "build_id": event["build_id"],
+                "created_at": datetime.fromtimestamp(event["created_at"]).isoformat(),
+                "data": event["data"],
+                "build": {field: build[field] for field in BUILD_FIELDS} if build else None
+            })
+        return payload
+
+    def _post(self, url: str, body: bytes, headers: dict):
+        # Checked again per delivery: the host's addresses may have changed since it was registered
+        self._check_target(url)
+        request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=settings.WEBHOOK_TIMEOUT_SECONDS) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"HTTP {e.code} from {url}") from e
+
+
+# Create global service instance
+webhook_service = WebhookService()
@@ -1,3 +1,14 @@
 # backend/app/utils/__init__.py
 from .file_utils import *
 from .container_utils import *
+from .log_archive import *
+from .http_utils import *
+from .stream_utils import *
+from .ee_validation import *
+from .dependency_index import *
+from .registry_utils import *
+from .dependency_preflight import *
+from .environment_archive import *
+from .host_metrics import *
+from .build_schedule import *
+from .build_profiles import *
@@ -0,0 +1,76 @@
+# backend/app/utils/build_profiles.py - ansible-builder options from named build profiles
+#
+# A profile is a dict with any of these keys; missing ones take the values
+# the playbook always used:
+#   cache       reuse cached image layers (False passes --no-cache)
+#   squash      "new", "all" or "off" (Podman); None leaves ansible-builder's default
+#   jobs        build stages run in parallel (Podman --jobs)
+#   build_args  build arguments, e.g. options for the pip and galaxy installs,
+#               added to the default ones (an empty value drops a default)
+#   verbosity   ansible-builder verbosity, 0-3
+
+import hashlib
+import json
+from typing import Any, Dict, List
+
+__all__ = ["PROFILE_DEFAULTS", "SQUASH_MODES", "normalize_build_profile", "builder_arguments", "builder_arguments_key"]
+
+PROFILE_DEFAULTS: Dict[str, Any] = {
+    "cache": True,
+    "squash": None,
+    "jobs": 1,
+    "build_args": {"ANSIBLE_GALAXY_CLI_COLLECTION_OPTS": "--ignore-certs"},
+    "verbosity": 1
+}
+SQUASH_MODES = ("new", "all", "off")
+
+
+def normalize_build_profile(name: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """A profile with every key filled in; raises ValueError for unknown keys or bad values"""
+    if not isinstance(profile, dict):
+        raise ValueError(f"Build profile '{name}' must be a mapping")
+    unknown = set(profile) - set(PROFILE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Build profile '{name}' has unknown options: {', '.join(sorted(unknown))}")
+
+    normalized = {**PROFILE_DEFAULTS, **profile}
+    if not isinstance(normalized["cache"], bool):
+        raise ValueError(f"Build profile '{name}': cache must be true or false")
+    if normalized["squash"] is not None and normalized["squash"] not in SQUASH_MODES:
+        raise ValueError(f"Build profile '{name}': squash must be one of {', '.join(SQUASH_MODES)}")
+    if not isinstance(normalized["jobs"], int) or normalized["jobs"] < 1:
+        raise ValueError(f"Build profile '{name}': jobs must be a positive integer")
+    if not isinstance(normalized["verbosity"], int) or not 0 <= normalized["verbosity"] <= 3:
+        raise ValueError(f"Build profile '{name}': verbosity must be 0-3")
+    build_args = normalized["build_args"]
+    if not isinstance(build_args, dict) or not all(
+        isinstance(arg, str) and arg and isinstance(value, (str, int, float)) for arg, value in build_args.items()
+    ):
+        raise ValueError(f"Build profile '{name}': build_args must map argument names to values")
+    normalized["build_args"] = {arg: str(value) for arg, value in {**PROFILE_DEFAULTS["build_args"], **build_args}.items()
+                                if str(value)}
+    return normalized
+
+
+def builder_arguments(profile: Dict[str, Any], container_runtime: str) -> List[str]:
+    """ansible-builder build arguments for a normalized profile
+
+    Squashing and parallel stages are Podman features; Docker builds leave them out.
+    """
+    args = []
+    for arg, value in profile["build_args"].items():
+        args += ["--build-arg", f"{arg}={value}"]
+    if not profile["cache"]:
+        args.append("--no-cache")
+    if container_runtime == "podman":
+        if profile["squash"] is not None:
+            args += ["--squash", profile["squash"]]
+        if profile["jobs"] > 1:
+            args += ["--extra-build-cli-args", f"--jobs {profile['jobs']}"]
+    args += ["--verbosity", str(profile["verbosity"])]
+    return args
+
+
+def builder_arguments_key(args: List[str]) -> str:
+    """Short stable digest of builder arguments, for telling builds with different options apart"""
+    return hashlib.sha256(json.dumps(args).encode()).hexdigest()[:12]
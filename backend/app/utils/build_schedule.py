@@ -0,0 +1,64 @@
+# backend/app/utils/build_schedule.py - Ordering environments within a batch build
+#
+# Longest-processing-time-first (LPT) list scheduling: environments are taken
+# longest expected build first and each goes to the lane with the least work
+# so far. A long environment started last would leave every other lane idle
+# while it finishes; starting it first lets the short ones fill in around it.
+# An environment built on another environment of the same batch stays in that
+# environment's lane, after it, so its base image exists when it starts.
+
+from typing import Dict, List, Sequence
+
+__all__ = ["plan_build_lanes"]
+
+
+def plan_build_lanes(environments: Sequence[str], durations: Dict[str, float], builds_on: Dict[str, str],
+                     lanes: int) -> List[List[str]]:
+    """Split environments into at most `lanes` sequences, longest expected first
+
+    durations are predicted seconds. builds_on maps an environment to the
+    one in this batch whose image it uses as its base.
+    """
+    position = {env: index for index, env in enumerate(environments)}
+
+    def key(env: str):
+        return -durations.get(env, 0.0), position[env]
+
+    dependents: Dict[str, List[str]] = {}
+    roots = []
+    for env in environments:
+        base = builds_on.get(env)
+        if base in position and base != env and not _in_cycle(env, builds_on, position):
+            dependents.setdefault(base, []).append(env)
+        else:
+            roots.append(env)
+
+    # Each root and everything built on it is built in order as one unit
+    units = []
+    for root in roots:
+        unit, stack = [], [root]
+        while stack:
+            env = stack.pop()
+            unit.append(env)
+            stack.extend(sorted(dependents.get(env, []), key=key, reverse=True))
+        units.append(unit)
+    units.sort(key=lambda unit: (-sum(durations.get(env, 0.0) for env in unit), key(unit[0])[1:]))
+
+    plan: List[List[str]] = [[] for _ in range(max(1, min(lanes, len(units))))]
+    loads = [0.0] * len(plan)
+    for unit in units:
+        lane = loads.index(min(loads))
+        plan[lane].extend(unit)
+        loads[lane] += sum(durations.get(env, 0.0) for env in unit)
+    return plan
+
+
+def _in_cycle(env: str, builds_on: Dict[str, str], position: Dict[str, int]) -> bool:
+    seen = {env}
+    current = builds_on.get(env)
+    while current in position:
+        if current in seen:
+            return True
+        seen.add(current)
+        current = builds_on.get(current)
+    return False
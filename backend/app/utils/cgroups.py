@@ -0,0 +1,63 @@
+# backend/app/utils/cgroups.py - Per-build cgroups (cgroup v2)
+#
+# A build's cgroup is created under a parent directory this service may
+# write to, with the cpu, io and memory controllers enabled in the parent's
+# cgroup.subtree_control. Limits whose controller isn't enabled are
+# reported back rather than failing the build.
+
+import os
+from typing import Dict, List, Optional
+
+__all__ = ["is_cgroup2", "create_cgroup", "join_cgroup_command", "cgroup_oom_kills", "remove_cgroup"]
+
+
+def is_cgroup2(path: str) -> bool:
+    """Whether path is a cgroup v2 directory"""
+    return os.path.isfile(os.path.join(path, "cgroup.controllers"))
+
+
+def create_cgroup(path: str, cpu_weight: int, io_weight: int, memory_max: Optional[int]) -> List[str]:
+    """Create a cgroup with the given weights and memory limit in bytes; returns the limits it couldn't set"""
+    os.makedirs(path, exist_ok=True)
+    limits: Dict[str, str] = {"cpu.weight": str(cpu_weight), "io.weight": f"default {io_weight}"}
+    if memory_max:
+        limits["memory.max"] = str(memory_max)
+        # An out-of-memory kill takes the whole build down instead of one random process in it
+        limits["memory.oom.group"] = "1"
+    not_applied = []
+    for name, value in limits.items():
+        try:
+            with open(os.path.join(path, name), "w") as f:
+                f.write(value)
+        except OSError:
+            not_applied.append(name)
+    return not_applied
+
+
+def join_cgroup_command(path: str, cmd: List[str]) -> List[str]:
+    """cmd run by a shell that first moves itself into the cgroup, so every process it starts is inside"""
+    return ["/bin/sh", "-c", 'echo $$ > "$0/cgroup.procs" && exec "$@"', path, *cmd]
+
+
+def cgroup_oom_kills(path: str) -> int:
+    """Processes the kernel killed in this cgroup for exceeding memory.max"""
+    try:
+        with open(os.path.join(path, "memory.events")) as f:
+            for line in f:
+                key, _, value = line.partition(" ")
+                if key == "oom_kill":
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def remove_cgroup(path: str) -> bool:
+    """Remove an empty cgroup (False while processes are still inside)"""
+    try:
+        os.rmdir(path)
+    except FileNotFoundError:
+        return True
+    except OSError:
+        return False
+    return True
@@ -1,14 +1,38 @@
 # backend/app/utils/container_utils.py - Container runtime utilities
 
 import asyncio
+import json
+import os
+import re
 import subprocess
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional
 
 from app.core.config import settings
+from app.utils.stream_utils import read_line_batches
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# runtime -> monotonic time of the last successful check
+_runtime_validated_at: Dict[str, float] = {}
+
+# docker prints human-readable image sizes ("1.23GB")
+_SIZE_UNITS = {"b": 1, "kb": 1000, "mb": 1000 ** 2, "gb": 1000 ** 3, "tb": 1000 ** 4}
+_HUMAN_SIZE = re.compile(r"^\s*([\d.]+)\s*([kmgt]?b)\s*$", re.IGNORECASE)
 
 
 async def validate_container_runtime():
-    """Validate that the configured container runtime is available"""
+    """Validate that the configured container runtime is available
+    
+    Successful checks are reused for RUNTIME_PROBE_CACHE_SECONDS so builds
+    don't pay for a subprocess round-trip every time.
+    """
+    validated_at = _runtime_validated_at.get(settings.CONTAINER_RUNTIME)
+    if validated_at is not None and time.monotonic() - validated_at < settings.RUNTIME_PROBE_CACHE_SECONDS:
+        return
+    
     try:
         process = await asyncio.create_subprocess_exec(
             settings.CONTAINER_RUNTIME, "--version",
@@ -22,6 +46,8 @@ async def validate_container_runtime():
             
     except FileNotFoundError:
         raise RuntimeError(f"{settings.CONTAINER_RUNTIME} not installed or not in PATH")
+    
+    _runtime_validated_at[settings.CONTAINER_RUNTIME] = time.monotonic()
 
 
 async def validate_ansible_playbook():
@@ -83,22 +109,28 @@ def list_container_images(filter_name: Optional[str] = None) -> List[dict]:
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
         
         if result.returncode == 0:
+            # podman prints one JSON array, docker one object per line
+            try:
+                images = json.loads(result.stdout or "[]")
+                if isinstance(images, list):
+                    return images
+            except json.JSONDecodeError:
+                pass
             images = []
             for line in result.stdout.strip().split('\n'):
                 if line:
                     try:
-                        import json
                         image_data = json.loads(line)
                         images.append(image_data)
                     except json.JSONDecodeError:
                         continue
             return images
         else:
-            print(f"⚠️ Error listing images: {result.stderr}")
+            logger.warning(f"⚠️ Error listing images: {result.stderr}")
             return []
             
     except Exception as e:
-        print(f"❌ Error listing container images: {e}")
+        logger.error(f"❌ Error listing container images: {e}")
         return []
 
 
@@ -113,17 +145,93 @@ def remove_container_image(image_name: str) -> bool:
         )
         
         if result.returncode == 0:
-            print(f"🗑️ Removed image: {image_name}")
+            logger.info(f"🗑️ Removed image: {image_name}")
+            return True
+        else:
+            logger.warning(f"⚠️ Failed to remove image {image_name}: {result.stderr}")
+            return False
+            
+    except Exception as e:
+        logger.error(f"❌ Error removing image {image_name}: {e}")
+        return False
+
+
+def prune_dangling_images() -> bool:
+    """Remove untagged images that no other image builds on"""
+    try:
+        result = subprocess.run(
+            [settings.CONTAINER_RUNTIME, "image", "prune", "-f"],
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        
+        if result.returncode == 0:
+            logger.info("🗑️ Pruned dangling images")
             return True
         else:
-            print(f"⚠️ Failed to remove image {image_name}: {result.stderr}")
+            logger.warning(f"⚠️ Failed to prune dangling images: {result.stderr}")
             return False
             
     except Exception as e:
-        print(f"❌ Error removing image {image_name}: {e}")
+        logger.error(f"❌ Error pruning dangling images: {e}")
         return False
 
 
+def get_image_store_path() -> Optional[str]:
+    """Directory the container runtime keeps image layers in (None if it can't be found)"""
+    if os.path.basename(settings.CONTAINER_RUNTIME).startswith("docker"):
+        template = "{{.DockerRootDir}}"
+    else:
+        template = "{{.Store.GraphRoot}}"
+    try:
+        result = subprocess.run(
+            [settings.CONTAINER_RUNTIME, "info", "--format", template],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Could not query the image store location: {e}")
+        return None
+    
+    path = result.stdout.strip()
+    return path if result.returncode == 0 and os.path.isdir(path) else None
+
+
+def image_references(image: dict) -> List[str]:
+    """Tagged names of an image listed by list_container_images (podman or docker format)"""
+    if image.get("Names"):
+        return list(image["Names"])
+    repository, tag = image.get("Repository"), image.get("Tag")
+    if repository and repository != "<none>" and tag and tag != "<none>":
+        return [f"{repository}:{tag}"]
+    return []
+
+
+def image_size_bytes(image: dict) -> int:
+    """Size of an image listed by list_container_images, in bytes"""
+    size = image.get("Size")
+    if isinstance(size, (int, float)):
+        return int(size)
+    match = _HUMAN_SIZE.match(str(size or ""))
+    if not match:
+        return 0
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def normalize_image_reference(reference: str) -> str:
+    """Comparable form of an image name: lower case, default registry prefixes dropped, tag added"""
+    reference = reference.strip().lower()
+    for prefix in ("localhost/", "docker.io/library/", "docker.io/"):
+        if reference.startswith(prefix):
+            reference = reference[len(prefix):]
+            break
+    if "@" not in reference and reference.rfind(":") <= reference.rfind("/"):
+        reference += ":latest"
+    return reference
+
+
 async def build_container_image(
     context_path: str,
     dockerfile_path: str,
@@ -153,15 +261,9 @@ async def build_container_image(
             stderr=asyncio.subprocess.STDOUT
         )
         
-        # Capture output line by line
-        while True:
-            line = await process.stdout.readline()
-            if not line:
-                break
-            
-            line_text = line.decode('utf-8').strip()
-            if line_text:
-                logs.append(line_text)
+        # Capture output in blocks, tolerating long lines and invalid UTF-8
+        async for lines in read_line_batches(process.stdout):
+            logs.extend(lines)
         
         await process.wait()
         
@@ -176,5 +278,5 @@ async def build_container_image(
     except Exception as e:
         error_msg = f"❌ Error building image {tag}: {str(e)}"
         logs.append(error_msg)
-        print(error_msg)
+        logger.info(error_msg)
         return False, logs
@@ -0,0 +1,291 @@
+# backend/app/utils/dependency_index.py - Dependency extraction for the inverted index
+#
+# Pure functions that turn an environment directory into flat dependency
+# entries:
+#   {"kind": "python", "name": "ansible-core", "key": "ansible-core",
+#    "constraint": "<2.17,>=2.15", "source": "requirements.txt"}
+# Kinds are python (pip), collection (galaxy), system (bindep) and image
+# (base image); python entries also carry the full "requirement".
+# Unparseable files and lines are skipped - reporting them is the
+# validator's job.
+
+import glob
+import os
+import re
+from typing import Any, Iterator, List, Optional, Set, Tuple
+
+import yaml
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
+
+from app.utils.ee_validation import (
+    EE_FILE, _BINDEP_NAME, _BINDEP_VERSION, _TEMPLATED, _YAML_LOADER, _logical_lines
+)
+
+DEPENDENCY_KINDS = ("python", "collection", "system", "image")
+
+_BINDEP_ENTRY = re.compile(rf"^(?P<name>{_BINDEP_NAME})")
+_BINDEP_CONSTRAINT = re.compile(_BINDEP_VERSION)
+
+__all__ = [
+    "DEPENDENCY_KINDS", "extract_environment_dependencies", "dependency_key",
+    "image_keys", "image_tag", "parse_dependency_query", "normalize_constraint", "constraint_matches",
+    "constraint_allows", "environment_build_inputs"
+]
+
+
+def _entry(kind: str, name: str, constraint: Optional[str], source: str) -> dict:
+    return {"kind": kind, "name": name, "key": dependency_key(kind, name),
+            "constraint": constraint or None, "source": source}
+
+
+def dependency_key(kind: str, name: str) -> str:
+    """Normalised lookup key: PEP 503 names for pip, lower case otherwise"""
+    if kind == "python":
+        return canonicalize_name(name)
+    if kind == "image":
+        return _image_repository(name)
+    return name.strip().lower()
+
+
+def _image_repository(reference: str) -> str:
+    """Image reference without tag or digest, lower case"""
+    reference = reference.strip().lower().split("@", 1)[0]
+    last_slash = reference.rfind("/")
+    colon = reference.rfind(":")
+    if colon > last_slash:
+        reference = reference[:colon]
+    return reference
+
+
+def image_keys(reference: str) -> Set[str]:
+    """Keys an image is indexed under: its repository and the repository's last path component"""
+    repository = _image_repository(reference)
+    return {repository, repository.rsplit("/", 1)[-1]}
+
+
+def image_tag(reference: str, default: Optional[str] = "latest") -> Optional[str]:
+    """Tag or digest of an image reference ('sha256:...' for digests)"""
+    reference = reference.strip()
+    if "@" in reference:
+        return reference.split("@", 1)[1]
+    last_slash = reference.rfind("/")
+    colon = reference.rfind(":")
+    return reference[colon + 1:] if colon > last_slash else default
+
+
+def extract_environment_dependencies(env_dir: str) -> List[dict]:
+    """Every pip package, collection, bindep package and base image an environment declares"""
+    try:
+        with open(os.path.join(env_dir, EE_FILE), "r") as f:
+            config = yaml.load(f, Loader=_YAML_LOADER)
+    except (OSError, UnicodeDecodeError, yaml.YAMLError):
+        return []
+    if not isinstance(config, dict):
+        return []
+
+    entries = list(_base_images(config))
+    dependencies = config.get("dependencies")
+    if not isinstance(dependencies, dict):
+        return entries
+
+    for kind, key, parse_yaml, extract in (("python", "python", False, _pip_entries),
+                                           ("system", "system", False, _bindep_entries),
+                                           ("collection", "galaxy", True, _galaxy_entries)):
+        value = dependencies.get(key)
+        if isinstance(value, str):
+            if _TEMPLATED.search(value):
+                continue
+            content = _read_file(env_dir, value, parse_yaml)
+            if content is not None:
+                entries.extend(extract(content, value, inline=False))
+        elif value is not None:
+            entries.extend(extract(value, EE_FILE, inline=True))
+
+    for key in ("ansible_core", "ansible_runner"):
+        section = dependencies.get(key)
+        if isinstance(section, dict) and isinstance(section.get("package_pip"), str):
+            entries.extend(_pip_entries([section["package_pip"]], EE_FILE, inline=True))
+
+    return entries
+
+
+def environment_build_inputs(env_dir: str, playbook_dir: str) -> List[str]:
+    """Resolved paths of every file an environment's build reads
+
+    That is everything under the environment directory (symlinks followed),
+    dependency files referenced from elsewhere and additional_build_files
+    sources, with {{ playbook_dir }} rendered. Sources that don't exist yet
+    are kept so creating them still counts as a change.
+    """
+    inputs = set()
+    for root, _, files in os.walk(env_dir):
+        for file_name in files:
+            inputs.add(os.path.realpath(os.path.join(root, file_name)))
+
+    try:
+        with open(os.path.join(env_dir, EE_FILE), "r") as f:
+            config = yaml.load(f, Loader=_YAML_LOADER)
+    except (OSError, UnicodeDecodeError, yaml.YAMLError):
+        config = None
+    if not isinstance(config, dict):
+        return sorted(inputs)
+
+    sources = []
+    dependencies = config.get("dependencies")
+    if isinstance(dependencies, dict):
+        sources.extend(value for value in (dependencies.get(key) for key in ("python", "system", "galaxy"))
+                       if isinstance(value, str))
+    build_files = config.get("additional_build_files")
+    if isinstance(build_files, list):
+        sources.extend(entry["src"] for entry in build_files
+                       if isinstance(entry, dict) and isinstance(entry.get("src"), str))
+
+    for source in sources:
+        source = re.sub(r"{{\s*playbook_dir\s*}}", lambda _: playbook_dir, source)
+        if _TEMPLATED.search(source):
+            continue
+        path = os.path.join(env_dir, source)
+        matches = glob.glob(path) if any(ch in source for ch in "*?[") else [path]
+        for match in matches:
+            if os.path.isdir(match):
+                for root, _, files in os.walk(match):
+                    inputs.update(os.path.realpath(os.path.join(root, name)) for name in files)
+            else:
+                inputs.add(os.path.realpath(match))
+    return sorted(inputs)
+
+
+def _base_images(config: dict) -> Iterator[dict]:
+    images = config.get("images")
+    base_image = images.get("base_image") if isinstance(images, dict) else None
+    reference = base_image.get("name") if isinstance(base_image, dict) else None
+    if reference is None:
+        build_args = config.get("build_arg_defaults")
+        reference = build_args.get("EE_BASE_IMAGE") if isinstance(build_args, dict) else None
+    if isinstance(reference, str) and reference.strip() and not _TEMPLATED.search(reference):
+        yield _entry("image", reference.strip(), None, EE_FILE)
+
+
+def _read_file(env_dir: str, relative_path: str, parse_yaml: bool) -> Any:
+    path = os.path.normpath(os.path.join(env_dir, relative_path))
+    if not path.startswith(os.path.normpath(env_dir) + os.sep):
+        return None
+    try:
+        with open(path, "r") as f:
+            if parse_yaml:
+                return yaml.load(f, Loader=_YAML_LOADER)
+            return f.read().splitlines()
+    except (OSError, UnicodeDecodeError, yaml.YAMLError):
+        return None
+
+
+def _lines(content: Any, inline: bool) -> List[str]:
+    if inline:
+        return [str(item).strip() for item in content] if isinstance(content, list) else []
+    return [text for _, text in _logical_lines(content)]
+
+
+def _pip_entries(content: Any, source: str, inline: bool) -> Iterator[dict]:
+    for text in _lines(content, inline):
+        if not text or text.startswith("-") or "://" in text or _TEMPLATED.search(text):
+            continue
+        try:
+            requirement = Requirement(re.split(r"\s+--", text, 1)[0])
+        except InvalidRequirement:
+            continue
+        entry = _entry("python", requirement.name, str(requirement.specifier), source)
+        # Extras and markers included, for resolving the requirement as written
+        entry["requirement"] = str(requirement)
+        yield entry
+
+
+def _bindep_entries(content: Any, source: str, inline: bool) -> Iterator[dict]:
+    for text in _lines(content, inline):
+        match = _BINDEP_ENTRY.match(text)
+        if not match:
+            continue
+        constraint = _BINDEP_CONSTRAINT.search(text[match.end():])
+        yield _entry("system", match.group("name"), re.sub(r"\s+", "", constraint.group()) if constraint else None,
+                     source)
+
+
+def _galaxy_entries(content: Any, source: str, inline: bool) -> Iterator[dict]:
+    collections = content.get("collections") if isinstance(content, dict) else None
+    if not isinstance(collections, list):
+        return
+    for item in collections:
+        version = None
+        if isinstance(item, str):
+            name = item
+            if ":" in name and "://" not in name:
+                name, version = name.split(":", 1)
+        elif isinstance(item, dict) and isinstance(item.get("name"), str):
+            name, version = item["name"], item.get("version")
+        else:
+            continue
+        if name.strip() and not _TEMPLATED.search(name):
+            yield _entry("collection", name.strip(), normalize_constraint("collection", version), source)
+
+
+def normalize_constraint(kind: str, constraint: Any) -> Optional[str]:
+    """Canonical comma-separated form of a version constraint, or None for 'any version'"""
+    if constraint is None:
+        return None
+    text = re.sub(r"\s+", "", str(constraint))
+    if not text or text == "*":
+        return None
+    if kind == "python":
+        try:
+            return str(SpecifierSet(text)) or None
+        except InvalidSpecifier:
+            return text
+    clauses = [clause for clause in text.split(",") if clause and clause != "*"]
+    return ",".join(sorted(clauses)) or None
+
+
+def _constraint_clauses(kind: str, constraint: Optional[str]) -> Set[str]:
+    normalized = normalize_constraint(kind, constraint)
+    return set(normalized.split(",")) if normalized else set()
+
+
+def parse_dependency_query(query: str, kind: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Split 'ansible-core<2.17' or 'community.vmware:>=3.0' into (name, constraint)"""
+    query = query.strip()
+    if kind in (None, "python") and re.search(r"[<>=!~]", query):
+        try:
+            requirement = Requirement(query)
+            return requirement.name, str(requirement.specifier) or None
+        except InvalidRequirement:
+            pass
+    if kind in (None, "collection") and ":" in query and "/" not in query:
+        name, constraint = query.split(":", 1)
+        return name, constraint or None
+    return query, None
+
+
+def constraint_matches(kind: str, declared: Optional[str], wanted: Optional[str]) -> bool:
+    """True when the declared constraint contains every clause of the wanted one"""
+    wanted_clauses = _constraint_clauses(kind, wanted)
+    return not wanted_clauses or wanted_clauses <= _constraint_clauses(kind, declared)
+
+
+def constraint_allows(kind: str, constraint: Optional[str], version: str) -> bool:
+    """True when a declared constraint admits the given version (no constraint admits all)
+
+    Raises ValueError for a version that can't be parsed.
+    """
+    try:
+        candidate = Version(version)
+    except InvalidVersion:
+        raise ValueError(f"Invalid version '{version}'")
+    clauses = _constraint_clauses(kind, constraint)
+    if kind == "collection":
+        # Galaxy allows '=1.0' and bare '1.0' for an exact pin
+        clauses = {"==" + clause.lstrip("=") if clause[0] not in "<>!" else clause for clause in clauses}
+    try:
+        return SpecifierSet(",".join(clauses)).contains(candidate, prereleases=True)
+    except InvalidSpecifier:
+        return False
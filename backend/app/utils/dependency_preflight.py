@@ -0,0 +1,157 @@
+# backend/app/utils/dependency_preflight.py - Dependency preflight helpers
+#
+# Pure functions behind the pre-build dependency check: the inputs worth
+# resolving, the pip dry-run command, and turning pip and collection index
+# answers into short, precise errors.
+
+import os
+import re
+import sys
+from typing import Iterable, List, Optional, Tuple
+
+from packaging.version import InvalidVersion, Version
+
+from app.utils.dependency_index import constraint_allows, extract_environment_dependencies
+
+# Only plain Galaxy collections can be looked up; git, url and file sources can't
+_COLLECTION_NAME = re.compile(r"^[a-z0-9_]+\.[a-z0-9_]+$", re.IGNORECASE)
+# "namespace-name-1.2.3.tar.gz" as written by `ansible-galaxy collection download`
+_COLLECTION_TARBALL = re.compile(r"^([a-z0-9_]+)-([a-z0-9_]+)-(\d[^/]*)\.tar\.gz$", re.IGNORECASE)
+_PIP_NOT_FOUND = re.compile(r"Could not find a version that satisfies the requirement (.+?) \(from versions: (.*)\)")
+# Index unreachable: pip then also reports "from versions: none", which proves nothing
+_PIP_NETWORK_ERROR = re.compile(
+    r"NewConnectionError|Max retries exceeded|ConnectTimeoutError|ReadTimeoutError|"
+    r"Temporary failure in name resolution|SSLError|ProxyError|HTTP error \d+"
+)
+
+__all__ = [
+    "preflight_inputs", "pip_dry_run_command", "parse_pip_resolution",
+    "collection_tarball_versions", "collection_version_error"
+]
+
+
+def preflight_inputs(env_dir: str) -> Tuple[List[str], List[Tuple[str, Optional[str]]]]:
+    """pip requirement lines and (collection, version constraint) pairs an environment declares"""
+    requirements = []
+    collections = []
+    for entry in extract_environment_dependencies(env_dir):
+        if entry["kind"] == "python" and entry.get("requirement"):
+            requirements.append(entry["requirement"])
+        elif entry["kind"] == "collection" and _COLLECTION_NAME.match(entry["name"]):
+            collections.append((entry["name"].lower(), entry["constraint"]))
+    return sorted(set(requirements)), sorted(set(collections), key=lambda item: (item[0], item[1] or ""))
+
+
+def pip_dry_run_command(requirements_file: str, index_url: Optional[str] = None,
+                        find_links: Optional[str] = None, timeout: int = 10) -> List[str]:
+    """pip install --dry-run resolving a requirements file without installing anything
+
+    With only find_links, pip resolves offline against that directory. The
+    API's own interpreter resolves, so Requires-Python is ignored - the
+    image's Python may differ. Only wheels are considered: building an sdist
+    would run its setup.py on the API host.
+    """
+    command = [sys.executable, "-m", "pip", "install", "--dry-run", "--ignore-installed",
+               "--only-binary=:all:", "--ignore-requires-python", "--no-input", "--disable-pip-version-check",
+               "--retries", "1", "--timeout", str(timeout), "-r", requirements_file]
+    if index_url:
+        command += ["--index-url", index_url]
+    if find_links:
+        command += ["--find-links", find_links]
+        if not index_url:
+            command.append("--no-index")
+    return command
+
+
+def parse_pip_resolution(lines: Iterable[str], return_code: int) -> Tuple[List[str], Optional[str]]:
+    """(errors, reason the result is inconclusive) from pip dry-run output
+
+    Errors are impossible dependency sets; an unreachable index or any other
+    pip failure makes the check inconclusive instead, and so does a package
+    with no wheel at all, which may still install from its sdist.
+    """
+    if return_code == 0:
+        return [], None
+
+    errors = []
+    without_wheels = []
+    network_error = None
+    conflict: Optional[List[str]] = None
+    last_error = None
+    for line in lines:
+        if conflict is not None:
+            # Captured lines lose their indentation, so the causes run up to pip's advice
+            if line.strip() and not line.startswith(("To fix this", "ERROR:")):
+                conflict.append(line.strip())
+                continue
+            if conflict:
+                errors.append("Conflicting requirements: " + "; ".join(conflict))
+            conflict = None
+        if line.startswith("The conflict is caused by:"):
+            conflict = []
+            continue
+        match = _PIP_NETWORK_ERROR.search(line)
+        if network_error is None and match:
+            network_error = match.group()
+        match = _PIP_NOT_FOUND.search(line)
+        if match:
+            requirement, versions = match.groups()
+            if versions.strip() == "none":
+                without_wheels.append(requirement)
+            else:
+                errors.append(f"{requirement}: no matching version (available: {_latest(versions.split(', '))})")
+        if line.startswith("ERROR:"):
+            last_error = line[len("ERROR:"):].strip()
+    if conflict:
+        errors.append("Conflicting requirements: " + "; ".join(conflict))
+
+    if network_error:
+        return [], f"package index unreachable ({network_error})"
+    if not errors and without_wheels:
+        return [], f"no wheels found for {', '.join(without_wheels)} (sdists aren't built during preflight)"
+    if not errors:
+        return [], last_error or f"pip exited with {return_code}"
+    return errors, None
+
+
+def collection_tarball_versions(directory: str, name: str) -> List[str]:
+    """Versions of a collection present as downloaded tarballs in a directory"""
+    namespace, collection = name.lower().split(".", 1)
+    versions = []
+    try:
+        file_names = os.listdir(directory)
+    except OSError:
+        return []
+    for file_name in file_names:
+        match = _COLLECTION_TARBALL.match(file_name)
+        if match and match.group(1).lower() == namespace and match.group(2).lower() == collection:
+            versions.append(match.group(3))
+    return versions
+
+
+def collection_version_error(name: str, constraint: Optional[str], versions: List[str]) -> Optional[str]:
+    """Why no available version of a collection satisfies a constraint (None if one does)"""
+    if not versions:
+        return f"{name}: collection not found"
+    if constraint is None:
+        return None
+    for version in versions:
+        try:
+            if constraint_allows("collection", constraint, version):
+                return None
+        except ValueError:
+            continue
+    return f"{name}:{constraint}: no matching version (available: {_latest(versions)})"
+
+
+def _latest(versions: List[str], count: int = 5) -> str:
+    """The newest few of a list of versions, newest last"""
+    def sort_key(version: str):
+        try:
+            return (1, Version(version))
+        except InvalidVersion:
+            return (0, version)
+
+    versions = sorted({version.strip() for version in versions if version.strip()}, key=sort_key)
+    shown = ", ".join(versions[-count:])
+    return f"..., {shown}" if len(versions) > count else shown
@@ -0,0 +1,506 @@
+# backend/app/utils/ee_validation.py - ansible-builder definition validation
+#
+# Pure functions with no application state, so they can run in worker
+# processes. Issues are plain dicts:
+#   {"file": "execution-environment.yml", "location": "images.base_image.name",
+#    "line": None, "message": "..."}
+
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+from packaging.requirements import InvalidRequirement, Requirement
+
+EE_FILE = "execution-environment.yml"
+SCHEMA_VERSIONS = (1, 2, 3)
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Values rendered by the build playbook before ansible-builder sees them
+_TEMPLATED = re.compile(r"{{.*}}|{%.*%}")
+
+# --- Image references (distribution/reference grammar) ---
+_DOMAIN_COMPONENT = r"(?:[a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9-]*[a-zA-Z0-9])"
+_DOMAIN = rf"{_DOMAIN_COMPONENT}(?:\.{_DOMAIN_COMPONENT})*(?::[0-9]+)?"
+_PATH_COMPONENT = r"[a-z0-9]+(?:(?:[._]|__|[-]+)[a-z0-9]+)*"
+_IMAGE_REFERENCE = re.compile(
+    rf"^(?:(?P<domain>{_DOMAIN})/)?(?P<path>{_PATH_COMPONENT}(?:/{_PATH_COMPONENT})*)"
+    r"(?::(?P<tag>[\w][\w.-]{0,127}))?"
+    r"(?:@(?P<digest>[A-Za-z][A-Za-z0-9]*(?:[-_+.][A-Za-z][A-Za-z0-9]*)*:[0-9a-fA-F]{32,}))?$"
+)
+
+# --- Requirement files ---
+_PIP_OPTIONS = {
+    "-r", "--requirement", "-c", "--constraint", "-e", "--editable", "-i", "--index-url",
+    "--extra-index-url", "--no-index", "-f", "--find-links", "--pre", "--trusted-host",
+    "--prefer-binary", "--require-hashes", "--only-binary", "--no-binary", "--use-feature"
+}
+_GALAXY_COLLECTION_NAME = re.compile(r"^[a-z][a-z0-9_]*\.[a-z][a-z0-9_]*$")
+_GALAXY_VERSION_PART = re.compile(r"^(?:==|!=|>=|<=|>|<|=)?\s*(?:\*|[0-9][\w.+-]*)$")
+_GALAXY_SOURCE_TYPES = {"galaxy", "git", "url", "file", "dir", "subdirs"}
+_BINDEP_NAME = r"[A-Za-z0-9][A-Za-z0-9.+_:-]*"
+_BINDEP_SELECTOR = r"\[\s*!?[\w.:+-]+(?:\s+!?[\w.:+-]+)*\s*\]"
+_BINDEP_VERSION = r"(?:<=|>=|==|!=|<|>)\s*[\w.~+:-]+(?:\s*,\s*(?:<=|>=|==|!=|<|>)\s*[\w.~+:-]+)*"
+_BINDEP_LINE = re.compile(
+    rf"^{_BINDEP_NAME}(?:\s+{_BINDEP_SELECTOR})?(?:\s*{_BINDEP_VERSION})?(?:\s+{_BINDEP_SELECTOR})?$"
+)
+
+# --- execution-environment.yml schema, per version ---
+_STEP_KEYS_V1 = {"prepend", "append"}
+_STEP_KEYS_V3 = {
+    "prepend_base", "append_base", "prepend_galaxy", "append_galaxy",
+    "prepend_builder", "append_builder", "prepend_final", "append_final"
+}
+_TOP_LEVEL_KEYS = {
+    1: {"version", "build_arg_defaults", "ansible_config", "dependencies", "additional_build_steps"},
+    2: {"version", "build_arg_defaults", "ansible_config", "dependencies", "additional_build_steps", "images"},
+    3: {"version", "build_arg_defaults", "dependencies", "additional_build_files", "additional_build_steps",
+        "images", "options"},
+}
+_BUILD_ARG_KEYS = {
+    1: {"EE_BASE_IMAGE", "EE_BUILDER_IMAGE", "ANSIBLE_GALAXY_CLI_COLLECTION_OPTS", "ANSIBLE_GALAXY_CLI_ROLE_OPTS"},
+    2: {"ANSIBLE_GALAXY_CLI_COLLECTION_OPTS", "ANSIBLE_GALAXY_CLI_ROLE_OPTS"},
+    3: {"ANSIBLE_GALAXY_CLI_COLLECTION_OPTS", "ANSIBLE_GALAXY_CLI_ROLE_OPTS", "PKGMGR_PRESERVE_CACHE"},
+}
+_IMAGE_KEYS = {2: {"base_image", "builder_image"}, 3: {"base_image"}}
+_OPTION_TYPES = {
+    "container_init": dict, "package_manager_path": str, "relax_passwd_permissions": bool,
+    "skip_ansible_check": bool, "skip_pip_install": bool, "workdir": str, "user": str, "tags": list
+}
+
+__all__ = [
+    "EE_FILE", "SCHEMA_VERSIONS", "validate_environment_dir", "validate_environment_dirs",
+    "validate_pip_requirements", "validate_galaxy_requirements",
+    "validate_bindep_requirements", "validate_image_reference"
+]
+
+
+def _issue(file: str, message: str, location: Optional[str] = None, line: Optional[int] = None) -> dict:
+    return {"file": file, "location": location, "line": line, "message": message}
+
+
+class _Report:
+    """Collects errors and warnings for one environment"""
+
+    def __init__(self):
+        self.errors: List[dict] = []
+        self.warnings: List[dict] = []
+
+    def error(self, file: str, message: str, location: Optional[str] = None, line: Optional[int] = None):
+        self.errors.append(_issue(file, message, location, line))
+
+    def warning(self, file: str, message: str, location: Optional[str] = None, line: Optional[int] = None):
+        self.warnings.append(_issue(file, message, location, line))
+
+    def extend(self, errors: List[dict], warnings: List[dict]):
+        self.errors.extend(errors)
+        self.warnings.extend(warnings)
+
+
+def validate_environment_dirs(env_dirs: List[str]) -> List[dict]:
+    """Validate a batch of environment directories (the unit of work for a process pool)"""
+    return [validate_environment_dir(env_dir) for env_dir in env_dirs]
+
+
+def validate_environment_dir(env_dir: str) -> dict:
+    """Validate an environment's definition, its requirement files and image references"""
+    report = _Report()
+    name = os.path.basename(os.path.normpath(env_dir))
+    ee_path = os.path.join(env_dir, EE_FILE)
+    schema_version = None
+
+    try:
+        with open(ee_path, "r") as f:
+            config = yaml.load(f, Loader=_YAML_LOADER)
+        loaded = True
+    except FileNotFoundError:
+        report.error(EE_FILE, f"Missing {EE_FILE}")
+        loaded = False
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        report.error(EE_FILE, f"Invalid YAML syntax: {getattr(e, 'problem', None) or e}",
+                     line=mark.line + 1 if mark else None)
+        loaded = False
+
+    if loaded:
+        schema_version = _validate_definition(config, report)
+        if schema_version is not None:
+            _validate_dependencies(env_dir, config.get("dependencies"), schema_version, report)
+            _validate_build_files(env_dir, config.get("additional_build_files"), report)
+
+    return {
+        "name": name,
+        "valid": not report.errors,
+        "schema_version": schema_version,
+        "errors": report.errors,
+        "warnings": report.warnings,
+    }
+
+
+def _validate_definition(config: Any, report: _Report) -> Optional[int]:
+    """Check execution-environment.yml content against the ansible-builder schema
+
+    Returns the schema version used, or None when the document can't be checked.
+    """
+    if not isinstance(config, dict):
+        report.error(EE_FILE, "Definition must be a mapping" if config is not None else f"Empty {EE_FILE}")
+        return None
+
+    version = config.get("version")
+    if version is None:
+        report.warning(EE_FILE, "No version field; ansible-builder assumes version 1", "version")
+        version = 1
+    try:
+        version = int(version)
+    except (TypeError, ValueError):
+        version = None
+    if version not in SCHEMA_VERSIONS:
+        report.error(EE_FILE, f"Unsupported version {config.get('version')!r}; use one of 1, 2, 3", "version")
+        return None
+
+    for key in config:
+        if key not in _TOP_LEVEL_KEYS[version]:
+            hint = " (use images.base_image.name)" if key == "image" else ""
+            report.error(EE_FILE, f"Unknown key '{key}' for version {version}{hint}", key)
+
+    build_args = _mapping(config, "build_arg_defaults", report)
+    for key, value in build_args.items():
+        if key not in _BUILD_ARG_KEYS[version]:
+            report.error(EE_FILE, f"Unknown build argument '{key}' for version {version}", f"build_arg_defaults.{key}")
+        elif not isinstance(value, (str, int, float, bool)):
+            report.error(EE_FILE, "Build argument must be a scalar", f"build_arg_defaults.{key}")
+
+    if version == 1:
+        if "EE_BASE_IMAGE" in build_args:
+            _check_image(str(build_args["EE_BASE_IMAGE"]), "build_arg_defaults.EE_BASE_IMAGE", report)
+        else:
+            report.warning(EE_FILE, "No EE_BASE_IMAGE; ansible-builder's default base image is used",
+                           "build_arg_defaults")
+        if "EE_BUILDER_IMAGE" in build_args:
+            _check_image(str(build_args["EE_BUILDER_IMAGE"]), "build_arg_defaults.EE_BUILDER_IMAGE", report)
+    else:
+        images = _mapping(config, "images", report)
+        if not images:
+            report.error(EE_FILE, "No base image specified", "images.base_image.name")
+        for key, image in images.items():
+            location = f"images.{key}"
+            if key not in _IMAGE_KEYS[version]:
+                report.error(EE_FILE, f"Unknown image '{key}' for version {version}", location)
+                continue
+            if not isinstance(image, dict):
+                report.error(EE_FILE, "Image must be a mapping with a name", location)
+                continue
+            for image_key in image:
+                if image_key not in ("name", "signature_original_name", "options"):
+                    report.warning(EE_FILE, f"Unknown image setting '{image_key}'", f"{location}.{image_key}")
+            if not isinstance(image.get("name"), str) or not image["name"].strip():
+                report.error(EE_FILE, "Image name is required", f"{location}.name")
+            else:
+                _check_image(image["name"], f"{location}.name", report)
+
+    steps = _mapping(config, "additional_build_steps", report)
+    step_keys = _STEP_KEYS_V3 if version == 3 else _STEP_KEYS_V1
+    for key, value in steps.items():
+        location = f"additional_build_steps.{key}"
+        if key not in step_keys:
+            report.error(EE_FILE, f"Unknown build step '{key}' for version {version}", location)
+        elif not isinstance(value, (str, list)) or (isinstance(value, list) and
+                                                     not all(isinstance(step, str) for step in value)):
+            report.error(EE_FILE, "Build steps must be a string or a list of strings", location)
+
+    if version == 3:
+        options = _mapping(config, "options", report)
+        for key, value in options.items():
+            location = f"options.{key}"
+            expected = _OPTION_TYPES.get(key)
+            if expected is None:
+                report.error(EE_FILE, f"Unknown option '{key}'", location)
+            elif not isinstance(value, expected):
+                report.error(EE_FILE, f"Option must be a {expected.__name__}", location)
+    elif "ansible_config" in config and not isinstance(config["ansible_config"], str):
+        report.error(EE_FILE, "ansible_config must be a file path", "ansible_config")
+
+    return version
+
+
+def _mapping(config: dict, key: str, report: _Report) -> dict:
+    """A section that must be a mapping if present"""
+    value = config.get(key)
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        report.error(EE_FILE, f"'{key}' must be a mapping", key)
+        return {}
+    return value
+
+
+def _check_image(reference: str, location: str, report: _Report):
+    error, warning = validate_image_reference(reference)
+    if error:
+        report.error(EE_FILE, error, location)
+    elif warning:
+        report.warning(EE_FILE, warning, location)
+
+
+def validate_image_reference(reference: str) -> Tuple[Optional[str], Optional[str]]:
+    """Check a container image reference; returns (error, warning)"""
+    reference = reference.strip()
+    if _TEMPLATED.search(reference):
+        return None, None
+    if len(reference) > 255:
+        return "Image reference is longer than 255 characters", None
+
+    match = _IMAGE_REFERENCE.match(reference)
+    if not match:
+        if reference != reference.lower() and _IMAGE_REFERENCE.match(reference.lower()):
+            return f"Invalid image reference '{reference}': repository names must be lowercase", None
+        return f"Invalid image reference '{reference}'", None
+
+    domain = match.group("domain")
+    if domain and "." not in domain and ":" not in domain and domain != "localhost":
+        # "foo/bar" - the first component is a namespace on the default registry
+        domain = None
+    if not domain:
+        return None, f"Image '{reference}' has no registry and depends on short-name resolution"
+    if not match.group("tag") and not match.group("digest"):
+        return None, f"Image '{reference}' has no tag and will use ':latest'"
+    return None, None
+
+
+def _validate_dependencies(env_dir: str, dependencies: Any, version: int, report: _Report):
+    """Validate dependency declarations and the requirement files they point at"""
+    if dependencies is None:
+        return
+    if not isinstance(dependencies, dict):
+        report.error(EE_FILE, "'dependencies' must be a mapping", "dependencies")
+        return
+
+    allowed = {"python", "galaxy", "system"}
+    if version == 3:
+        allowed |= {"python_interpreter", "ansible_core", "ansible_runner", "exclude"}
+    for key in dependencies:
+        if key not in allowed:
+            report.error(EE_FILE, f"Unknown dependency type '{key}' for version {version}", f"dependencies.{key}")
+
+    checks: Dict[str, Tuple[Callable[..., Tuple[List[dict], List[dict]]], type]] = {
+        "python": (validate_pip_requirements, list),
+        "system": (validate_bindep_requirements, list),
+        "galaxy": (validate_galaxy_requirements, dict),
+    }
+    for key, (validator, inline_type) in checks.items():
+        value = dependencies.get(key)
+        location = f"dependencies.{key}"
+        if value is None:
+            continue
+        if isinstance(value, str):
+            if _TEMPLATED.search(value):
+                continue
+            content = _read_requirement_file(env_dir, value, location, report, parse_yaml=key == "galaxy")
+            if content is not None:
+                report.extend(*validator(content, value))
+        elif version == 3 and isinstance(value, inline_type):
+            report.extend(*validator(value, EE_FILE, location))
+        elif version == 3 and key == "galaxy" and isinstance(value, list):
+            report.extend(*validator(value, EE_FILE, location))
+        else:
+            expected = "a file path" if version < 3 else f"a file path or an inline {inline_type.__name__}"
+            report.error(EE_FILE, f"'{key}' dependencies must be {expected}", location)
+
+    if version == 3:
+        for key, fields in (("python_interpreter", {"package_system", "python_path"}),
+                            ("ansible_core", {"package_pip"}), ("ansible_runner", {"package_pip"}),
+                            ("exclude", {"python", "system", "all_from_collections"})):
+            value = dependencies.get(key)
+            if value is None:
+                continue
+            if not isinstance(value, dict):
+                report.error(EE_FILE, f"'{key}' must be a mapping", f"dependencies.{key}")
+                continue
+            for field in value:
+                if field not in fields:
+                    report.error(EE_FILE, f"Unknown setting '{field}'", f"dependencies.{key}.{field}")
+        for key in ("ansible_core", "ansible_runner"):
+            section = dependencies.get(key)
+            if isinstance(section, dict) and isinstance(section.get("package_pip"), str):
+                report.extend(*validate_pip_requirements(
+                    [section["package_pip"]], EE_FILE, f"dependencies.{key}.package_pip"
+                ))
+
+
+def _read_requirement_file(env_dir: str, relative_path: str, location: str, report: _Report,
+                           parse_yaml: bool = False) -> Any:
+    """Load a dependency file referenced by the definition, reporting problems"""
+    path = os.path.normpath(os.path.join(env_dir, relative_path))
+    if not path.startswith(os.path.normpath(env_dir) + os.sep):
+        report.error(EE_FILE, f"'{relative_path}' points outside the environment directory", location)
+        return None
+    try:
+        with open(path, "r") as f:
+            if parse_yaml:
+                content = yaml.load(f, Loader=_YAML_LOADER)
+                return content if content is not None else {}
+            return f.read().splitlines()
+    except FileNotFoundError:
+        report.error(EE_FILE, f"Missing {relative_path}", location)
+    except UnicodeDecodeError:
+        report.error(relative_path, "File is not valid UTF-8")
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        report.error(relative_path, f"Invalid YAML syntax: {getattr(e, 'problem', None) or e}",
+                     line=mark.line + 1 if mark else None)
+    return None
+
+
+def _validate_build_files(env_dir: str, build_files: Any, report: _Report):
+    """Check additional_build_files entries and that local sources exist"""
+    if build_files is None:
+        return
+    if not isinstance(build_files, list):
+        report.error(EE_FILE, "'additional_build_files' must be a list", "additional_build_files")
+        return
+    for index, entry in enumerate(build_files):
+        location = f"additional_build_files[{index}]"
+        if not isinstance(entry, dict) or not isinstance(entry.get("src"), str) or not isinstance(entry.get("dest"), str):
+            report.error(EE_FILE, "Each build file needs a 'src' and a 'dest'", location)
+            continue
+        for key in entry:
+            if key not in ("src", "dest"):
+                report.error(EE_FILE, f"Unknown build file setting '{key}'", f"{location}.{key}")
+        src = entry["src"]
+        if _TEMPLATED.search(src) or any(ch in src for ch in "*?["):
+            continue
+        if not os.path.exists(os.path.join(env_dir, src)):
+            report.warning(EE_FILE, f"Build file source '{src}' does not exist", f"{location}.src")
+
+
+def _logical_lines(lines: List[str]) -> List[Tuple[int, str]]:
+    """Join backslash continuations and drop comments, keeping first line numbers"""
+    logical: List[Tuple[int, str]] = []
+    buffer, start = "", 0
+    for number, raw in enumerate(lines, start=1):
+        if not buffer:
+            start = number
+        line = raw.rstrip("\n")
+        if line.endswith("\\"):
+            buffer += line[:-1] + " "
+            continue
+        buffer += line
+        text = re.sub(r"(^|\s)#.*$", "", buffer).strip()
+        if text:
+            logical.append((start, text))
+        buffer = ""
+    if buffer.strip():
+        logical.append((start, buffer.strip()))
+    return logical
+
+
+def validate_pip_requirements(entries: List[Any], file: str,
+                              location: Optional[str] = None) -> Tuple[List[dict], List[dict]]:
+    """Check pip requirement lines (a requirements.txt or an inline list)"""
+    errors: List[dict] = []
+    warnings: List[dict] = []
+    inline = location is not None
+
+    if inline:
+        numbered = [(index, str(entry).strip()) for index, entry in enumerate(entries)]
+    else:
+        numbered = _logical_lines(entries)
+
+    for number, text in numbered:
+        where = (f"{location}[{number}]" if inline else None, None if inline else number)
+        if not text:
+            continue
+        if text.startswith("-"):
+            option = re.split(r"[\s=]", text, 1)[0]
+            if option not in _PIP_OPTIONS:
+                warnings.append(_issue(file, f"Unrecognised pip option '{option}'", *where))
+            continue
+        if "://" in text or text.startswith((".", "/", "file:")) or _TEMPLATED.search(text):
+            continue
+        requirement = re.split(r"\s+--", text, 1)[0]
+        try:
+            Requirement(requirement)
+        except InvalidRequirement as e:
+            errors.append(_issue(file, f"Invalid requirement '{text}': {str(e).splitlines()[0]}", *where))
+    return errors, warnings
+
+
+def validate_bindep_requirements(entries: List[Any], file: str,
+                                 location: Optional[str] = None) -> Tuple[List[dict], List[dict]]:
+    """Check bindep lines (a bindep.txt or an inline list)"""
+    errors: List[dict] = []
+    inline = location is not None
+    numbered = ([(index, str(entry).strip()) for index, entry in enumerate(entries)] if inline
+                else _logical_lines(entries))
+
+    for number, text in numbered:
+        if text and not _BINDEP_LINE.match(text):
+            errors.append(_issue(file, f"Invalid bindep entry '{text}'",
+                                 f"{location}[{number}]" if inline else None, None if inline else number))
+    return errors, []
+
+
+def validate_galaxy_requirements(content: Any, file: str,
+                                 location: Optional[str] = None) -> Tuple[List[dict], List[dict]]:
+    """Check a galaxy requirements document (requirements.yml or an inline mapping)"""
+    errors: List[dict] = []
+    warnings: List[dict] = []
+    prefix = f"{location}." if location else ""
+
+    if isinstance(content, list):
+        # Legacy format: a bare list of roles
+        _check_galaxy_entries(content, "roles", file, f"{prefix}roles" if location else "", errors, warnings)
+        return errors, warnings
+    if not isinstance(content, dict):
+        errors.append(_issue(file, "Galaxy requirements must be a mapping with 'collections' and/or 'roles'",
+                             location))
+        return errors, warnings
+
+    for key in content:
+        if key not in ("collections", "roles"):
+            warnings.append(_issue(file, f"Unknown galaxy requirements key '{key}'", f"{prefix}{key}"))
+    for key in ("collections", "roles"):
+        entries = content.get(key)
+        if entries is None:
+            continue
+        if not isinstance(entries, list):
+            errors.append(_issue(file, f"'{key}' must be a list", f"{prefix}{key}"))
+            continue
+        _check_galaxy_entries(entries, key, file, f"{prefix}{key}", errors, warnings)
+    return errors, warnings
+
+
+def _check_galaxy_entries(entries: List[Any], kind: str, file: str, location: str,
+                          errors: List[dict], warnings: List[dict]):
+    for index, entry in enumerate(entries):
+        where = f"{location}[{index}]"
+        if isinstance(entry, str):
+            entry = {"name": entry}
+            if kind == "collections" and ":" in entry["name"] and "://" not in entry["name"]:
+                name, version = entry["name"].split(":", 1)
+                entry = {"name": name, "version": version}
+        if not isinstance(entry, dict):
+            errors.append(_issue(file, f"Each {kind[:-1]} must be a name or a mapping", where))
+            continue
+
+        name = entry.get("name") or (entry.get("src") if kind == "roles" else None)
+        if not isinstance(name, str) or not name.strip():
+            errors.append(_issue(file, f"{kind[:-1].capitalize()} needs a name", where))
+            continue
+        if kind == "roles":
+            continue
+
+        source_type = entry.get("type", "galaxy")
+        if source_type not in _GALAXY_SOURCE_TYPES:
+            errors.append(_issue(file, f"Unknown collection type '{source_type}'", f"{where}.type"))
+            continue
+        looks_like_source = "/" in name or name.endswith((".tar.gz", ".git"))
+        if source_type == "galaxy" and not looks_like_source and not _GALAXY_COLLECTION_NAME.match(name):
+            errors.append(_issue(file, f"Invalid collection name '{name}'; expected namespace.collection", where))
+
+        version = entry.get("version")
+        if version is not None and source_type == "galaxy" and not looks_like_source:
+            parts = [part.strip() for part in str(version).split(",")]
+            if not all(_GALAXY_VERSION_PART.match(part) for part in parts):
+                errors.append(_issue(file, f"Invalid version constraint '{version}' for {name}", f"{where}.version"))
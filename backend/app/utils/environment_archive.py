@@ -0,0 +1,134 @@
+# backend/app/utils/environment_archive.py - Unpacking bulk environment imports
+#
+# Turns an uploaded tar/zip archive or multi-document YAML stream into
+# {environment name: {relative path: file content}} without touching disk.
+# In an archive, every directory holding an execution-environment.yml is
+# one environment. In a YAML stream, every document is an
+# execution-environment.yml with two extra keys: its environment "name" and
+# optional "files" ({relative path: text}) written next to it.
+
+import io
+import posixpath
+import tarfile
+import zipfile
+from typing import Callable, Dict, Iterator, Tuple
+
+import yaml
+
+from app.utils.ee_validation import EE_FILE
+
+__all__ = ["read_environment_bundle"]
+
+
+def read_environment_bundle(data: bytes, max_bytes: int, max_environments: int) -> Dict[str, Dict[str, bytes]]:
+    """Environments and their files from a tar (any compression), zip or multi-document YAML upload
+
+    Raises ValueError for unsafe paths, links, oversized contents or an
+    upload that holds no environments.
+    """
+    if zipfile.is_zipfile(io.BytesIO(data)):
+        files = _collect(_zip_members(data), max_bytes)
+    else:
+        try:
+            with tarfile.open(fileobj=io.BytesIO(data), mode="r:*"):
+                is_tar = True
+        except tarfile.TarError:
+            is_tar = False
+        files = _collect(_tar_members(data), max_bytes) if is_tar else None
+
+    environments = _group_by_environment(files) if files is not None else _yaml_documents(data)
+    if not environments:
+        raise ValueError(f"No environments found; expected directories containing {EE_FILE}")
+    if len(environments) > max_environments:
+        raise ValueError(f"Too many environments ({len(environments)}); the limit is {max_environments}")
+    return environments
+
+
+def _safe_path(name: str) -> str:
+    path = posixpath.normpath(name.replace("\\", "/"))
+    if path.startswith("/") or path == ".." or path.startswith("../"):
+        raise ValueError(f"Unsafe path in archive: {name}")
+    return path
+
+
+def _zip_members(data: bytes) -> Iterator[Tuple[str, int, Callable[[], bytes]]]:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            # Symlinks are stored as files with S_IFLNK in the high mode bits
+            if (info.external_attr >> 16) & 0o170000 == 0o120000:
+                raise ValueError(f"Links are not allowed in archives: {info.filename}")
+            yield info.filename, info.file_size, lambda info=info: archive.read(info)
+
+
+def _tar_members(data: bytes) -> Iterator[Tuple[str, int, Callable[[], bytes]]]:
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:*") as archive:
+        for member in archive:
+            if member.isdir():
+                continue
+            if not member.isfile():
+                raise ValueError(f"Only regular files are allowed in archives: {member.name}")
+            yield member.name, member.size, lambda member=member: archive.extractfile(member).read()
+
+
+def _collect(members: Iterator[Tuple[str, int, Callable[[], bytes]]], max_bytes: int) -> Dict[str, bytes]:
+    """Read archive members into memory, enforcing the unpacked size limit before each read"""
+    files = {}
+    total = 0
+    for name, size, read in members:
+        path = _safe_path(name)
+        parts = path.split("/")
+        # Metadata dropped in by macOS archivers
+        if "__MACOSX" in parts or parts[-1].startswith("._"):
+            continue
+        total += size
+        if total > max_bytes:
+            raise ValueError(f"Archive contents exceed {max_bytes} bytes")
+        files[path] = read()
+    return files
+
+
+def _group_by_environment(files: Dict[str, bytes]) -> Dict[str, Dict[str, bytes]]:
+    roots = sorted(posixpath.dirname(path) for path in files if posixpath.basename(path) == EE_FILE)
+    if "" in roots:
+        raise ValueError(f"{EE_FILE} at the archive root; put each environment in its own directory")
+
+    environments: Dict[str, Dict[str, bytes]] = {}
+    for root in roots:
+        nested = next((other for other in roots if other != root and root.startswith(other + "/")), None)
+        if nested:
+            raise ValueError(f"Environment '{root}' is nested inside '{nested}'")
+        name = posixpath.basename(root)
+        if name in environments:
+            raise ValueError(f"Environment '{name}' appears more than once in the archive")
+        prefix = root + "/"
+        environments[name] = {path[len(prefix):]: content for path, content in files.items()
+                              if path.startswith(prefix)}
+    return environments
+
+
+def _yaml_documents(data: bytes) -> Dict[str, Dict[str, bytes]]:
+    try:
+        documents = [document for document in yaml.safe_load_all(data.decode("utf-8")) if document is not None]
+    except (UnicodeDecodeError, yaml.YAMLError) as e:
+        raise ValueError(f"Upload is neither a tar/zip archive nor valid multi-document YAML: {e}")
+
+    environments: Dict[str, Dict[str, bytes]] = {}
+    for number, document in enumerate(documents, 1):
+        if not isinstance(document, dict) or not isinstance(document.get("name"), str):
+            raise ValueError(f"YAML document {number} needs a 'name' for its environment")
+        document = dict(document)
+        name = document.pop("name")
+        extra_files = document.pop("files", None) or {}
+        if not isinstance(extra_files, dict) or not all(
+            isinstance(path, str) and isinstance(content, str) for path, content in extra_files.items()
+        ):
+            raise ValueError(f"'files' of environment '{name}' must map relative paths to text")
+        if name in environments:
+            raise ValueError(f"Environment '{name}' appears more than once")
+
+        files = {_safe_path(path): content.encode("utf-8") for path, content in extra_files.items()}
+        files[EE_FILE] = yaml.dump(document, default_flow_style=False, sort_keys=False).encode("utf-8")
+        environments[name] = files
+    return environments
@@ -6,6 +6,10 @@ import yaml
 from pathlib import Path
 from typing import Optional
 
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
 
 def cleanup_temp_file(file_path: Optional[str]):
     """Safely clean up a temporary file"""
@@ -15,9 +19,9 @@ def cleanup_temp_file(file_path: Optional[str]):
     try:
         if os.path.exists(file_path):
             os.unlink(file_path)
-            print(f"🧹 Cleaned up temp file: {file_path}")
+            logger.info(f"🧹 Cleaned up temp file: {file_path}")
     except Exception as e:
-        print(f"⚠️ Could not clean up temp file {file_path}: {e}")
+        logger.warning(f"⚠️ Could not clean up temp file {file_path}: {e}")
 
 
 def create_temp_yaml(data: dict) -> str:
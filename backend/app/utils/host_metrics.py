@@ -0,0 +1,154 @@
+# backend/app/utils/host_metrics.py - Live host metrics for build admission
+#
+# Reads load, memory, disk and I/O pressure from /proc (Linux). Anything a
+# host can't report comes back as None and is left out of admission
+# decisions rather than guessed.
+
+import os
+import shutil
+from typing import Dict, Optional, Tuple
+
+__all__ = [
+    "read_host_metrics", "process_tree_usage", "combine_reservations", "admission_shortfalls"
+]
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+GIB = 1024 ** 3
+
+
+def _cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def _mem_available() -> Optional[int]:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _io_pressure() -> Optional[float]:
+    """Share of the last 10s in which some task stalled on I/O (PSI), in percent"""
+    try:
+        with open("/proc/pressure/io") as f:
+            for line in f:
+                if line.startswith("some "):
+                    fields = dict(field.split("=", 1) for field in line.split()[1:])
+                    return float(fields["avg10"])
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def read_host_metrics(disk_path: Optional[str] = None) -> Dict[str, Optional[float]]:
+    """CPU count, 1-minute load, available memory, free disk at disk_path and I/O pressure"""
+    try:
+        load = os.getloadavg()[0]
+    except (AttributeError, OSError):
+        load = None
+    disk_free = None
+    if disk_path:
+        try:
+            disk_free = shutil.disk_usage(disk_path).free
+        except OSError:
+            pass
+    return {
+        "cpus": _cpu_count(),
+        "load": load,
+        "memory_available": _mem_available(),
+        "disk_free": disk_free,
+        "io_pressure": _io_pressure()
+    }
+
+
+def process_tree_usage(pid: int) -> Optional[Tuple[int, float]]:
+    """(resident bytes, CPU seconds) of a process and all its descendants (None if it's gone)
+
+    CPU seconds include children the tree has already reaped.
+    """
+    parents: Dict[int, int] = {}
+    stats: Dict[int, Tuple[int, float]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces and parentheses; fields resume after the last ")"
+        fields = stat[stat.rfind(")") + 2:].split()
+        try:
+            parents[int(entry)] = int(fields[1])
+            cpu_ticks = sum(int(value) for value in fields[11:15])
+            stats[int(entry)] = (int(fields[21]) * _PAGE_SIZE, cpu_ticks / _CLOCK_TICKS)
+        except (IndexError, ValueError):
+            continue
+    if pid not in stats:
+        return None
+
+    children: Dict[int, list] = {}
+    for child, parent in parents.items():
+        children.setdefault(parent, []).append(child)
+    rss, cpu_seconds = 0, 0.0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        if current in stats:
+            rss += stats[current][0]
+            cpu_seconds += stats[current][1]
+        stack.extend(children.get(current, []))
+    return rss, cpu_seconds
+
+
+def combine_reservations(profiles, parallel: int = 1) -> Dict[str, float]:
+    """Reservation of a build from its environments' profiles
+
+    At most `parallel` environments are built at a time, so memory and CPUs
+    are the sum of that many largest needs while disk adds up.
+    """
+    profiles = list(profiles)
+    return {
+        "memory": sum(sorted((profile["memory"] for profile in profiles), reverse=True)[:parallel]),
+        "cpus": sum(sorted((profile["cpus"] for profile in profiles), reverse=True)[:parallel]),
+        "disk": sum(profile["disk"] for profile in profiles)
+    }
+
+
+def admission_shortfalls(metrics: Dict[str, Optional[float]], reservation: Dict[str, float],
+                         pending: Dict[str, float], min_free_memory: float, min_free_disk: float,
+                         max_load_per_cpu: float, max_io_pressure: float) -> list:
+    """Why a build with this reservation can't start now (empty if it can)
+
+    pending is the reservation of builds admitted too recently for their
+    usage to show up in the metrics yet.
+    """
+    shortfalls = []
+    if metrics["memory_available"] is not None:
+        free = metrics["memory_available"] - min_free_memory - pending["memory"]
+        if free < reservation["memory"]:
+            shortfalls.append(f"memory: {max(free, 0) / GIB:.1f} GiB free, needs {reservation['memory'] / GIB:.1f} GiB")
+    if metrics["load"] is not None:
+        capacity = metrics["cpus"] * max_load_per_cpu
+        load = metrics["load"] + pending["cpus"]
+        if load + reservation["cpus"] > capacity:
+            shortfalls.append(f"cpu: load {load:.1f} + {reservation['cpus']:.1f} exceeds {capacity:.1f}")
+    if metrics["disk_free"] is not None:
+        free = metrics["disk_free"] - min_free_disk - pending["disk"]
+        if free < reservation["disk"]:
+            shortfalls.append(f"disk: {max(free, 0) / GIB:.1f} GiB free, needs {reservation['disk'] / GIB:.1f} GiB")
+    if metrics["io_pressure"] is not None and max_io_pressure > 0 and metrics["io_pressure"] >= max_io_pressure:
+        shortfalls.append(f"io: {metrics['io_pressure']:.0f}% pressure")
+    return shortfalls
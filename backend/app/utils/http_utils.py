@@ -0,0 +1,235 @@
+# backend/app/utils/http_utils.py - HTTP caching, serialisation and compression helpers
+
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # br is only offered when the Brotli package is installed
+    brotli = None
+
+
+def make_etag(*version: Any) -> str:
+    """Build a weak ETag from a resource's content version
+    
+    Weak, because CompressionMiddleware sends the same content as br, gzip or
+    identity bytes under the one tag.
+    """
+    payload = json.dumps(version, sort_keys=True, default=str, separators=(",", ":"))
+    return f'W/"{hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """Headers for an ETag that must be revalidated on every use"""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    """Build a 304 response for a matching ETag"""
+    return Response(status_code=304, headers=etag_headers(etag))
+
+
+def set_etag(response: Response, etag: str):
+    """Attach an ETag and require revalidation on every use"""
+    response.headers.update(etag_headers(etag))
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Serialise pydantic models from their fields without validating them again"""
+    if isinstance(obj, BaseModel):
+        return dict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def fast_json_response(content: Any, headers: Optional[Dict[str, str]] = None,
+                       status_code: int = 200) -> Response:
+    """Encode trusted content straight to JSON bytes with orjson
+    
+    Returning this bypasses FastAPI's response_model validation and
+    jsonable_encoder pass, which dominate the cost of multi-MB payloads.
+    """
+    return Response(
+        content=orjson.dumps(content, default=_orjson_default),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers
+    )
+
+
+class _GzipCompressor:
+    """Streaming gzip encoder"""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    """Streaming brotli encoder"""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, honouring q-values"""
+    offered: List[Tuple[float, int, str]] = []
+    preference = {"br": 2, "gzip": 1} if brotli is not None else {"gzip": 1}
+
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip()
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        if coding in preference and quality > 0:
+            offered.append((quality, preference[coding], coding))
+
+    return max(offered)[2] if offered else None
+
+
+class CompressionMiddleware:
+    """Negotiated br/gzip response compression that also handles streaming bodies
+    
+    Single-body responses below minimum_size are sent as-is, and bodies above
+    thread_threshold are compressed in a worker thread so large payloads don't
+    stall the event loop. Streaming bodies are compressed chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4, thread_threshold: int = 256 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.thread_threshold = thread_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressionResponder(self, encoding, send).run(scope, receive)
+
+
+class _CompressionResponder:
+    """Per-request state for CompressionMiddleware"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _new_compressor(self):
+        if self.encoding == "br":
+            return _BrotliCompressor(self.middleware.brotli_quality)
+        return _GzipCompressor(self.middleware.gzip_level)
+
+    async def run(self, scope: Scope, receive: Receive):
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.start_message = message
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or headers.get("content-type", "").startswith(("image/", "video/", "application/zip", "application/gzip"))
+            )
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+
+            if self.passthrough or (not more_body and len(body) < self.middleware.minimum_size):
+                self.passthrough = True
+                await self.send(start_message)
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            self.compressor = self._new_compressor()
+
+            if not more_body:
+                compressed = await self._compress_whole(body)
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self.send(start_message)
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _compress_whole(self, body: bytes) -> bytes:
+        def compress() -> bytes:
+            return self.compressor.compress(body) + self.compressor.finish()
+
+        if len(body) >= self.middleware.thread_threshold:
+            return await anyio.to_thread.run_sync(compress)
+        return compress()
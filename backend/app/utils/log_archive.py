@@ -0,0 +1,132 @@
+# backend/app/utils/log_archive.py - Seekable compressed build log archives
+#
+# Archive layout:
+#   MAGIC
+#   chunk 0 .. chunk N-1     zlib-compressed, newline-joined UTF-8 lines
+#   index                    JSON: chunk size, line count and per-chunk
+#                            [offset, length, first_line, line_count]
+#   footer                   index offset (u64), index length (u64), MAGIC
+#
+# Any line range only needs the footer, the index and the chunks it covers.
+
+import bisect
+import json
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+LOG_ARCHIVE_MAGIC = b"EELOGv1\n"
+LOG_ARCHIVE_SUFFIX = ".eelog"
+
+_FOOTER = struct.Struct(">QQ")
+_FOOTER_SIZE = _FOOTER.size + len(LOG_ARCHIVE_MAGIC)
+
+
+def write_log_archive(file_path: Path, lines: Iterable[str], chunk_lines: int = 1000,
+                      compression_level: int = 6) -> int:
+    """Write lines to a chunked archive atomically and return the line count"""
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = file_path.with_name(f".{file_path.name}.tmp")
+
+    chunks = []
+    total_lines = 0
+    batch: List[str] = []
+
+    with open(temp_path, "wb") as f:
+        f.write(LOG_ARCHIVE_MAGIC)
+
+        def flush_batch():
+            data = zlib.compress("\n".join(batch).encode("utf-8", "replace"), compression_level)
+            chunks.append([f.tell(), len(data), total_lines - len(batch), len(batch)])
+            f.write(data)
+            batch.clear()
+
+        for line in lines:
+            batch.append(line.replace("\n", " "))
+            total_lines += 1
+            if len(batch) >= chunk_lines:
+                flush_batch()
+        if batch:
+            flush_batch()
+
+        index = json.dumps({
+            "chunk_lines": chunk_lines,
+            "total_lines": total_lines,
+            "chunks": chunks
+        }).encode("utf-8")
+        index_offset = f.tell()
+        f.write(index)
+        f.write(_FOOTER.pack(index_offset, len(index)))
+        f.write(LOG_ARCHIVE_MAGIC)
+
+    os.replace(temp_path, file_path)
+    return total_lines
+
+
+class LogArchive:
+    """Random-access reader for a chunked log archive"""
+
+    def __init__(self, file_path: Path):
+        self.file_path = Path(file_path)
+
+        with open(self.file_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < len(LOG_ARCHIVE_MAGIC) + _FOOTER_SIZE:
+                raise ValueError(f"Truncated log archive: {self.file_path}")
+            f.seek(-_FOOTER_SIZE, os.SEEK_END)
+            footer = f.read(_FOOTER_SIZE)
+            if footer[_FOOTER.size:] != LOG_ARCHIVE_MAGIC:
+                raise ValueError(f"Not a log archive: {self.file_path}")
+            index_offset, index_length = _FOOTER.unpack(footer[:_FOOTER.size])
+            f.seek(index_offset)
+            index = json.loads(f.read(index_length))
+
+        self.total_lines: int = index["total_lines"]
+        self.chunks: List[list] = index["chunks"]
+        self._first_lines = [chunk[2] for chunk in self.chunks]
+
+    def iter_chunks(self, start: int = 0, end: Optional[int] = None) -> Iterator[List[str]]:
+        """Yield lines[start:end] one chunk at a time, decompressing only the chunks that overlap"""
+        start = max(0, start)
+        end = self.total_lines if end is None else min(end, self.total_lines)
+        if start >= end:
+            return
+
+        first_chunk = bisect.bisect_right(self._first_lines, start) - 1
+
+        with open(self.file_path, "rb") as f:
+            for offset, length, first_line, line_count in self.chunks[first_chunk:]:
+                if first_line >= end:
+                    break
+                f.seek(offset)
+                chunk_lines = zlib.decompress(f.read(length)).decode("utf-8").split("\n")
+                yield chunk_lines[max(0, start - first_line):end - first_line]
+
+    def read_lines(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        """Return lines[start:end]"""
+        result: List[str] = []
+        for chunk_lines in self.iter_chunks(start, end):
+            result.extend(chunk_lines)
+        return result
+
+    def tail(self, count: int) -> List[str]:
+        """Return the last count lines"""
+        return self.read_lines(self.total_lines - count, self.total_lines)
+
+
+def open_log_archive(file_path: Path) -> Optional[LogArchive]:
+    """Open a log archive, returning None if it does not exist or is unreadable"""
+    try:
+        return LogArchive(file_path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"⚠️ Could not open log archive {file_path}: {e}")
+        return None
@@ -0,0 +1,125 @@
+# backend/app/utils/registry_utils.py - Registry-to-registry image copy helpers (skopeo)
+
+import base64
+import json
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+# "Copying blob sha256:ab12... done", "... skipped: already exists", or a bare
+# "Copying blob ab12..." when a copy starts
+_SKOPEO_BLOB = re.compile(r"Copying (blob|config) (?:sha256:)?([0-9a-f]{6,})\S*\s*(done|skipped: already exists)?")
+# docker push: "ab12cd34ef56: Layer already exists", "ab12cd34ef56: Pushed"
+_DOCKER_LAYER = re.compile(r"^([0-9a-f]{12,}): (Layer already exists|Pushed|Pushing|Preparing|Waiting)")
+
+__all__ = [
+    "registry_reference", "skopeo_copy_command", "skopeo_inspect_command",
+    "parse_skopeo_progress", "parse_push_progress", "runtime_push_commands", "manifest_blobs",
+    "write_registry_authfile"
+]
+
+
+def registry_reference(registry: str, image: str, namespace: Optional[str] = None) -> str:
+    """docker:// transport reference for an image in a registry"""
+    parts = [registry.strip().rstrip("/")]
+    if namespace:
+        parts.append(namespace.strip("/"))
+    parts.append(image.strip().lstrip("/"))
+    return "docker://" + "/".join(parts)
+
+
+def _auth_args(authfile: Optional[str]) -> List[str]:
+    return ["--authfile", authfile] if authfile else []
+
+
+def skopeo_copy_command(skopeo: str, source: str, destination: str, src_tls_verify: bool = True,
+                        dest_tls_verify: bool = True, authfile: Optional[str] = None,
+                        all_architectures: bool = False, retry_times: int = 0) -> List[str]:
+    """skopeo copy streaming blobs directly between registries, with no local image storage"""
+    command = [skopeo, "copy", *_auth_args(authfile),
+               f"--src-tls-verify={str(src_tls_verify).lower()}",
+               f"--dest-tls-verify={str(dest_tls_verify).lower()}"]
+    if retry_times:
+        command += ["--retry-times", str(retry_times)]
+    if all_architectures:
+        command.append("--all")
+    return command + [source, destination]
+
+
+def skopeo_inspect_command(skopeo: str, reference: str, tls_verify: bool = True,
+                           authfile: Optional[str] = None) -> List[str]:
+    """skopeo inspect printing the raw manifest of a remote image"""
+    return [skopeo, "inspect", "--raw", *_auth_args(authfile),
+            f"--tls-verify={str(tls_verify).lower()}", reference]
+
+
+def manifest_blobs(raw_manifest: str) -> Optional[Dict[str, int]]:
+    """Blob digest (hex, without algorithm) -> size for an image manifest; None for manifest lists"""
+    try:
+        manifest = json.loads(raw_manifest)
+    except ValueError:
+        return None
+    if not isinstance(manifest, dict) or "layers" not in manifest:
+        return None
+
+    blobs = {}
+    for descriptor in [manifest.get("config")] + list(manifest.get("layers") or []):
+        if isinstance(descriptor, dict) and isinstance(descriptor.get("digest"), str):
+            blobs[descriptor["digest"].split(":", 1)[-1]] = int(descriptor.get("size") or 0)
+    return blobs
+
+
+def parse_skopeo_progress(line: str) -> Optional[Tuple[str, str, str]]:
+    """(kind, digest prefix, state) for a skopeo copy progress line
+
+    kind is 'blob' or 'config'; state is 'copying', 'copied' or 'skipped'.
+    """
+    match = _SKOPEO_BLOB.search(line)
+    if not match:
+        return None
+    kind, digest, outcome = match.groups()
+    if outcome is None:
+        state = "copying"
+    elif outcome == "done":
+        state = "copied"
+    else:
+        state = "skipped"
+    return kind, digest, state
+
+
+def parse_push_progress(line: str) -> Optional[Tuple[str, str, str]]:
+    """Like parse_skopeo_progress, also understanding docker push output"""
+    progress = parse_skopeo_progress(line)
+    if progress is not None:
+        return progress
+    match = _DOCKER_LAYER.match(line)
+    if not match:
+        return None
+    layer, outcome = match.groups()
+    state = {"Layer already exists": "skipped", "Pushed": "copied"}.get(outcome, "copying")
+    return "blob", layer, state
+
+
+def runtime_push_commands(runtime: str, local_image: str, destination: str,
+                          tls_verify: bool = True) -> List[List[str]]:
+    """Commands that push a locally built image to a registry reference (without docker://)
+
+    podman pushes straight from local storage to the destination name; docker
+    needs the image tagged with it first and takes TLS settings from the daemon.
+    """
+    if os.path.basename(runtime).startswith("docker"):
+        return [[runtime, "tag", local_image, destination], [runtime, "push", destination]]
+    return [[runtime, "push", f"--tls-verify={str(tls_verify).lower()}", local_image, f"docker://{destination}"]]
+
+
+def write_registry_authfile(credentials: Dict[str, Tuple[str, str]]) -> str:
+    """Write a containers-auth.json with the given registry logins, readable only by this user"""
+    auths = {
+        registry: {"auth": base64.b64encode(f"{username}:{password}".encode("utf-8")).decode("ascii")}
+        for registry, (username, password) in credentials.items()
+    }
+    fd, path = tempfile.mkstemp(prefix="promotion-auth-", suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump({"auths": auths}, f)
+    return path
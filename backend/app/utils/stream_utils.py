@@ -0,0 +1,133 @@
+# backend/app/utils/stream_utils.py - Subprocess output streaming utilities
+
+import asyncio
+from typing import AsyncIterator, Callable, List, Optional, Set
+
+TRUNCATED_MARKER = " … [line truncated]"
+
+
+async def read_line_batches(
+    stream: asyncio.StreamReader,
+    chunk_size: int = 256 * 1024,
+    max_line_bytes: int = 64 * 1024,
+    idle_timeout: Optional[float] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> AsyncIterator[List[str]]:
+    """Read a subprocess stream in large blocks and yield its lines in batches
+
+    Lines are decoded once per batch with invalid UTF-8 replaced, stripped, and
+    empty lines dropped. Carriage-return progress updates collapse to their
+    final state, as a terminal would show them. Lines longer than
+    max_line_bytes are truncated instead of failing like StreamReader.readline.
+
+    With idle_timeout, should_stop() is checked whenever nothing arrives for
+    that long, so a pipe held open by a grandchild can't block forever.
+    """
+    pending = bytearray()
+    discarding = False  # inside an overlong line, dropping bytes until its newline
+
+    while True:
+        try:
+            if idle_timeout is None:
+                chunk = await stream.read(chunk_size)
+            else:
+                chunk = await asyncio.wait_for(stream.read(chunk_size), timeout=idle_timeout)
+        except asyncio.TimeoutError:
+            if should_stop and should_stop():
+                break
+            continue
+
+        if not chunk:
+            break
+
+        raw_lines = chunk.split(b"\n")
+        tail = raw_lines.pop()
+        complete: List[bytes] = []
+
+        for i, piece in enumerate(raw_lines):
+            if i == 0:
+                if discarding:
+                    discarding = False
+                    continue
+                if pending:
+                    pending += piece
+                    piece = bytes(pending)
+                    pending.clear()
+            complete.append(_finish_line(piece, max_line_bytes))
+
+        if raw_lines:
+            discarding = False
+        if not discarding:
+            pending += tail
+            # Only the latest carriage-return update of a partial line matters
+            # (a trailing \r may be the first half of a split \r\n)
+            last_cr = pending.rfind(b"\r", 0, len(pending) - 1)
+            if last_cr >= 0:
+                del pending[:last_cr + 1]
+            if len(pending) > max_line_bytes:
+                complete.append(_finish_line(bytes(pending), max_line_bytes))
+                pending.clear()
+                discarding = True
+
+        if complete:
+            lines = _decode_lines(complete)
+            if lines:
+                yield lines
+
+    if pending and not discarding:
+        lines = _decode_lines([_finish_line(bytes(pending), max_line_bytes)])
+        if lines:
+            yield lines
+
+
+async def run_streaming(
+    command: List[str],
+    on_lines: Callable[[List[str]], None],
+    timeout: Optional[float] = None,
+    processes: Optional[Set[asyncio.subprocess.Process]] = None,
+    chunk_size: int = 256 * 1024,
+    max_line_bytes: int = 64 * 1024
+) -> int:
+    """Run a command, passing batches of its combined stdout/stderr lines to on_lines
+
+    Returns the exit code. The process is killed if it outlives timeout (raising
+    asyncio.TimeoutError) or the caller is cancelled. While it runs it is kept
+    in processes, so a shutdown hook can kill whatever is still running.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+    )
+    if processes is not None:
+        processes.add(process)
+
+    async def consume() -> int:
+        async for lines in read_line_batches(process.stdout, chunk_size, max_line_bytes):
+            on_lines(lines)
+        return await process.wait()
+
+    try:
+        return await asyncio.wait_for(consume(), timeout=timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    finally:
+        if processes is not None:
+            processes.discard(process)
+
+
+def _finish_line(raw: bytes, max_line_bytes: int) -> bytes:
+    """Collapse carriage-return updates and cap the line length"""
+    raw = raw.rstrip(b"\r")
+    if b"\r" in raw:
+        raw = raw.rsplit(b"\r", 1)[1]
+    if len(raw) > max_line_bytes:
+        raw = raw[:max_line_bytes] + TRUNCATED_MARKER.encode("utf-8")
+    return raw
+
+
+def _decode_lines(raw_lines: List[bytes]) -> List[str]:
+    """Decode a batch of lines in one pass, dropping blank ones"""
+    text = b"\n".join(raw_lines).decode("utf-8", errors="replace")
+    return [line for line in (part.strip() for part in text.split("\n")) if line]
@@ -0,0 +1 @@
+# backend/benchmarks - Benchmarks and load tests (no podman or network required)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# backend/benchmarks/fake_ansible_playbook.py - Stand-in for ansible-playbook
+#
+# Accepts the same arguments the build service passes
+# (<playbook> -e @<vars-file> -v ...) and prints synthetic ansible-builder
+# output for each selected environment. Behaviour is controlled with
+# environment variables so it can be swapped in via ANSIBLE_PLAYBOOK_BIN:
+#
+#   FAKE_PLAYBOOK_LINES      lines per environment (default 1000)
+#   FAKE_PLAYBOOK_RATE       lines per second, 0 = as fast as possible (default 0)
+#   FAKE_PLAYBOOK_LINE_SIZE  approximate bytes per line (default 120)
+#   FAKE_PLAYBOOK_LONG_LINE  emit one line of this many bytes per environment (default 0)
+#   FAKE_PLAYBOOK_EXIT_CODE  exit status (default 0)
+#   FAKE_PLAYBOOK_FAIL_ENVS  comma-separated environments reported as failed
+
+import os
+import random
+import sys
+import time
+
+import yaml
+
+TEMPLATES = [
+    "STEP {step}/24: RUN $PYCMD -m pip install --no-cache-dir -r /tmp/src/requirements.txt",
+    "Collecting {pkg}>={major}.{minor}.0 (from -r /tmp/src/requirements.txt (line {step}))",
+    "  Downloading {pkg}-{major}.{minor}.{patch}-py3-none-any.whl ({size} kB)",
+    "Installing collected packages: {pkg}",
+    "Starting galaxy collection install process",
+    "Downloading https://galaxy.ansible.com/api/v3/collections/{pkg}/versions/{major}.{minor}.{patch}/",
+    "Installing '{pkg}:{major}.{minor}.{patch}' to '/usr/share/ansible/collections/ansible_collections'",
+    "--> {hash}",
+    "COMMIT {env}:latest",
+]
+PACKAGES = ["requests", "jmespath", "pyvmomi", "netaddr", "cryptography", "community.general",
+            "ansible.utils", "kubernetes.core", "amazon.aws", "lxml", "dnspython"]
+
+
+def read_selected_environments(argv):
+    """Find selected_environments in the -e @vars-file argument"""
+    for i, arg in enumerate(argv):
+        if arg == "-e" and i + 1 < len(argv) and argv[i + 1].startswith("@"):
+            with open(argv[i + 1][1:]) as f:
+                return (yaml.safe_load(f) or {}).get("selected_environments") or []
+    return ["synthetic-env"]
+
+
+def pad(line, size):
+    return line + " " + "." * (size - len(line) - 1) if len(line) + 1 < size else line
+
+
+def main():
+    lines_per_env = int(os.environ.get("FAKE_PLAYBOOK_LINES", "1000"))
+    rate = float(os.environ.get("FAKE_PLAYBOOK_RATE", "0"))
+    line_size = int(os.environ.get("FAKE_PLAYBOOK_LINE_SIZE", "120"))
+    long_line = int(os.environ.get("FAKE_PLAYBOOK_LONG_LINE", "0"))
+    exit_code = int(os.environ.get("FAKE_PLAYBOOK_EXIT_CODE", "0"))
+    fail_envs = set(filter(None, os.environ.get("FAKE_PLAYBOOK_FAIL_ENVS", "").split(",")))
+
+    environments = read_selected_environments(sys.argv[1:])
+    rng = random.Random(42)
+    out = sys.stdout
+    interval = 1.0 / rate if rate > 0 else 0.0
+    next_emit = time.monotonic()
+
+    out.write("PLAY [Build Execution Environments] ********************************************\n")
+    out.write("TASK [Build execution environments] ********************************************\n")
+
+    for env in environments:
+        out.write(f"Running command: ansible-builder build --file {env}/execution-environment.yml --tag {env}:latest\n")
+        for step in range(lines_per_env):
+            template = TEMPLATES[step % len(TEMPLATES)]
+            line = template.format(
+                step=step % 24 + 1, pkg=rng.choice(PACKAGES), env=env,
+                major=rng.randint(1, 9), minor=rng.randint(0, 20), patch=rng.randint(0, 9),
+                size=rng.randint(10, 9000), hash=f"{rng.getrandbits(48):012x}"
+            )
+            out.write(pad(line, line_size) + "\n")
+
+            if interval:
+                out.flush()
+                next_emit += interval
+                delay = next_emit - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+        if long_line:
+            out.write("Progress: " + "#" * long_line + "\n")
+
+        if env in fail_envs:
+            out.write(f"failed: [localhost] (item={env}) => {{\"rc\": 1}}\n")
+            out.write(f"❌ Failed to build {env}\n")
+        else:
+            out.write(f"changed: [localhost] => (item={env})\n")
+            out.write(f"✅ Successfully built {env}\n")
+        out.flush()
+
+    out.write("PLAY RECAP *********************************************************************\n")
+    out.write(f"localhost                  : ok=1    changed=1    failed={1 if exit_code else 0}\n")
+    out.flush()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# backend/benchmarks/fake_container_runtime.py - Stand-in for podman/docker
+#
+# Answers the probes the backend makes (--version, login --get-login, images)
+# without touching any container storage or network.
+
+import sys
+
+
+def main(argv):
+    if not argv or argv[0] == "--version":
+        print("podman version 0.0.0-fake")
+        return 0
+
+    command = argv[0]
+    if command == "login" and "--get-login" in argv:
+        # Not logged in
+        return 1
+    if command == "images":
+        return 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# backend/benchmarks/generate_environments.py - Synthetic ENVIRONMENTS_DIR generator
+#
+#   python -m benchmarks.generate_environments /tmp/envs --count 1000
+
+import argparse
+import random
+from pathlib import Path
+
+import yaml
+
+BASE_IMAGES = [
+    "registry.redhat.io/ansible-automation-platform-25/ee-minimal-rhel9:latest",
+    "registry.redhat.io/ansible-automation-platform-25/ee-supported-rhel9:latest",
+    "registry.redhat.io/ansible-automation-platform-25/de-supported-rhel9:latest",
+    "registry.redhat.io/ansible-automation-platform-25/ee-minimal-rhel8:latest",
+]
+PYTHON_PACKAGES = ["requests>=2.4.2", "jmespath", "pyvmomi>=6.7.1", "netaddr", "cryptography>=3.1",
+                   "lxml", "dnspython>=2.0.0", "kubernetes", "boto3", "pywinrm", "six", "jinja2"]
+COLLECTIONS = ["ansible.utils", "ansible.posix", "community.general", "community.vmware",
+               "kubernetes.core", "amazon.aws", "ansible.windows", "community.crypto"]
+SYSTEM_PACKAGES = ["gcc", "make", "python3-devel", "krb5-devel", "openssl-devel", "libffi-devel", "git"]
+
+
+def generate_environment(env_dir: Path, rng: random.Random):
+    """Write one 4-file environment definition"""
+    env_dir.mkdir(parents=True, exist_ok=True)
+
+    definition = {
+        "version": 3,
+        "images": {"base_image": {"name": rng.choice(BASE_IMAGES)}},
+        "dependencies": {
+            "python": "requirements.txt",
+            "system": "bindep.txt",
+            "galaxy": "requirements.yml"
+        },
+        "options": {"package_manager_path": "/usr/bin/microdnf"}
+    }
+    with open(env_dir / "execution-environment.yml", "w") as f:
+        yaml.dump(definition, f, default_flow_style=False, sort_keys=False)
+
+    (env_dir / "requirements.txt").write_text(
+        "\n".join(rng.sample(PYTHON_PACKAGES, rng.randint(2, len(PYTHON_PACKAGES)))) + "\n"
+    )
+    (env_dir / "bindep.txt").write_text(
+        "\n".join(f"{pkg} [platform:rpm]" for pkg in rng.sample(SYSTEM_PACKAGES, rng.randint(1, 5))) + "\n"
+    )
+    collections = [{"name": name, "version": f">={rng.randint(1, 5)}.0.0"}
+                   for name in rng.sample(COLLECTIONS, rng.randint(1, 5))]
+    with open(env_dir / "requirements.yml", "w") as f:
+        yaml.dump({"collections": collections}, f, default_flow_style=False, sort_keys=False)
+
+
+def generate_environments(target_dir: Path, count: int, seed: int = 42) -> Path:
+    """Populate target_dir with count synthetic environments named synthetic-00000..."""
+    target_dir = Path(target_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    for i in range(count):
+        generate_environment(target_dir / f"synthetic-{i:05d}", rng)
+    return target_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic ENVIRONMENTS_DIR")
+    parser.add_argument("target_dir", type=Path)
+    parser.add_argument("--count", type=int, default=100, help="Number of environments (default: 100)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generate_environments(args.target_dir, args.count, args.seed)
+    print(f"Generated {args.count} environments in {args.target_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# backend/benchmarks/loadtest.py - End-to-end load test for the API
+#
+# Starts the API (benchmarks/loadtest_server.py) against the fake playbook and
+# container runtime, then drives it with:
+#   - N concurrent builds
+#   - M polling clients hitting /api/builds/{id}/status like the UI does
+#   - K streaming clients reading /api/builds/{id}/logs?format=text
+#   - the dashboard at a fixed request rate
+# and reports p50/p95/p99 latency per endpoint, event-loop lag and API RSS
+# over time:
+#
+#   cd backend && python -m benchmarks.loadtest --builds 10 --pollers 50 --duration 60
+#
+# Requires httpx (see benchmarks/requirements.txt).
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.generate_environments import generate_environments
+from benchmarks.run_benchmarks import FAKE_PLAYBOOK, FAKE_RUNTIME, RESULTS_DIR
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+ENDPOINT_PATTERNS = [
+    (re.compile(r"^/api/builds/[^/]+/status$"), "GET /api/builds/{id}/status"),
+    (re.compile(r"^/api/builds/[^/]+/logs$"), "GET /api/builds/{id}/logs"),
+]
+
+
+def endpoint_name(method: str, path: str) -> str:
+    for pattern, name in ENDPOINT_PATTERNS:
+        if pattern.match(path):
+            return name
+    return f"{method} {path}"
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * fraction))]
+
+
+class Recorder:
+    """Collects per-endpoint latencies and status codes"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        name = endpoint_name(method, path)
+        started = time.perf_counter()
+        try:
+            if kwargs.pop("stream", False):
+                async with client.stream(method, path, **kwargs) as response:
+                    async for _ in response.aiter_bytes():
+                        pass
+            else:
+                response = await client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append((time.perf_counter() - started) * 1000)
+        self.statuses[name][response.status_code] += 1
+        return response
+
+    def report(self) -> Dict[str, dict]:
+        report = {}
+        for name, samples in sorted(self.latencies.items()):
+            samples.sort()
+            report[name] = {
+                "requests": len(samples),
+                "errors": self.errors.get(name, 0),
+                "statuses": dict(self.statuses[name]),
+                "p50_ms": round(percentile(samples, 0.50), 2),
+                "p95_ms": round(percentile(samples, 0.95), 2),
+                "p99_ms": round(percentile(samples, 0.99), 2),
+                "max_ms": round(samples[-1], 2),
+            }
+        return report
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(work_dir: Path, environments_dir: Path, port: int, args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "ENVIRONMENTS_DIR": str(environments_dir),
+        "PLAYBOOK_PATH": str(work_dir / "playbook.yml"),
+        "ANSIBLE_PLAYBOOK_BIN": str(FAKE_PLAYBOOK),
+        "CONTAINER_RUNTIME": str(FAKE_RUNTIME),
+        "BUILD_DB_PATH": str(work_dir / "builds.db"),
+        "LOG_ARCHIVE_DIR": str(work_dir / "build-logs"),
+        "MAX_CONCURRENT_BUILDS": str(max(args.builds, 1)),
+        "PREFLIGHT_ENABLED": "false",
+        "FAKE_PLAYBOOK_LINES": str(args.playbook_lines),
+        "FAKE_PLAYBOOK_RATE": str(args.playbook_rate),
+        "FAKE_PLAYBOOK_LINE_SIZE": str(args.playbook_line_size),
+    })
+    return subprocess.Popen(
+        [sys.executable, str(BENCHMARKS_DIR / "loadtest_server.py"), "--port", str(port)],
+        cwd=str(BENCHMARKS_DIR.parent),
+        env=env
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API did not become ready")
+
+
+async def run_load(client: httpx.AsyncClient, args, environment_names: List[str]) -> dict:
+    recorder = Recorder()
+    build_ids: List[str] = []
+    timeline: List[dict] = []
+    stop = asyncio.Event()
+    rng = random.Random(7)
+
+    async def start_builds():
+        async def start_one(i: int):
+            envs = rng.sample(environment_names, min(args.environments_per_build, len(environment_names)))
+            response = await recorder.request(client, "POST", "/api/builds/start", json={"environments": envs})
+            if response is not None and response.status_code == 200:
+                build_ids.append(response.json()["build_id"])
+
+        await asyncio.gather(*(start_one(i) for i in range(args.builds)))
+
+    async def poller():
+        etag_by_build: Dict[str, str] = {}
+        await asyncio.sleep(rng.random() * args.poll_interval)
+        while not stop.is_set():
+            if build_ids:
+                build_id = rng.choice(build_ids)
+                headers = {"Accept-Encoding": "gzip"}
+                if args.etag and build_id in etag_by_build:
+                    headers["If-None-Match"] = etag_by_build[build_id]
+                response = await recorder.request(client, "GET", f"/api/builds/{build_id}/status", headers=headers)
+                if response is not None and "etag" in response.headers:
+                    etag_by_build[build_id] = response.headers["etag"]
+            await asyncio.sleep(args.poll_interval)
+
+    async def streamer():
+        await asyncio.sleep(rng.random() * args.poll_interval)
+        while not stop.is_set():
+            if build_ids:
+                build_id = rng.choice(build_ids)
+                await recorder.request(client, "GET", f"/api/builds/{build_id}/logs",
+                                       params={"format": "text", "tail": args.stream_tail},
+                                       headers={"Accept-Encoding": "gzip"}, stream=True)
+            await asyncio.sleep(args.poll_interval)
+
+    async def dashboard():
+        interval = 1.0 / args.dashboard_rate
+        next_tick = time.monotonic()
+        while not stop.is_set():
+            asyncio.create_task(recorder.request(client, "GET", "/api/dashboard/stats"))
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+
+    async def sampler():
+        started = time.monotonic()
+        while not stop.is_set():
+            try:
+                metrics = (await client.get("/__loadtest/metrics")).json()
+                metrics["elapsed_s"] = round(time.monotonic() - started, 1)
+                timeline.append(metrics)
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(args.sample_interval)
+
+    tasks = [asyncio.create_task(sampler()), asyncio.create_task(start_builds())]
+    tasks += [asyncio.create_task(poller()) for _ in range(args.pollers)]
+    tasks += [asyncio.create_task(streamer()) for _ in range(args.streamers)]
+    if args.dashboard_rate > 0:
+        tasks.append(asyncio.create_task(dashboard()))
+
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    lag_p99 = [point["loop_lag"].get("p99_ms", 0) for point in timeline]
+    rss = [point["rss_mb"] for point in timeline]
+    return {
+        "endpoints": recorder.report(),
+        "builds_started": len(build_ids),
+        "event_loop_lag": {
+            "worst_p99_ms": max(lag_p99, default=0),
+            "worst_max_ms": max((point["loop_lag"].get("max_ms", 0) for point in timeline), default=0),
+        },
+        "rss_mb": {"start": rss[0] if rss else None, "peak": max(rss, default=None), "end": rss[-1] if rss else None},
+        "timeline": [
+            {"elapsed_s": point["elapsed_s"], "rss_mb": point["rss_mb"], "loop_lag": point["loop_lag"]}
+            for point in timeline
+        ],
+    }
+
+
+def print_report(result: dict):
+    print(f"\n{'endpoint':<36} {'requests':>8} {'errors':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stats in result["endpoints"].items():
+        print(f"{name:<36} {stats['requests']:>8} {stats['errors']:>6} "
+              f"{stats['p50_ms']:>7}ms {stats['p95_ms']:>7}ms {stats['p99_ms']:>7}ms")
+    lag = result["event_loop_lag"]
+    rss = result["rss_mb"]
+    print(f"\nbuilds started: {result['builds_started']}")
+    print(f"event-loop lag: worst p99 {lag['worst_p99_ms']}ms, worst max {lag['worst_max_ms']}ms")
+    print(f"API RSS: start {rss['start']} MB, peak {rss['peak']} MB, end {rss['end']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API with fake builds and polling clients")
+    parser.add_argument("--builds", type=int, default=5, help="Concurrent builds to start (default: 5)")
+    parser.add_argument("--pollers", type=int, default=20, help="Clients polling build status (default: 20)")
+    parser.add_argument("--streamers", type=int, default=5, help="Clients streaming build logs (default: 5)")
+    parser.add_argument("--dashboard-rate", type=float, default=2.0, help="Dashboard requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load (default: 30)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls per client")
+    parser.add_argument("--stream-tail", type=int, default=500, help="Lines per streamed log request")
+    parser.add_argument("--etag", action="store_true", help="Pollers send If-None-Match")
+    parser.add_argument("--environments", type=int, default=50, help="Synthetic environments to generate")
+    parser.add_argument("--environments-per-build", type=int, default=2)
+    parser.add_argument("--playbook-lines", type=int, default=20000, help="Fake playbook lines per environment")
+    parser.add_argument("--playbook-rate", type=float, default=500, help="Fake playbook lines per second")
+    parser.add_argument("--playbook-line-size", type=int, default=120)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between RSS/lag samples")
+    parser.add_argument("--output", type=Path, default=None, help="Report path (default: results/loadtest-*.json)")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="ee-loadtest-"))
+    environments_dir = generate_environments(work_dir / "environments", args.environments)
+    environment_names = sorted(p.name for p in environments_dir.iterdir())
+    port = free_port()
+    server = start_server(work_dir, environments_dir, port, args)
+
+    async def run() -> dict:
+        limits = httpx.Limits(max_connections=args.pollers + args.streamers + args.builds + 20)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            await wait_until_ready(client)
+            return await run_load(client, args, environment_names)
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    result["config"] = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    result["timestamp"] = datetime.now().isoformat(timespec="seconds")
+    print_report(result)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    output = args.output or RESULTS_DIR / f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\n📄 Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# backend/benchmarks/loadtest_server.py - API server instrumented for load tests
+#
+# Serves the real FastAPI app with uvicorn and adds GET /__loadtest/metrics,
+# which reports event-loop lag and RSS. Started by loadtest.py with the
+# environment already pointing at the fake playbook and container runtime.
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+LAG_INTERVAL = 0.05
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires - time the loop was busy elsewhere"""
+
+    def __init__(self, interval: float = LAG_INTERVAL):
+        self.interval = interval
+        self.samples: List[float] = []
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, (loop.time() - expected) * 1000))
+
+    def drain(self) -> dict:
+        samples, self.samples = sorted(self.samples), []
+        if not samples:
+            return {"samples": 0}
+        return {
+            "samples": len(samples),
+            "p50_ms": round(samples[len(samples) // 2], 2),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 2),
+            "max_ms": round(samples[-1], 2),
+        }
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    # Peak RSS is the best we can do without /proc (KiB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def create_app():
+    from app.main import app
+
+    monitor = LoopLagMonitor()
+    app_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan_with_monitor(app_instance):
+        task = asyncio.create_task(monitor.run())
+        try:
+            async with app_lifespan(app_instance) as state:
+                yield state
+        finally:
+            task.cancel()
+
+    app.router.lifespan_context = lifespan_with_monitor
+
+    @app.get("/__loadtest/metrics", include_in_schema=False)
+    async def loadtest_metrics():
+        return {"time": time.time(), "rss_mb": rss_mb(), "loop_lag": monitor.drain(), "pid": os.getpid()}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with load-test instrumentation")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# backend/benchmarks/run_benchmarks.py - Backend micro-benchmarks
+#
+# Runs entirely against local stand-ins (fake ansible-playbook, fake container
+# runtime, synthetic environments), so no podman or network is needed:
+#
+#   cd backend && python -m benchmarks.run_benchmarks [--quick] [--save-baseline]
+#
+# Every run is appended to benchmarks/results/history.jsonl and compared with
+# benchmarks/results/baseline.json (or the previous run when there is no
+# baseline); metrics that got worse by more than --threshold are reported.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+FAKE_PLAYBOOK = BENCHMARKS_DIR / "fake_ansible_playbook.py"
+FAKE_RUNTIME = BENCHMARKS_DIR / "fake_container_runtime.py"
+
+
+def configure_environment(work_dir: Path, environments_dir: Path):
+    """Point the backend at the stand-ins before any app module is imported"""
+    os.environ.update({
+        "ENVIRONMENTS_DIR": str(environments_dir),
+        "PLAYBOOK_PATH": str(work_dir / "playbook.yml"),
+        "ANSIBLE_PLAYBOOK_BIN": str(FAKE_PLAYBOOK),
+        "CONTAINER_RUNTIME": str(FAKE_RUNTIME),
+        "BUILD_DB_PATH": str(work_dir / "builds.db"),
+        "LOG_ARCHIVE_DIR": str(work_dir / "build-logs"),
+        "MAX_CONCURRENT_BUILDS": "1000",
+        "PREFLIGHT_ENABLED": "false",
+    })
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    samples = sorted(samples_ms)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+async def measure_async(fn, repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def bench_capture_throughput(line_counts: List[int], line_size: int) -> Dict[str, dict]:
+    """Lines/s that _capture_build_output ingests from a playbook printing as fast as it can"""
+    from app.core.config import settings
+    from app.models.build_models import BuildRequest
+    from app.services.build_service import BuildService
+    from benchmarks.generate_environments import generate_environment
+
+    env_name = "capture-benchmark"
+    generate_environment(Path(settings.ENVIRONMENTS_DIR) / env_name, random.Random(1))
+
+    results = {}
+    for line_count in line_counts:
+        os.environ["FAKE_PLAYBOOK_LINES"] = str(line_count)
+        os.environ["FAKE_PLAYBOOK_LINE_SIZE"] = str(line_size)
+        os.environ["FAKE_PLAYBOOK_RATE"] = "0"
+
+        async def run():
+            service = BuildService()
+            started = time.perf_counter()
+            response = await service.start_build(BuildRequest(environments=[env_name]))
+            while response.build_id in service.running_builds:
+                await asyncio.sleep(0.005)
+            elapsed = time.perf_counter() - started
+            build_info = service.completed_builds[response.build_id]
+            return elapsed, build_info.get("log_count") or len(build_info.get("logs") or [])
+
+        elapsed, captured = asyncio.run(run())
+        results[f"capture.{line_count}_lines"] = {
+            "lines_per_second": round(captured / elapsed),
+            "mb_per_second": round(captured * line_size / elapsed / 1e6, 2),
+            "elapsed_ms": round(elapsed * 1000, 1),
+        }
+    return results
+
+
+def bench_build_status(log_sizes: List[int], repeat: int) -> Dict[str, dict]:
+    """get_build_status plus response encoding for a running build as its log grows"""
+    from app.services.build_service import BuildService
+    from app.utils.http_utils import fast_json_response
+
+    results = {}
+    for size in log_sizes:
+        service = BuildService()
+        build_id = f"bench-status-{size}"
+        service.running_builds[build_id] = {
+            "process": SimpleNamespace(returncode=None),
+            "environments": ["synthetic-00000"],
+            "status": "running",
+            "start_time": datetime.now(),
+            "end_time": None,
+            "return_code": None,
+            "logs": [f"STEP {i % 24}/24: Collecting package-{i} from -r requirements.txt (line {i})"
+                     for i in range(size)],
+            "successful_builds": [],
+            "failed_builds": [],
+        }
+
+        async def status_response():
+            return fast_json_response(await service.get_build_status(build_id))
+
+        results[f"build_status.{size}_lines"] = asyncio.run(measure_async(status_response, repeat))
+    return results
+
+
+def bench_environment_reads(environment_counts: List[int], work_dir: Path, repeat: int) -> Dict[str, dict]:
+    """get_environments and get_dashboard_stats latency against the number of definitions"""
+    from app.core.config import settings
+    from app.services.environment_service import environment_service
+    from app.services.dashboard_service import dashboard_service
+    from benchmarks.generate_environments import generate_environments
+
+    original_dir = settings.ENVIRONMENTS_DIR
+    results = {}
+    try:
+        for count in environment_counts:
+            env_dir = generate_environments(work_dir / f"environments-{count}", count)
+            settings.ENVIRONMENTS_DIR = str(env_dir)
+            environment_service._parse_cache.clear()
+
+            cold = measure(dashboard_service.get_dashboard_stats, 1)["median_ms"]
+            results[f"dashboard_stats.{count}_envs"] = {
+                "cold_ms": cold,
+                **measure(dashboard_service.get_dashboard_stats, repeat),
+            }
+            results[f"environments.{count}_envs"] = measure(environment_service.get_environments, repeat)
+            shutil.rmtree(env_dir, ignore_errors=True)
+    finally:
+        settings.ENVIRONMENTS_DIR = original_dir
+    return results
+
+
+LOWER_IS_BETTER = ("_ms",)
+HIGHER_IS_BETTER = ("_per_second",)
+
+
+def compare(current: Dict[str, dict], reference: Dict[str, dict], threshold: float) -> List[str]:
+    """List metrics that regressed by more than threshold (a fraction) against the reference"""
+    regressions = []
+    for name, metrics in current.items():
+        for metric, value in metrics.items():
+            previous = reference.get(name, {}).get(metric)
+            if not previous or metric.startswith("min"):
+                continue
+            if metric.endswith(LOWER_IS_BETTER) and value > previous * (1 + threshold):
+                regressions.append(f"{name}.{metric}: {previous} -> {value} (+{(value / previous - 1):.0%})")
+            elif metric.endswith(HIGHER_IS_BETTER) and value < previous * (1 - threshold):
+                regressions.append(f"{name}.{metric}: {previous} -> {value} (-{(1 - value / previous):.0%})")
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=BENCHMARKS_DIR).stdout.strip()
+    except Exception:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run backend micro-benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast smoke run")
+    parser.add_argument("--repeat", type=int, default=None, help="Samples per latency measurement")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative change reported as a regression (default: 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if anything regressed")
+    args = parser.parse_args()
+
+    if args.quick:
+        capture_lines, log_sizes, env_counts = [20000], [1000, 10000], [10, 100]
+    else:
+        capture_lines, log_sizes, env_counts = [20000, 200000], [1000, 10000, 100000], [10, 100, 1000, 10000]
+    repeat = args.repeat or (5 if args.quick else 20)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="ee-bench-"))
+    environments_dir = work_dir / "environments"
+    environments_dir.mkdir()
+    configure_environment(work_dir, environments_dir)
+    sys.path.insert(0, str(BENCHMARKS_DIR.parent))
+
+    results: Dict[str, dict] = {}
+    try:
+        print("⏱️  Capture throughput...")
+        results.update(bench_capture_throughput(capture_lines, line_size=120))
+        print("⏱️  Build status latency...")
+        results.update(bench_build_status(log_sizes, repeat))
+        print("⏱️  Environment and dashboard latency...")
+        results.update(bench_environment_reads(env_counts, work_dir, repeat))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "quick": args.quick,
+        "results": results,
+    }
+
+    for name, metrics in results.items():
+        print(f"  {name:<32} " + "  ".join(f"{k}={v}" for k, v in metrics.items()))
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    history_path = RESULTS_DIR / "history.jsonl"
+    baseline_path = RESULTS_DIR / "baseline.json"
+
+    reference = None
+    if baseline_path.exists():
+        reference = json.loads(baseline_path.read_text())
+    elif history_path.exists():
+        previous_runs = [json.loads(line) for line in history_path.read_text().splitlines() if line.strip()]
+        matching = [r for r in previous_runs if r.get("quick") == args.quick]
+        reference = matching[-1] if matching else None
+
+    with open(history_path, "a") as f:
+        f.write(json.dumps(run) + "\n")
+    (RESULTS_DIR / "latest.json").write_text(json.dumps(run, indent=2))
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(run, indent=2))
+        print(f"📌 Saved baseline to {baseline_path}")
+
+    regressions = compare(results, reference["results"], args.threshold) if reference else []
+    if reference is None:
+        print("ℹ️  No baseline or previous run to compare against")
+    elif regressions:
+        print(f"❌ {len(regressions)} regressions against {reference.get('commit') or reference['timestamp']}:")
+        for regression in regressions:
+            print(f"   {regression}")
+    else:
+        print(f"✅ No regressions against {reference.get('commit') or reference['timestamp']}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
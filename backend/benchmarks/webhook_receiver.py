@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# backend/benchmarks/webhook_receiver.py - Local endpoint for trying out build webhooks
+#
+# Prints each batch of build events it receives, checks the X-EE-Signature
+# header when given the webhook's secret, and can answer with an error
+# status to exercise retries:
+#
+#   WEBHOOK_PRIVATE_HOSTS='["localhost"]' make dev    # let the API call a local receiver
+#   python benchmarks/webhook_receiver.py --port 9000 --secret s3cret
+#   curl -X POST localhost:8000/api/webhooks \
+#        -H 'Content-Type: application/json' \
+#        -d '{"url": "http://localhost:9000/", "secret": "s3cret"}'
+
+import argparse
+import hashlib
+import hmac
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(secret, fail_status, log_file):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if secret is not None:
+                expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+                if not hmac.compare_digest(expected, self.headers.get("X-EE-Signature", "")):
+                    print("✗ bad signature", flush=True)
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+            if fail_status:
+                print(f"✗ answering {fail_status}", flush=True)
+                self.send_response(fail_status)
+                self.end_headers()
+                return
+
+            for event in json.loads(body)["events"]:
+                detail = " ".join(f"{key}={value}" for key, value in event["data"].items())
+                print(f"{event['seq']:>6} {event['created_at']} {event['build_id'][:8]} {event['event']} {detail}",
+                      flush=True)
+                if log_file:
+                    log_file.write(json.dumps(event) + "\n")
+                    log_file.flush()
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return WebhookHandler
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Print build events POSTed by EE-DE Builder webhooks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--secret", help="Reject deliveries not signed with this webhook secret")
+    parser.add_argument("--fail", type=int, default=0, metavar="STATUS",
+                        help="Answer every delivery with this HTTP status, to watch retries and backoff")
+    parser.add_argument("--jsonl", type=argparse.FileType("a"), help="Also append each event to this file")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.secret, args.fail, args.jsonl))
+    print(f"Listening on http://{args.host}:{args.port}/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,64 @@
+# backend/tests/test_build_cancel.py - Cancelling a build that waits on a shared build
+
+import os
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+WORK_DIR = Path(tempfile.mkdtemp(prefix="ee-builder-test-"))
+
+# Stand-ins for the container runtime and a playbook that builds nothing for long
+# enough to join its build and cancel the joiner
+for name, script in (("podman", "echo 'podman version 4.9.0'"), ("ansible-playbook", "sleep 3")):
+    (WORK_DIR / name).write_text(f"#!/bin/sh\n{script}\n")
+    (WORK_DIR / name).chmod((WORK_DIR / name).stat().st_mode | stat.S_IEXEC)
+
+os.environ.update(
+    PATH=f"{WORK_DIR}{os.pathsep}{os.environ['PATH']}",
+    ANSIBLE_PLAYBOOK_BIN=str(WORK_DIR / "ansible-playbook"),
+    ENVIRONMENTS_DIR=str(BACKEND_DIR.parent / "environments"),
+    BUILD_DB_PATH=str(WORK_DIR / "builds.db"),
+    LOG_ARCHIVE_DIR=str(WORK_DIR / "build-logs"),
+    BUILD_ISOLATION="off",
+    PREFLIGHT_ENABLED="false",
+    WEBHOOK_POLL_SECONDS="0",
+)
+sys.path.insert(0, str(BACKEND_DIR))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+ENVIRONMENT = "rhel-9-ee-minimal"
+
+
+def wait_for(client, build_id, done, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        status = client.get(f"/api/builds/{build_id}/status").json()
+        if done(status) or time.monotonic() > deadline:
+            return status
+        time.sleep(0.1)
+
+
+def test_cancelled_waiting_build_stays_cancelled():
+    with TestClient(app) as client:
+        building = client.post("/api/builds/start", json={"environments": [ENVIRONMENT]}).json()
+        # Requests that publish never join a build outright; this one only waits for its result
+        waiting = client.post("/api/builds/start", json={
+            "environments": [ENVIRONMENT], "publish": True, "publish_registries": ["registry.example.com/ee"]
+        }).json()
+        assert waiting["build_id"] != building["build_id"]
+
+        assert client.delete(f"/api/builds/{waiting['build_id']}").status_code == 200
+        assert client.get(f"/api/builds/{waiting['build_id']}/status").json()["status"] == "cancelled"
+
+        # Polled while the build it waited on finishes, and after
+        wait_for(client, building["build_id"], lambda status: status["status"] not in ("queued", "running"))
+        status = wait_for(client, waiting["build_id"], lambda status: status["end_time"] is not None)
+        assert status["status"] == "cancelled"
+        assert status["return_code"] != 0
+        assert not any("completed successfully" in line for line in status["logs"])
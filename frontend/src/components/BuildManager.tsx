@@ -28,7 +28,7 @@ interface BuildManagerProps {
 
 interface BuildStatus {
   build_id: string;
-  status: 'running' | 'completed' | 'failed' | 'cancelled';
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
   environments: string[];
   start_time: string;
   end_time?: string;
@@ -36,6 +36,8 @@ interface BuildStatus {
   logs: string[];
   successful_builds: string[];
   failed_builds: string[];
+  eta?: string;
+  progress?: number;
 }
 
 export const BuildManager: React.FC<BuildManagerProps> = ({
@@ -60,7 +62,7 @@ export const BuildManager: React.FC<BuildManagerProps> = ({
             const status: BuildStatus = await response.json();
             setBuildStatus(status);
             
-            if (status.status === 'completed' || status.status === 'failed') {
+            if (status.status !== 'running' && status.status !== 'queued') {
               setIsBuilding(false);
               if (status.status === 'completed') {
                 onBuildComplete();
@@ -184,6 +186,11 @@ export const BuildManager: React.FC<BuildManagerProps> = ({
     return `${duration}s`;
   };
 
+  const formatRemaining = (eta: string) => {
+    const seconds = Math.max(0, Math.round((new Date(eta).getTime() - Date.now()) / 1000));
+    return seconds >= 60 ? `${Math.round(seconds / 60)}m` : `${seconds}s`;
+  };
+
   return (
     <>
       <Flex>
@@ -255,10 +262,12 @@ export const BuildManager: React.FC<BuildManagerProps> = ({
           {isBuilding && (
             <div style={{ marginBottom: '1rem' }}>
               <Progress
-                value={undefined}
-                measureLocation={ProgressMeasureLocation.none}
+                value={buildStatus?.progress ?? undefined}
+                measureLocation={buildStatus?.progress != null ? ProgressMeasureLocation.outside : ProgressMeasureLocation.none}
                 aria-label="Build progress"
-                title="Building environments..."
+                title={buildStatus?.eta
+                  ? `Building environments... (about ${formatRemaining(buildStatus.eta)} left)`
+                  : 'Building environments...'}
               />
             </div>
           )}
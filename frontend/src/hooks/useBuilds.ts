@@ -106,7 +106,7 @@ export const useBuilds = () => {
         
         setCurrentBuild(build);
 
-        if (build.status === 'running') {
+        if (build.status === 'running' || build.status === 'queued') {
           pollTimeoutRef.current = setTimeout(poll, 2000);
         } else {
           setBuilding(false);
@@ -162,6 +162,7 @@ export const useBuilds = () => {
   const getProgressValue = useCallback(() => {
     if (!currentBuild) return 0;
     switch (currentBuild.status) {
+      case 'queued': return 5;
       case 'starting': return 10;
       case 'running': return 50;
       case 'completed': return 100;
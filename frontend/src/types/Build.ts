@@ -11,7 +11,7 @@ export interface Build {
   build_time_seconds?: number;
 }
 
-export type BuildStatus = 'starting' | 'running' | 'completed' | 'failed' | 'lost' | 'cancelled';
+export type BuildStatus = 'queued' | 'starting' | 'running' | 'completed' | 'failed' | 'lost' | 'cancelled';
 
 export interface BuildRequest {
   environments: string[];